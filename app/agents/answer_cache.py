@@ -0,0 +1,88 @@
+"""
+Answer cache for LLM-synthesized replies.
+
+Near-duplicate queries ("weather in blr", "Bangalore weather today") resolve to
+the same intents, tool arguments and tool data, so the synthesized answer can
+be reused. Entries are keyed on those three parts, with the tool result
+reduced to a fingerprint, and expire with the TTL of the tool result they were
+written from.
+"""
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from app.config.settings import AppConfig
+from app.tools.cache import MemoryBackend, ToolCache
+
+ToolResult = Union[dict, str]
+
+_DEFAULT_TTL = 60.0
+
+
+def _normalize_args(args: Any) -> Any:
+    if isinstance(args, dict):
+        return {k: _normalize_args(v) for k, v in args.items()}
+    if isinstance(args, str):
+        return args.strip().lower()
+    return args
+
+
+def _call_args(args: Any) -> Any:
+    # a single-input Tool accepts its argument under any one key; the LLM may send "tool_input"
+    # (the name Tool.args reports) as well as "__arg1"
+    if isinstance(args, dict) and list(args) == ["tool_input"]:
+        return {"__arg1": args["tool_input"]}
+    return args
+
+
+def fingerprint(collected: Dict[str, ToolResult]) -> str:
+    payload = json.dumps(collected, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 512):
+        self._ttls = ttls
+        self._max_entries = max_entries
+        self._caches: Dict[str, ToolCache] = {}
+
+    def _cache_for(self, tool_label: str) -> ToolCache:
+        cache = self._caches.get(tool_label)
+        if cache is None:
+            ttl = self._ttls.get(tool_label, _DEFAULT_TTL)
+            # no stale window: a stale answer would be regenerated from stale messages
+            cache = ToolCache(f"answer:{tool_label}", ttl, 0.0, MemoryBackend(self._max_entries))
+            self._caches[tool_label] = cache
+        return cache
+
+    @staticmethod
+    def key(intents: List[str], tool_calls: List[dict], collected: Dict[str, ToolResult]) -> Optional[str]:
+        """
+        Build the cache key, or None when the answer should not be cached (no tool data or a tool error).
+        """
+        if not collected or any(isinstance(r, str) for r in collected.values()):
+            return None
+        calls = sorted((c["name"], json.dumps(_normalize_args(_call_args(c["args"])), sort_keys=True)) for c in tool_calls)
+        return json.dumps([sorted(intents), calls, fingerprint(collected)])
+
+    def get_or_create(self, tool_label: str, key: str, fn: Callable[[], str]) -> str:
+        return self._cache_for(tool_label).call(key, fn)
+
+    async def aget_or_create(self, tool_label: str, key: str, afn: Callable[[], Awaitable[str]]) -> str:
+        return await self._cache_for(tool_label).acall(key, afn)
+
+    def stats(self) -> dict:
+        return {label: cache.stats() for label, cache in self._caches.items()}
+
+
+_answer_cache: Optional[AnswerCache] = None
+
+
+def configure(config: AppConfig) -> Optional[AnswerCache]:
+    global _answer_cache
+    _answer_cache = AnswerCache(config.cache.ttl, config.agent.answer_cache_size) if config.agent.answer_cache else None
+    return _answer_cache
+
+
+def answer_cache_stats() -> dict:
+    return _answer_cache.stats() if _answer_cache is not None else {}
@@ -0,0 +1,223 @@
+"""
+Deterministic argument extraction for trivially parseable queries.
+
+A gazetteer of Indian cities and the NSE/BSE symbol master fill tool arguments
+directly ("Bengaluru weather", "TCS stock price", "cricket news"), skipping the
+LLM tool-selection round trip. Anything ambiguous returns None so the caller
+falls back to the LLM.
+"""
+import csv
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.agents.patterns import compile_terms
+from app.tools import symbol_master
+from app.tools.geocache import BUNDLED_CITIES
+from app.tools.symbol_master import SymbolIndex
+
+_CITY_ALIASES = {
+    "blr": "Bengaluru",
+    "bangalore": "Bengaluru",
+    "bombay": "Mumbai",
+    "calcutta": "Kolkata",
+    "madras": "Chennai",
+    "gurgaon": "Gurugram",
+    "mysore": "Mysuru",
+    "mangalore": "Mangaluru",
+    "trivandrum": "Thiruvananthapuram",
+    "cochin": "Kochi",
+    "pondicherry": "Puducherry",
+    "allahabad": "Prayagraj",
+    "vizag": "Visakhapatnam",
+    "baroda": "Vadodara",
+    "benares": "Varanasi",
+}
+
+_NEWS_STOPWORDS = {
+    "a", "about", "all", "also", "an", "any", "are", "big", "breaking", "current", "daily", "for",
+    "get", "give", "i", "in", "is", "latest", "local", "major", "me", "my", "need", "news", "of",
+    "on", "please", "recent", "show", "some", "tell", "the", "today", "today's", "todays", "top",
+    "us", "want", "what", "what's", "whats", "headlines", "few",
+}
+_CLAUSE_BREAKS = {"and", "plus", "also", "with", "then"}
+
+_NEWS_ABOUT = re.compile(
+    r"\b(?:news|headlines?)\s+(?:about|on|for|from|regarding|in)\s+([a-z][a-z0-9 '&-]{1,40}?)\s*(?:\band\b|[?.!,]|$)"
+)
+_NEWS_BEFORE = re.compile(r"((?:[a-z0-9'&-]+\s+){0,3})(?:news|headlines?)\b")
+
+# single-input LangChain Tools advertise their argument to the LLM as "__arg1"; fast calls use
+# the same key so they match LLM tool calls (and share their answer-cache entries)
+SINGLE_ARG = "__arg1"
+
+# words that can fill a place slot ("weather in X", "Pune and X") without naming a place
+_PLACE_PREPOSITIONS = {"in", "at", "for", "near", "around", "of"}
+_PLACE_JOINERS = {"and", "or", "vs", "&", ","}
+_NOT_PLACES = {
+    "a", "all", "any", "both", "celsius", "city", "cities", "day", "days", "degrees", "evening", "few",
+    "general", "hour", "hours", "india", "it", "me", "morning", "my", "next", "night", "now", "our",
+    "the", "this", "today", "tomorrow", "tonight", "us", "week", "weekend", "you",
+    "forecast", "humidity", "rain", "temperature", "weather",
+    "headlines", "news", "price", "prices", "share", "shares", "stock", "stocks",
+}
+_CITY_MARK = "\x00"
+_PLACE_TOKENS = re.compile(r"\x00|[a-z0-9][a-z0-9'.-]*|[,&]")
+
+_NEXT_DAYS = re.compile(r"\bnext (\d{1,2}) days?\b")
+_DAILY = re.compile(r"\b(?:this week|next week|week|weekly|weekend|forecast|tomorrow|coming days)\b")
+_HOURLY = re.compile(r"\b(?:hourly|hour by hour|next (?:few|\d{1,2}) hours|tonight|this evening)\b")
+
+
+@dataclass
+class FastCall:
+    name: str
+    args: Dict[str, object]
+
+    def as_tool_call(self) -> dict:
+        return {"name": self.name, "args": self.args, "id": f"call_fast_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+
+
+class FastPathExtractor:
+    def __init__(self, cities_csv: Path = BUNDLED_CITIES, symbol_index: Optional[SymbolIndex] = None):
+        self._cities: Dict[str, str] = dict(_CITY_ALIASES)
+        with cities_csv.open("r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self._cities[row["name"].lower()] = row["name"]
+        self._city_pattern = compile_terms(list(self._cities))
+
+        symbol_index = symbol_index or symbol_master.get_index()
+        self._symbols: Dict[str, str] = symbol_index.terms()
+        short_tickers = symbol_index.short_tickers()
+        self._symbol_pattern = compile_terms(list(self._symbols))
+        # two-letter tickers (e.g. LT) collide with ordinary words, so only match them upper-case
+        self._short_ticker_pattern = compile_terms(short_tickers) if short_tickers else None
+
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.total_ns = 0
+
+    def _cities_in(self, text: str) -> List[str]:
+        found = [self._cities[m.group(0)] for m in self._city_pattern.finditer(text.lower())]
+        return list(dict.fromkeys(found))
+
+    def _symbols_in(self, text: str) -> List[str]:
+        found = [self._symbols[m.group(0)] for m in self._symbol_pattern.finditer(text.lower())]
+        if self._short_ticker_pattern is not None:
+            found.extend(m.group(0) for m in self._short_ticker_pattern.finditer(text))
+        return list(dict.fromkeys(found))
+
+    def _unknown_place_in(self, text: str) -> bool:
+        """
+        Whether a place slot holds a word the city table does not know ("weather in Pune and
+        Ooty"); the LLM then sees the whole query instead of a call that drops the place.
+        """
+        tokens = _PLACE_TOKENS.findall(self._city_pattern.sub(_CITY_MARK, text.lower()))
+
+        def unknown(i: int) -> bool:
+            if not 0 <= i < len(tokens):
+                return False
+            token = tokens[i]
+            return (
+                token != _CITY_MARK
+                and token not in _NOT_PLACES
+                and token not in _PLACE_JOINERS
+                and not token[0].isdigit()
+                and token not in self._symbols
+            )
+
+        for i, token in enumerate(tokens):
+            if token in _PLACE_PREPOSITIONS and unknown(i + 1):
+                return True
+            if token == _CITY_MARK and (
+                (i + 1 < len(tokens) and tokens[i + 1] in _PLACE_JOINERS and unknown(i + 2))
+                or (i >= 1 and tokens[i - 1] in _PLACE_JOINERS and unknown(i - 2))
+            ):
+                return True
+        return False
+
+    @staticmethod
+    def _weather_horizon(text: str) -> Optional[Dict[str, object]]:
+        lowered = text.lower()
+        if _HOURLY.search(lowered):
+            return {"horizon": "hourly", "days": 2}
+        days = _NEXT_DAYS.search(lowered)
+        if days:
+            return {"horizon": "daily", "days": int(days.group(1))}
+        if _DAILY.search(lowered):
+            return {"horizon": "daily", "days": 2 if "tomorrow" in lowered else 7}
+        return None
+
+    def _news_topic(self, text: str) -> Optional[str]:
+        lowered = text.lower()
+        about = _NEWS_ABOUT.search(lowered)
+        if about:
+            words = [w for w in about.group(1).split() if w not in _NEWS_STOPWORDS]
+            return " ".join(words) or "india"
+        before = _NEWS_BEFORE.search(lowered)
+        if not before:
+            return None
+        words = before.group(1).split()
+        for i in range(len(words) - 1, -1, -1):
+            if words[i] in _CLAUSE_BREAKS:
+                words = words[i + 1 :]
+                break
+        words = [w for w in words if w not in _NEWS_STOPWORDS]
+        return " ".join(words) or "india"
+
+    def _extract(self, tool_label: str, text: str) -> Optional[FastCall]:
+        if tool_label == "weather":
+            cities = self._cities_in(text)
+            if not cities or self._unknown_place_in(text):
+                return None
+            horizon = self._weather_horizon(text)
+            if len(cities) == 1 and horizon is None:
+                return FastCall("fetch_weather", {SINGLE_ARG: cities[0]})
+            return FastCall("fetch_weather_batch", {"cities": ",".join(cities), **(horizon or {})})
+        if tool_label == "stock":
+            symbols = self._symbols_in(text)
+            if len(symbols) == 1:
+                return FastCall("fetch_stock", {SINGLE_ARG: symbols[0]})
+            if len(symbols) > 1:
+                return FastCall("fetch_stocks", {SINGLE_ARG: ",".join(symbols)})
+            return None
+        if tool_label == "news":
+            topic = self._news_topic(text)
+            if topic:
+                return FastCall("fetch_news", {SINGLE_ARG: topic})
+        return None
+
+    def extract(self, tool_label: str, text: str) -> Optional[FastCall]:
+        started = time.perf_counter_ns()
+        call = self._extract(tool_label, text)
+        elapsed = time.perf_counter_ns() - started
+        with self._lock:
+            self.total_ns += elapsed
+            bucket = self.hits if call else self.misses
+            bucket[tool_label] = bucket.get(tool_label, 0) + 1
+        return call
+
+    def stats(self) -> dict:
+        hits = sum(self.hits.values())
+        total = hits + sum(self.misses.values())
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "hit_rate": hits / total if total else 0.0,
+            "avg_extract_us": (self.total_ns / total / 1000) if total else 0.0,
+        }
+
+
+_extractor: Optional[FastPathExtractor] = None
+
+
+def get_extractor() -> FastPathExtractor:
+    global _extractor
+    if _extractor is None:
+        _extractor = FastPathExtractor()
+    return _extractor
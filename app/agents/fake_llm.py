@@ -0,0 +1,139 @@
+"""
+Deterministic stand-in for ChatOpenAI, selected with `models.provider: fake`.
+
+Tool-selection calls answer with a tool call whose argument comes from the
+fast-path extractor (or a fixed default), answer calls summarize the tool
+messages, and every call can sleep `latency_ms` to model network time. Used by
+the benchmark runner so workflow timings exclude OpenAI variance and cost.
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+from app.agents.extractor import SINGLE_ARG, FastCall, get_extractor
+
+_TOOL_LABELS = {
+    "fetch_weather": "weather",
+    "fetch_weather_batch": "weather",
+    "fetch_news": "news",
+    "fetch_stock": "stock",
+    "fetch_stocks": "stock",
+}
+_DEFAULT_ARGS = {
+    "fetch_weather": {SINGLE_ARG: "Mumbai"},
+    "fetch_weather_batch": {"cities": "Mumbai"},
+    "fetch_news": {SINGLE_ARG: "india"},
+    "fetch_stock": {SINGLE_ARG: "RELIANCE"},
+    "fetch_stocks": {SINGLE_ARG: "RELIANCE"},
+}
+_MAX_TOOL_TEXT = 300
+
+
+def _last_human_text(messages: Sequence[BaseMessage]) -> str:
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            return str(msg.content)
+    return ""
+
+
+def _usage(messages: Sequence[BaseMessage], reply: str) -> Dict[str, int]:
+    # rough 4-characters-per-token estimate, enough to exercise token accounting
+    prompt = sum(len(str(m.content)) for m in messages) // 4 + 1
+    completion = len(reply) // 4 + 1
+    return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+
+class FakeChatModel(BaseChatModel):
+    latency_ms: float = 0.0
+    tool_names: List[str] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "FakeChatModel":
+        return self.model_copy(update={"tool_names": [getattr(t, "name", str(t)) for t in tools]})
+
+    def _tool_call(self, messages: Sequence[BaseMessage]) -> dict:
+        name = self.tool_names[0]
+        label = _TOOL_LABELS.get(name, "")
+        call = get_extractor().extract(label, _last_human_text(messages)) if label else None
+        if call is None or call.name not in self.tool_names:
+            call = FastCall(name, dict(_DEFAULT_ARGS.get(name, {SINGLE_ARG: ""})))
+        return call.as_tool_call()
+
+    def _reply(self, messages: Sequence[BaseMessage]) -> AIMessage:
+        if self.tool_names:
+            return AIMessage(content="", tool_calls=[self._tool_call(messages)], usage_metadata=_usage(messages, ""))
+        tool_texts = [str(m.content)[:_MAX_TOOL_TEXT] for m in messages if isinstance(m, ToolMessage)]
+        if tool_texts:
+            text = "Here is what I found:\n" + "\n".join(tool_texts)
+        else:
+            text = f"I can help with weather, news and stock prices. You asked: {_last_human_text(messages)}"
+        return AIMessage(content=text, usage_metadata=_usage(messages, text))
+
+    def _chunks(self, reply: AIMessage) -> List[AIMessageChunk]:
+        if reply.tool_calls:
+            call = reply.tool_calls[0]
+            chunk = {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+            return [AIMessageChunk(content="", tool_call_chunks=[chunk], usage_metadata=reply.usage_metadata)]
+        words = str(reply.content).split(" ")
+        chunks = [AIMessageChunk(content=w if i == 0 else f" {w}") for i, w in enumerate(words)]
+        chunks[-1].usage_metadata = reply.usage_metadata
+        return chunks
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(self._reply(messages)):
+            if run_manager is not None:
+                run_manager.on_llm_new_token(str(chunk.content), chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        for chunk in self._chunks(self._reply(messages)):
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(str(chunk.content), chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
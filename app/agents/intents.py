@@ -0,0 +1,107 @@
+"""
+Single-pass weighted intent classifier.
+
+All intent vocabularies are compiled into one word-bounded trie regex; each matched
+term adds its weight to its intent, and intents scoring at or above the
+threshold are returned. Weak terms ("price", "update", "market") no longer
+route a query on their own. Symbol-master tickers and company aliases count as
+stock evidence, so "TCS price" still classifies as stock.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from app.agents.patterns import compile_terms
+from app.config.settings import IntentConfig
+from app.tools import symbol_master
+from app.tools.symbol_master import SymbolIndex
+
+DEFAULT_VOCABULARY: Dict[str, Dict[str, float]] = {
+    "weather": {
+        "weather": 1.0,
+        "temperature": 1.0,
+        "forecast": 1.0,
+        "humidity": 1.0,
+        "rain": 1.0,
+        "raining": 1.0,
+        "rainfall": 1.0,
+        "climate": 1.0,
+        "humid": 1.0,
+        "monsoon": 0.6,
+        "sunny": 0.6,
+        "degrees": 0.5,
+    },
+    "news": {
+        "news": 1.0,
+        "headline": 1.0,
+        "headlines": 1.0,
+        "breaking": 0.6,
+        "update": 0.5,
+        "updates": 0.5,
+    },
+    "stock": {
+        "stock": 1.0,
+        "stocks": 1.0,
+        "share price": 1.0,
+        "stock price": 1.0,
+        "nifty": 1.0,
+        "sensex": 1.0,
+        "nse": 1.0,
+        "bse": 1.0,
+        "ticker": 1.0,
+        "shares": 0.8,
+        "share": 0.5,
+        "price": 0.5,
+        "market": 0.5,
+        "trading": 0.5,
+        "quote": 0.5,
+    },
+}
+
+
+class IntentClassifier:
+    def __init__(self, vocabulary: Dict[str, Dict[str, float]], threshold: float = 1.0):
+        self.threshold = threshold
+        self.intents = list(vocabulary)
+        self._weights: Dict[str, List[Tuple[str, float]]] = {}
+        for intent, terms in vocabulary.items():
+            for term, weight in terms.items():
+                self._weights.setdefault(term.lower(), []).append((intent, weight))
+        self._pattern = compile_terms(self._weights)
+
+    def score(self, text: str) -> Dict[str, float]:
+        scores: Dict[str, float] = {}
+        seen = set()
+        for match in self._pattern.finditer(text.lower()):
+            term = match.group(0)
+            if term in seen:
+                continue
+            seen.add(term)
+            for intent, weight in self._weights[term]:
+                scores[intent] = scores.get(intent, 0.0) + weight
+        return scores
+
+    def select(self, scores: Dict[str, float]) -> List[str]:
+        # vocabulary order keeps multi-intent routing deterministic
+        return [i for i in self.intents if scores.get(i, 0.0) >= self.threshold] or ["unknown"]
+
+    def classify(self, text: str) -> Tuple[str, List[str], Dict[str, float]]:
+        """
+        Return (primary intent, all intents above threshold, raw scores).
+        """
+        scores = self.score(text)
+        intents = self.select(scores)
+        primary = max(intents, key=lambda i: scores.get(i, 0.0)) if intents != ["unknown"] else "unknown"
+        return primary, intents, scores
+
+
+def build_classifier(config: Optional[IntentConfig] = None, symbol_index: Optional[SymbolIndex] = None) -> IntentClassifier:
+    """
+    Merge the default vocabulary, known stock symbols and config overrides into one classifier.
+    """
+    config = config or IntentConfig()
+    vocabulary = {intent: dict(terms) for intent, terms in DEFAULT_VOCABULARY.items()}
+    if config.symbol_weight > 0:
+        symbol_terms = {term: config.symbol_weight for term in (symbol_index or symbol_master.get_index()).terms()}
+        vocabulary["stock"] = {**symbol_terms, **vocabulary["stock"]}
+    for intent, terms in config.vocabulary.items():
+        vocabulary.setdefault(intent, {}).update(terms)
+    return IntentClassifier(vocabulary, threshold=config.threshold)
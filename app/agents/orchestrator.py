@@ -1,14 +1,28 @@
+import asyncio
+import contextvars
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, Generator, Iterator, List, Optional, Union
 
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage, SystemMessage
-from langchain_core.tools import Tool
-from langchain_openai import ChatOpenAI
-from langgraph.graph import END, StateGraph
-
-from app.config.settings import Settings
-from app.tools import news, stock, weather
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import BaseTool, StructuredTool, Tool
+
+from app.agents.answer_cache import AnswerCache
+from app.agents.answer_cache import configure as configure_answer_cache
+from app.agents.extractor import FastPathExtractor, get_extractor
+from app.agents.intents import build_classifier
+from app.agents.synthesis import render_answer
+from app.config.settings import DefaultsConfig, Settings
+from app.observability import tracing
+from app.observability.metrics import LLM_SECONDS, STAGE_SECONDS, TOOL_SECONDS, record_llm_usage
+from app.tools import configure as configure_tools
+from app.tools.resilience import UpstreamUnavailable
 
 logger = logging.getLogger(__name__)
 
@@ -20,38 +34,26 @@ def _unwrap_callable(mcp_tool: Callable) -> Callable:
     return getattr(mcp_tool, "fn", mcp_tool)
 
 
-def _to_lc_tool(mcp_tool: Callable, name: Optional[str] = None, description: Optional[str] = None) -> Tool:
+def _to_lc_tool(
+    mcp_tool: Callable,
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    coroutine: Optional[Callable] = None,
+    structured: bool = False,
+) -> BaseTool:
+    """
+    Single-input `Tool` by default; `structured` keeps the function's named parameters as the tool schema.
+    """
     fn = _unwrap_callable(mcp_tool)
-    return Tool.from_function(
+    factory = StructuredTool.from_function if structured else Tool.from_function
+    return factory(
         name=name or getattr(mcp_tool, "name", fn.__name__),
         description=description or getattr(mcp_tool, "description", fn.__doc__),
         func=fn,
+        coroutine=coroutine,
     )
 
 
-def _intent_from_text(text: str) -> str:
-    lowered = text.lower()
-    if any(keyword in lowered for keyword in ["weather", "temperature", "rain", "forecast", "climate"]):
-        return "weather"
-    if any(keyword in lowered for keyword in ["news", "headline", "update", "breaking"]):
-        return "news"
-    if any(keyword in lowered for keyword in ["stock", "price", "nifty", "sensex", "shares", "market"]):
-        return "stock"
-    return "unknown"
-
-
-def _intents_from_text(text: str) -> List[str]:
-    intents = []
-    lowered = text.lower()
-    if any(k in lowered for k in ["weather", "temperature", "rain", "forecast", "climate"]):
-        intents.append("weather")
-    if any(k in lowered for k in ["news", "headline", "update", "breaking"]):
-        intents.append("news")
-    if any(k in lowered for k in ["stock", "price", "nifty", "sensex", "shares", "market"]):
-        intents.append("stock")
-    return intents or ["unknown"]
-
-
 @dataclass
 class AgentState:
     messages: List[BaseMessage] = field(default_factory=list)
@@ -63,7 +65,20 @@ class AgentState:
     error: Optional[str] = None
 
 
-def _build_llm(settings: Settings, temperature: float = 0.2) -> ChatOpenAI:
+@dataclass
+class ToolRunOptions:
+    extractor: Optional[FastPathExtractor] = None
+    synthesis: str = "llm"
+    answer_cache: Optional[AnswerCache] = None
+
+
+def _build_llm(settings: Settings, temperature: float = 0.2) -> BaseChatModel:
+    if settings.config.models.provider == "fake":
+        from app.agents.fake_llm import FakeChatModel
+
+        return FakeChatModel(latency_ms=settings.config.models.fake_latency_ms)
+    from langchain_openai import ChatOpenAI
+
     return ChatOpenAI(
         model=settings.config.models.openai_chat,
         temperature=temperature,
@@ -71,130 +86,531 @@ def _build_llm(settings: Settings, temperature: float = 0.2) -> ChatOpenAI:
     )
 
 
-def _run_tool_call(
+def _intent_scoped_instruction(tool_label: str) -> str:
+    if tool_label == "weather":
+        return (
+            "Extract only the city (and country if present) for weather. Ignore news/stock parts. If no city found, default to Mumbai, India. "
+            "For several cities or a multi-day/hourly forecast, call fetch_weather_batch once with all cities "
+            "and horizon 'daily' or 'hourly' instead of fetch_weather per city."
+        )
+    if tool_label == "stock":
+        return (
+            "Extract only the stock ticker symbol (e.g., TCS, INFY, HCLTECH). Ignore weather/news text. "
+            "Do not include words like 'price' or 'stock' in the symbol. "
+            "For several symbols, call fetch_stocks once with all of them instead of fetch_stock per symbol."
+        )
+    if tool_label == "news":
+        return "Extract only the news topic or country. Ignore weather/stock text. Default topic: India."
+    return "Use only the information relevant to this tool; ignore other intents."
+
+
+def _normalize_result(result: object) -> Union[dict, str]:
+    if hasattr(result, "model_dump"):
+        try:
+            return result.model_dump()
+        except Exception:
+            return str(result)
+    if isinstance(result, dict):
+        return result
+    return str(result)
+
+
+def _emit(event: str, **data: Any) -> None:
+    """
+    Publish a progress event on LangGraph's `custom` stream; a no-op outside a graph run.
+    """
+    from langgraph.config import get_stream_writer
+
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"event": event, **data})
+
+
+def _answer_config(tool_label: str) -> dict:
+    # tags let streaming consumers pick answer tokens out of the `messages` stream
+    return {"tags": ["answer", f"intent:{tool_label}"]}
+
+
+def _last_user_text(messages: List[BaseMessage]) -> str:
+    last_user = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+    return str(last_user.content) if last_user else ""
+
+
+def _fast_path_message(
+    extractor: Optional[FastPathExtractor], messages: List[BaseMessage], tool_label: str
+) -> Optional[AIMessage]:
+    """
+    Build the tool-call message directly when the extractor is confident, skipping the LLM.
+    """
+    if extractor is None:
+        return None
+    call = extractor.extract(tool_label, _last_user_text(messages))
+    if call is None:
+        return None
+    return AIMessage(content="", tool_calls=[call.as_tool_call()])
+
+
+def _find_tool(tools: List[BaseTool], tool_name: str, tool_label: str) -> Optional[BaseTool]:
+    tool_obj = next((t for t in tools if t.name == tool_name), None)
+    if tool_obj is None:
+        logger.warning("Tool %s not registered for %s", tool_name, tool_label)
+    return tool_obj
+
+
+def _record_success(
+    state: AgentState,
+    messages: List[BaseMessage],
+    collected: Dict[str, Union[dict, str]],
+    call: dict,
+    tool_label: str,
+    result: object,
+) -> None:
+    tool_name = call["name"]
+    normalized = _normalize_result(result)
+    collected[tool_name] = normalized
+    state.tool_outputs.append({"tool": tool_name, "label": tool_label, "result": normalized})
+    messages.append(ToolMessage(content=str(normalized), tool_call_id=call["id"]))
+    _emit("tool_output", tool=tool_name, label=tool_label, result=normalized)
+
+
+def _record_failure(
     state: AgentState,
-    llm: ChatOpenAI,
-    tools: List[Tool],
+    messages: List[BaseMessage],
+    collected: Dict[str, Union[dict, str]],
+    call: dict,
+    tool_label: str,
+    exc: Exception,
+) -> None:
+    tool_name = call["name"]
+    err_msg = f"{tool_name} failed: {exc}"
+    state.error = err_msg
+    if isinstance(exc, UpstreamUnavailable):
+        # failed fast on purpose (open breaker / rate limit); the traceback adds nothing
+        logger.warning("Tool %s error: %s", tool_name, exc)
+    else:
+        logger.exception("Tool %s error", tool_name)
+    messages.append(ToolMessage(content=err_msg, tool_call_id=call["id"]))
+    collected[tool_name] = err_msg
+    state.tool_outputs.append({"tool": tool_name, "label": tool_label, "result": err_msg})
+    _emit("tool_output", tool=tool_name, label=tool_label, result=err_msg, error=True)
+
+
+def _observe_tool(span: Optional[tracing.Span], call: dict, tool_label: str, started: float, outcome: str) -> None:
+    TOOL_SECONDS.observe(time.perf_counter() - started, tool=call["name"], intent=tool_label, outcome=outcome)
+    if span is not None and outcome != "ok":
+        span.status = "error"
+
+
+@contextmanager
+def _llm_call(purpose: str, intent: str) -> Iterator[Optional[tracing.Span]]:
+    with tracing.span(f"llm.{purpose}", intent=intent) as span, LLM_SECONDS.time(purpose=purpose, intent=intent):
+        yield span
+
+
+def _record_llm(span: Optional[tracing.Span], message: AIMessage, purpose: str, intent: str) -> None:
+    record_llm_usage(message, purpose, intent)
+    usage = getattr(message, "usage_metadata", None)
+    if span is not None and usage:
+        span.set_attribute("llm.input_tokens", usage.get("input_tokens", 0))
+        span.set_attribute("llm.output_tokens", usage.get("output_tokens", 0))
+
+
+def _finish_tool_call(
+    state: AgentState,
+    messages: List[BaseMessage],
+    collected: Dict[str, Union[dict, str]],
     tool_label: str,
 ) -> AgentState:
-    messages = list(state.messages)
+    _emit("answer", label=tool_label, content=str(messages[-1].content))
+    state.messages = messages
+    state.tool_used = tool_label
+    if collected:
+        state.tool_result = str(next(iter(collected.values())))
+    return state
 
-    def _intent_scoped_instruction() -> str:
-        if tool_label == "weather":
-            return "Extract only the city (and country if present) for weather. Ignore news/stock parts. If no city found, default to Mumbai, India."
-        if tool_label == "stock":
-            return "Extract only the stock ticker symbol (e.g., TCS, INFY, HCLTECH). Ignore weather/news text. Do not include words like 'price' or 'stock' in the symbol."
-        if tool_label == "news":
-            return "Extract only the news topic or country. Ignore weather/stock text. Default topic: India."
-        return "Use only the information relevant to this tool; ignore other intents."
 
-    messages.append(SystemMessage(content=_intent_scoped_instruction()))
+def _answer_cache_key(
+    options: ToolRunOptions, state: AgentState, ai_msg: AIMessage, collected: Dict[str, Union[dict, str]]
+) -> Optional[str]:
+    if options.answer_cache is None:
+        return None
+    return AnswerCache.key(state.intents, ai_msg.tool_calls or [], collected)
 
-    bound = llm.bind_tools(tools)
 
-    ai_msg: AIMessage = bound.invoke(messages)
-    messages.append(ai_msg)
+def _synthesize(
+    llm: BaseChatModel,
+    messages: List[BaseMessage],
+    tool_label: str,
+    options: ToolRunOptions,
+    cache_key: Optional[str],
+) -> AIMessage:
+    config = _answer_config(tool_label)
+
+    def _invoke() -> AIMessage:
+        with _llm_call("answer", tool_label) as span:
+            msg = llm.invoke(messages, config=config)
+            _record_llm(span, msg, "answer", tool_label)
+        return msg
+
+    if cache_key is None:
+        return _invoke()
+    fresh: List[AIMessage] = []
+
+    def _generate() -> str:
+        fresh.append(_invoke())
+        return str(fresh[0].content)
+
+    content = options.answer_cache.get_or_create(tool_label, cache_key, _generate)
+    return fresh[0] if fresh else AIMessage(content=content)
+
+
+async def _asynthesize(
+    llm: BaseChatModel,
+    messages: List[BaseMessage],
+    tool_label: str,
+    options: ToolRunOptions,
+    cache_key: Optional[str],
+) -> AIMessage:
+    config = _answer_config(tool_label)
+
+    async def _invoke() -> AIMessage:
+        with _llm_call("answer", tool_label) as span:
+            msg = await llm.ainvoke(messages, config=config)
+            _record_llm(span, msg, "answer", tool_label)
+        return msg
+
+    if cache_key is None:
+        return await _invoke()
+    fresh: List[AIMessage] = []
+
+    async def _generate() -> str:
+        fresh.append(await _invoke())
+        return str(fresh[0].content)
+
+    content = await options.answer_cache.aget_or_create(tool_label, cache_key, _generate)
+    return fresh[0] if fresh else AIMessage(content=content)
+
+
+@dataclass
+class _Step:
+    """
+    A blocking call a turn needs made, in its sync and async form.
+    """
+
+    fn: Callable[..., Any]
+    afn: Callable[..., Awaitable[Any]]
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+# a turn yields the steps it needs run and gets each result sent back (or its exception thrown in)
+_Turn = Generator[_Step, Any, AgentState]
+
 
-    def _normalize_result(result: object) -> Union[dict, str]:
-        if hasattr(result, "model_dump"):
+def _drive(turn: _Turn) -> AgentState:
+    try:
+        step = next(turn)
+        while True:
             try:
-                return result.model_dump()
-            except Exception:
-                return str(result)
-        if isinstance(result, dict):
-            return result
-        return str(result)
+                result = step.fn(*step.args, **step.kwargs)
+            except BaseException as exc:
+                step = turn.throw(exc)
+            else:
+                step = turn.send(result)
+    except StopIteration as stop:
+        return stop.value
 
-    collected: Dict[str, Union[dict, str]] = {}
-    if ai_msg.tool_calls:
-        for call in ai_msg.tool_calls:
-            tool_name = call["name"]
+
+async def _adrive(turn: _Turn) -> AgentState:
+    try:
+        step = next(turn)
+        while True:
             try:
-                tool_obj = next(t for t in tools if t.name == tool_name)
-            except StopIteration:
-                logger.warning("Tool %s not registered for %s", tool_name, tool_label)
+                result = await step.afn(*step.args, **step.kwargs)
+            except BaseException as exc:
+                step = turn.throw(exc)
+            else:
+                step = turn.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+def _tool_call_turn(
+    state: AgentState,
+    llm: BaseChatModel,
+    tools: List[BaseTool],
+    tool_label: str,
+    options: Optional[ToolRunOptions] = None,
+) -> _Turn:
+    """
+    Extract tool calls (fast path or LLM), run the tools and answer from their results.
+    """
+    options = options or ToolRunOptions()
+    messages = list(state.messages)
+    messages.append(SystemMessage(content=_intent_scoped_instruction(tool_label)))
+
+    with STAGE_SECONDS.time(stage="extract", intent=tool_label):
+        ai_msg = _fast_path_message(options.extractor, messages, tool_label)
+        if ai_msg is None:
+            bound = llm.bind_tools(tools)
+            with _llm_call("extract", tool_label) as span:
+                ai_msg = yield _Step(bound.invoke, bound.ainvoke, (messages,))
+                _record_llm(span, ai_msg, "extract", tool_label)
+    messages.append(ai_msg)
+
+    collected: Dict[str, Union[dict, str]] = {}
+    with STAGE_SECONDS.time(stage="tool", intent=tool_label):
+        for call in ai_msg.tool_calls or []:
+            tool_obj = _find_tool(tools, call["name"], tool_label)
+            if tool_obj is None:
                 continue
-            try:
-                result = tool_obj.invoke(call["args"])
-                normalized = _normalize_result(result)
-                collected[tool_name] = normalized
-                state.tool_outputs.append({"tool": tool_name, "label": tool_label, "result": normalized})
-                messages.append(ToolMessage(content=str(normalized), tool_call_id=call["id"]))
-            except Exception as exc:
-                err_msg = f"{tool_name} failed: {exc}"
-                state.error = err_msg
-                logger.exception("Tool %s error", tool_name)
-                messages.append(ToolMessage(content=err_msg, tool_call_id=call["id"]))
-                collected[tool_name] = err_msg
-                state.tool_outputs.append({"tool": tool_name, "label": tool_label, "result": err_msg})
-    final_msg: AIMessage = llm.invoke(messages)
+            with tracing.span(f"tool.{call['name']}", intent=tool_label) as span:
+                started = time.perf_counter()
+                try:
+                    result = yield _Step(tool_obj.invoke, tool_obj.ainvoke, (call["args"],))
+                except Exception as exc:
+                    _observe_tool(span, call, tool_label, started, "error")
+                    _record_failure(state, messages, collected, call, tool_label, exc)
+                else:
+                    _observe_tool(span, call, tool_label, started, "ok")
+                    _record_success(state, messages, collected, call, tool_label, result)
+    templated = render_answer(options.synthesis, collected, multi_intent=len(state.intents) > 1)
+    if templated is not None:
+        final_msg = AIMessage(content=templated)
+    else:
+        cache_key = _answer_cache_key(options, state, ai_msg, collected)
+        with STAGE_SECONDS.time(stage="synthesize", intent=tool_label):
+            final_msg = yield _Step(_synthesize, _asynthesize, (llm, messages, tool_label, options, cache_key))
     messages.append(final_msg)
 
-    state.messages = messages
-    state.tool_used = tool_label
-    if collected:
-        state.tool_result = str(next(iter(collected.values())))
-    return state
+    return _finish_tool_call(state, messages, collected, tool_label)
+
+
+def _run_tool_call(
+    state: AgentState,
+    llm: BaseChatModel,
+    tools: List[BaseTool],
+    tool_label: str,
+    options: Optional[ToolRunOptions] = None,
+) -> AgentState:
+    return _drive(_tool_call_turn(state, llm, tools, tool_label, options))
+
+
+async def _arun_tool_call(
+    state: AgentState,
+    llm: BaseChatModel,
+    tools: List[BaseTool],
+    tool_label: str,
+    options: Optional[ToolRunOptions] = None,
+) -> AgentState:
+    return await _adrive(_tool_call_turn(state, llm, tools, tool_label, options))
 
 
-def _run_fallback(state: AgentState, llm: ChatOpenAI, label: str = "fallback") -> AgentState:
+def _fallback_turn(state: AgentState, llm: BaseChatModel, label: str) -> _Turn:
     messages = list(state.messages)
-    ai_msg: AIMessage = llm.invoke(messages)
+    with _llm_call("fallback", label) as span:
+        ai_msg: AIMessage = yield _Step(llm.invoke, llm.ainvoke, (messages,), {"config": _answer_config(label)})
+        _record_llm(span, ai_msg, "fallback", label)
     messages.append(ai_msg)
+    _emit("answer", label=label, content=str(ai_msg.content))
     state.messages = messages
     state.tool_used = label
     state.tool_result = None
     return state
 
 
-def build_workflow(settings: Settings):
-    llm = _build_llm(settings)
+def _run_fallback(state: AgentState, llm: BaseChatModel, label: str = "fallback") -> AgentState:
+    return _drive(_fallback_turn(state, llm, label))
+
+
+async def _arun_fallback(state: AgentState, llm: BaseChatModel, label: str = "fallback") -> AgentState:
+    return await _adrive(_fallback_turn(state, llm, label))
+
+
+def _branch_state(state: AgentState, intent: str) -> AgentState:
+    return AgentState(messages=list(state.messages), intent=intent, intents=list(state.intents))
 
-    weather_tools = [_to_lc_tool(weather.fetch_weather, "fetch_weather", "Fetch Indian city weather")]
+
+def _merge_branches(state: AgentState, branches: List[AgentState]) -> AgentState:
+    """
+    Fold per-intent branch results back into one state. Branches are merged in
+    `state.intents` order regardless of completion order, so output is deterministic.
+    """
+    base_len = len(state.messages)
+    messages = list(state.messages)
+    for branch in branches:
+        messages.extend(branch.messages[base_len:])
+        state.tool_outputs.extend(branch.tool_outputs)
+        state.tool_used = branch.tool_used
+        if branch.tool_result is not None:
+            state.tool_result = branch.tool_result
+        if branch.error:
+            state.error = branch.error
+    state.messages = messages
+    return state
+
+
+def _weather_tools(defaults: DefaultsConfig) -> List[BaseTool]:
+    from app.tools import weather
+
+    return [
+        _to_lc_tool(weather.fetch_weather, "fetch_weather", "Fetch Indian city weather", coroutine=weather.afetch_weather),
+        _to_lc_tool(
+            weather.fetch_weather_batch,
+            "fetch_weather_batch",
+            "Fetch weather for several Indian cities in one call; horizon 'daily' or 'hourly' adds a forecast for `days` days",
+            coroutine=weather.afetch_weather_batch,
+            structured=True,
+        ),
+    ]
+
+
+def _news_tools(defaults: DefaultsConfig) -> List[BaseTool]:
+    from app.tools import news
 
     def _news_wrapper(topic: str = "india", limit: Optional[int] = None):
-        return news.fetch_news(
-            topic=topic,
-            feed_url=settings.config.defaults.news_feed,
-            limit=limit or settings.config.defaults.max_news,
-        )
+        return news.fetch_news(topic=topic, feed_url=defaults.news_feed, limit=limit or defaults.max_news)
+
+    async def _anews_wrapper(topic: str = "india", limit: Optional[int] = None):
+        return await news.afetch_news(topic=topic, feed_url=defaults.news_feed, limit=limit or defaults.max_news)
 
-    news_tools = [_to_lc_tool(_news_wrapper, "fetch_news", "Fetch latest India news")]
+    return [_to_lc_tool(_news_wrapper, "fetch_news", "Fetch latest India news", coroutine=_anews_wrapper)]
+
+
+def _stock_tools(defaults: DefaultsConfig) -> List[BaseTool]:
+    from app.tools import stock
 
     def _stock_wrapper(symbol: str, exchange_suffix: Optional[str] = None):
-        return stock.fetch_stock(symbol=symbol, exchange_suffix=exchange_suffix or settings.config.defaults.default_stock_suffix)
+        return stock.fetch_stock(symbol=symbol, exchange_suffix=exchange_suffix or defaults.default_stock_suffix)
+
+    async def _astock_wrapper(symbol: str, exchange_suffix: Optional[str] = None):
+        return await stock.afetch_stock(symbol=symbol, exchange_suffix=exchange_suffix or defaults.default_stock_suffix)
+
+    def _stocks_wrapper(symbols: Union[str, List[str]], exchange_suffix: Optional[str] = None):
+        return stock.fetch_stocks(
+            symbols=symbols, exchange_suffix=exchange_suffix or defaults.default_stock_suffix
+        )
+
+    async def _astocks_wrapper(symbols: Union[str, List[str]], exchange_suffix: Optional[str] = None):
+        return await stock.afetch_stocks(
+            symbols=symbols, exchange_suffix=exchange_suffix or defaults.default_stock_suffix
+        )
+
+    return [
+        _to_lc_tool(_stock_wrapper, "fetch_stock", "Fetch India stock price", coroutine=_astock_wrapper),
+        _to_lc_tool(
+            _stocks_wrapper,
+            "fetch_stocks",
+            "Fetch India stock prices for several comma-separated symbols in one call",
+            coroutine=_astocks_wrapper,
+        ),
+    ]
+
+
+_TOOL_FACTORIES: Dict[str, Callable[[DefaultsConfig], List[BaseTool]]] = {
+    "weather": _weather_tools,
+    "news": _news_tools,
+    "stock": _stock_tools,
+}
+
+
+def build_workflow(settings: Settings, configure: bool = True):
+    """
+    Compile the LangGraph workflow. Nodes carry both sync and async implementations,
+    so the same graph serves `workflow.invoke` (CLI) and `await workflow.ainvoke` (server).
+    Tool modules load on the first query for their intent. Pass `configure=False` when the
+    caller has already applied the tool and tracing config.
+    """
+    from langgraph.graph import END, StateGraph
+
+    if configure:
+        configure_tools(settings.config)
+        tracing.configure(settings.config.tracing)
+    llm = _build_llm(settings)
+    defaults = settings.config.defaults
+    agent_config = settings.config.agent
+    run_options = ToolRunOptions(
+        extractor=get_extractor() if agent_config.fast_path else None,
+        synthesis=agent_config.synthesis,
+        answer_cache=configure_answer_cache(settings.config),
+    )
 
-    stock_tools = [_to_lc_tool(_stock_wrapper, "fetch_stock", "Fetch India stock price")]
     fallback_llm = _build_llm(settings, temperature=0.5)
 
+    tools_by_intent: Dict[str, List[BaseTool]] = {}
+    tools_lock = threading.Lock()
+
+    def _tools_for(intent: str) -> List[BaseTool]:
+        tools = tools_by_intent.get(intent)
+        if tools is None:
+            with tools_lock:
+                tools = tools_by_intent.get(intent)
+                if tools is None:
+                    tools = tools_by_intent[intent] = _TOOL_FACTORIES[intent](defaults)
+        return tools
+
+    classifier = build_classifier(settings.config.intents)
+
     graph = StateGraph(AgentState)
 
     def classify(state: AgentState) -> AgentState:
-        last_user = next((m for m in reversed(state.messages) if isinstance(m, HumanMessage)), None)
-        if last_user:
-            state.intent = _intent_from_text(last_user.content)
-            state.intents = _intents_from_text(last_user.content)
+        text = _last_user_text(state.messages)
+        if text:
+            with STAGE_SECONDS.time(stage="classify", intent="all"):
+                state.intent, state.intents, scores = classifier.classify(text)
+            logger.debug("Intent scores=%s", scores)
         logger.info("Routing intents=%s", state.intents)
+        _emit("classification", intent=state.intent, intents=state.intents)
         return state
 
+    async def aclassify(state: AgentState) -> AgentState:
+        return classify(state)
+
+    def _run_intent(state: AgentState, intent: str) -> AgentState:
+        branch = _branch_state(state, intent)
+        with tracing.span(f"intent.{intent}"):
+            if intent in _TOOL_FACTORIES:
+                return _run_tool_call(branch, llm, _tools_for(intent), intent, run_options)
+            return _run_fallback(branch, fallback_llm, "general")
+
+    async def _arun_intent(state: AgentState, intent: str) -> AgentState:
+        branch = _branch_state(state, intent)
+        with tracing.span(f"intent.{intent}"):
+            if intent in _TOOL_FACTORIES:
+                # the first query for an intent imports its tool module; keep that off the event loop
+                tools = tools_by_intent.get(intent) or await asyncio.to_thread(_tools_for, intent)
+                return await _arun_tool_call(branch, llm, tools, intent, run_options)
+            return await _arun_fallback(branch, fallback_llm, "general")
+
     def multi_agent(state: AgentState) -> AgentState:
-        messages_state = state
-        for intent in state.intents:
-            if intent == "weather":
-                messages_state = _run_tool_call(messages_state, llm, weather_tools, "weather")
-            elif intent == "news":
-                messages_state = _run_tool_call(messages_state, llm, news_tools, "news")
-            elif intent == "stock":
-                messages_state = _run_tool_call(messages_state, llm, stock_tools, "stock")
-            else:
-                messages_state = _run_fallback(messages_state, fallback_llm, "general")
+        # independent intents run concurrently; each branch sees only the original conversation
+        if len(state.intents) > 1:
+            with ThreadPoolExecutor(max_workers=len(state.intents), thread_name_prefix="intent") as pool:
+                # copy the run context per branch so callbacks and stream writers follow into the threads
+                futures = [
+                    pool.submit(contextvars.copy_context().run, _run_intent, state, intent) for intent in state.intents
+                ]
+                branches = [f.result() for f in futures]
+        else:
+            branches = [_run_intent(state, intent) for intent in state.intents]
+        messages_state = _merge_branches(state, branches)
         # mark last intent as primary for response context
         if state.intents:
             messages_state.intent = state.intents[-1]
         return messages_state
 
-    graph.add_node("classify", classify)
-    graph.add_node("multi_agent", multi_agent)
+    async def amulti_agent(state: AgentState) -> AgentState:
+        branches = await asyncio.gather(*(_arun_intent(state, intent) for intent in state.intents))
+        messages_state = _merge_branches(state, list(branches))
+        if state.intents:
+            messages_state.intent = state.intents[-1]
+        return messages_state
+
+    for name, func, afunc in (("classify", classify, aclassify), ("multi_agent", multi_agent, amulti_agent)):
+        node = tracing.traced(f"node.{name}")
+        graph.add_node(name, RunnableLambda(node(func), afunc=node(afunc), name=name))
     graph.set_entry_point("classify")
     graph.add_edge("classify", "multi_agent")
     graph.add_edge("multi_agent", END)
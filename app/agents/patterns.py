@@ -0,0 +1,44 @@
+"""
+Compile large term vocabularies into one word-bounded regex.
+
+Terms are folded into a character trie before being rendered as a pattern, so
+shared prefixes are matched once instead of re-tried per alternative; for a few
+hundred terms this is several times faster than a flat `a|b|c` alternation.
+"""
+import re
+from typing import Dict, Iterable, Optional
+
+_END = ""
+
+
+def _render(node: Dict[str, dict]) -> Optional[str]:
+    if _END in node and len(node) == 1:
+        return None
+    branches = []
+    for ch in sorted(k for k in node if k != _END):
+        tail = _render(node[ch])
+        branches.append(re.escape(ch) + (tail or ""))
+    optional = _END in node
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    # greedy `?` tries the longer term first, so "share price" wins over "share"
+    return group + "?" if optional else group
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[_END] = {}
+    return _render(trie) or ""
+
+
+def compile_terms(terms: Iterable[str]) -> "re.Pattern[str]":
+    """
+    Match any of `terms` as a whole word (`&` counts as a word character, for tickers like M&M).
+    Case-sensitive: callers lower-case both the terms and the text.
+    """
+    return re.compile(rf"(?<![\w&])(?:{trie_pattern(terms)})(?![\w&])")
@@ -0,0 +1,120 @@
+"""
+Template-based answer synthesis for structured tool results.
+
+`llm` always asks the model to write the answer, `template` renders every
+tool result from the templates below, and `hybrid` renders single-intent
+structured results and keeps the LLM for multi-intent queries and errors.
+"""
+from typing import Callable, Dict, Optional, Union
+
+SYNTHESIS_MODES = ("llm", "template", "hybrid")
+
+ToolResult = Union[dict, str]
+
+
+def _fmt(value: Optional[float], pattern: str) -> Optional[str]:
+    return pattern.format(value) if value is not None else None
+
+
+def _render_weather(result: dict) -> str:
+    details = [
+        _fmt(result.get("apparent_temperature_c"), "feels like {:.1f}°C"),
+        _fmt(result.get("humidity_pct"), "humidity {:.0f}%"),
+        _fmt(result.get("precipitation_mm"), "precipitation {:.1f} mm"),
+    ]
+    extra = ", ".join(d for d in details if d)
+    text = f"It is currently {result['temperature_c']:.1f}°C in {result['city']}, {result['country']}"
+    return f"{text} ({extra})." if extra else f"{text}."
+
+
+def _column(series: dict, name: str, i: int) -> Optional[float]:
+    values = series.get(name) or []
+    return values[i] if i < len(values) else None
+
+
+def _forecast_day(daily: dict, i: int) -> str:
+    parts = [
+        _fmt(_column(daily, "temperature_2m_max", i), "max {:.0f}°C"),
+        _fmt(_column(daily, "temperature_2m_min", i), "min {:.0f}°C"),
+        _fmt(_column(daily, "precipitation_sum", i), "rain {:.1f} mm"),
+    ]
+    return f"{daily['time'][i]}: " + ", ".join(p for p in parts if p)
+
+
+def _hourly_range(hourly: dict) -> str:
+    temps = [t for t in hourly.get("temperature_2m") or [] if t is not None]
+    rain = [p for p in hourly.get("precipitation_probability") or [] if p is not None]
+    text = f"{min(temps):.0f}-{max(temps):.0f}°C over the next {len(temps)} hours" if temps else "no hourly data"
+    return f"{text}, up to {max(rain):.0f}% chance of rain" if rain else text
+
+
+def _render_weather_batch(result: dict) -> str:
+    lines = []
+    for city in result.get("results", []):
+        now = _fmt(city.get("current", {}).get("temperature_2m"), "{:.1f}°C now")
+        lines.append(f"{city['city']}: " + (now or "current conditions unavailable"))
+        if city.get("daily"):
+            lines.extend(f"  {_forecast_day(city['daily'], i)}" for i in range(len(city["daily"].get("time", []))))
+        elif city.get("hourly"):
+            lines.append(f"  {_hourly_range(city['hourly'])}")
+    lines.extend(f"{name}: {err}" for name, err in result.get("errors", {}).items())
+    return "\n".join(lines)
+
+
+def _stock_line(result: dict) -> str:
+    price = f"{result['price']:,.2f}"
+    if result.get("currency"):
+        price = f"{price} {result['currency']}"
+    venue = f" on {result['exchange']}" if result.get("exchange") else ""
+    return f"{result['symbol']} is trading at {price}{venue}."
+
+
+def _render_stocks(result: dict) -> str:
+    lines = [_stock_line(r) for r in result.get("results", [])]
+    lines.extend(f"{sym}: {err}" for sym, err in result.get("errors", {}).items())
+    return "\n".join(lines)
+
+
+def _render_news(result: dict) -> str:
+    items = result.get("items", [])
+    if not items:
+        return "I couldn't find any recent headlines."
+    lines = [f"Here are the latest {len(items)} headlines:"]
+    for i, item in enumerate(items, start=1):
+        lines.append(f"{i}. {item['title']}")
+    return "\n".join(lines)
+
+
+_TEMPLATES: Dict[str, Callable[[dict], str]] = {
+    "fetch_weather": _render_weather,
+    "fetch_weather_batch": _render_weather_batch,
+    "fetch_stock": _stock_line,
+    "fetch_stocks": _render_stocks,
+    "fetch_news": _render_news,
+}
+
+
+def _render(tool_name: str, result: ToolResult) -> Optional[str]:
+    if isinstance(result, str):
+        return f"Sorry, I couldn't get that: {result}"
+    template = _TEMPLATES.get(tool_name)
+    if template is None:
+        return None
+    try:
+        return template(result)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def render_answer(mode: str, collected: Dict[str, ToolResult], multi_intent: bool) -> Optional[str]:
+    """
+    Return a templated answer, or None when the LLM should write it.
+    """
+    if mode == "llm" or not collected:
+        return None
+    if mode == "hybrid" and (multi_intent or any(isinstance(r, str) for r in collected.values())):
+        return None
+    parts = [_render(name, result) for name, result in collected.items()]
+    if any(p is None for p in parts):
+        return None
+    return "\n".join(parts)
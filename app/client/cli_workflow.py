@@ -2,17 +2,23 @@
 Run the LangGraph workflow directly from terminal (no HTTP), printing step-by-step details.
 Usage:
     python -m app.client.cli_workflow "I need Bengaluru weather today"
+    python -m app.client.cli_workflow --stream "Bengaluru weather and cricket news"
+    python -m app.client.cli_workflow --profile "TCS stock price and Mumbai weather"
 """
 from __future__ import annotations
 
 import argparse
+import json
 import logging
+import time
+from contextlib import nullcontext
 from typing import Any
 
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
 
 from app.agents.orchestrator import AgentState, build_workflow
 from app.config.settings import configure_logging, get_settings
+from app.observability import tracing
 
 
 def format_message(msg: Any) -> str:
@@ -27,17 +33,60 @@ def format_message(msg: Any) -> str:
     return f"{role}: {msg.content}"
 
 
+def _as_state(result: Any) -> AgentState:
+    # LangGraph returns dataclass state as a plain dict of channel values
+    if isinstance(result, dict):
+        return AgentState(**result)
+    return result
+
+
+def stream_workflow(workflow: Any, state: AgentState) -> AgentState:
+    """
+    Print classification, tool outputs and answer tokens as the graph produces them.
+    """
+    started = time.perf_counter()
+    first_event = True
+    final_state: Any = None
+    for mode, chunk in workflow.stream(state, stream_mode=["custom", "messages", "values"]):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if mode == "values":
+            final_state = chunk
+            continue
+        if mode == "messages":
+            message, metadata = chunk
+            tags = metadata.get("tags") or []
+            if not isinstance(message, AIMessageChunk) or not message.content or "answer" not in tags:
+                continue
+        if first_event:
+            print(f"[{elapsed_ms:7.1f} ms] first event")
+            first_event = False
+        if mode == "messages":
+            print(message.content, end="", flush=True)
+        else:
+            print(f"\n[{elapsed_ms:7.1f} ms] {chunk.get('event')}: {json.dumps(chunk, default=str)}")
+    print()
+    return _as_state(final_state)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run workflow locally and print steps")
     parser.add_argument("query", help="User query/prompt")
+    parser.add_argument("--stream", action="store_true", help="Print events and answer tokens as they are produced")
+    parser.add_argument("--profile", action="store_true", help="Trace the run and print a per-span timing breakdown")
     args = parser.parse_args()
 
     settings = get_settings()
     configure_logging(settings.config.logging)
+    if args.profile:
+        settings.config.tracing.enabled = True
     workflow = build_workflow(settings)
 
     state = AgentState(messages=[HumanMessage(content=args.query)])
-    result: AgentState = workflow.invoke(state)
+    with tracing.start_trace("cli.workflow", query=args.query) if args.profile else nullcontext() as root:
+        if args.stream:
+            result = stream_workflow(workflow, state)
+        else:
+            result = _as_state(workflow.invoke(state))
 
     print("=== Execution Trace ===")
     for msg in result.messages:
@@ -48,6 +97,10 @@ def main() -> None:
     print("Tool used  :", result.tool_used)
     print("Tool result:", result.tool_result)
 
+    if root is not None:
+        print(f"\n=== Profile (trace {root.trace_id}) ===")
+        print(tracing.format_profile(tracing.get_trace(root.trace_id)))
+
 
 if __name__ == "__main__":
     main()
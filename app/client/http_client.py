@@ -4,32 +4,164 @@ Lightweight client helper to call the FastAPI orchestrator.
 from __future__ import annotations
 
 import argparse
+import itertools
+import json
 import os
-from typing import Any, Dict
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 import requests
 
 
 DEFAULT_BASE_URL = os.getenv("ORCHESTRATOR_URL", "http://localhost:8000")
 
+# a plain session so repeated calls reuse the connection; the server's tool pool (rate limits,
+# breakers, replay) is for upstream APIs, not for talking to the orchestrator
+_session: Optional[requests.Session] = None
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
 
 def query_api(query: str, base_url: str = DEFAULT_BASE_URL) -> Dict[str, Any]:
     url = f"{base_url.rstrip('/')}/query"
-    resp = requests.post(url, json={"query": query}, timeout=15)
+    resp = _get_session().post(url, json={"query": query}, timeout=15)
     resp.raise_for_status()
     return resp.json()
 
 
+def stream_query(query: str, base_url: str = DEFAULT_BASE_URL) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (event, data) pairs from the `/query/stream` Server-Sent Events endpoint as they arrive.
+    """
+    url = f"{base_url.rstrip('/')}/query/stream"
+    resp = _get_session().post(url, json={"query": query}, timeout=60, stream=True)
+    resp.raise_for_status()
+    event, data_lines = "message", []
+    with resp:
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:") :].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[len("data:") :].strip())
+            elif not line and data_lines:
+                yield event, json.loads("\n".join(data_lines))
+                event, data_lines = "message", []
+
+
+def query_batch(
+    queries: Iterable[str],
+    base_url: str = DEFAULT_BASE_URL,
+    batch_size: int = 500,
+    concurrency: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Send `queries` to `/query/batch` in chunks of `batch_size` and yield each NDJSON line as it
+    arrives: one `{"index", "query", "response" | "error"}` per query (indexes count across chunks),
+    then a `{"summary": ...}` line per chunk. `queries` may be a lazy iterator, e.g. a file.
+    """
+    url = f"{base_url.rstrip('/')}/query/batch"
+    offset = 0
+    it = iter(queries)
+    while True:
+        chunk = list(itertools.islice(it, batch_size))
+        if not chunk:
+            return
+        payload = {"queries": [{"query": q} for q in chunk], "stream": True, "concurrency": concurrency}
+        # results arrive in input order, so the read timeout bounds the wait for the slowest single query
+        resp = _get_session().post(url, json=payload, timeout=300, stream=True)
+        resp.raise_for_status()
+        with resp:
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                item = json.loads(line)
+                if "index" in item:
+                    item["index"] += offset
+                yield item
+        offset += len(chunk)
+
+
+def _read_queries(source: TextIO) -> Iterator[str]:
+    # one query per line; JSON lines with a "query" field (e.g. an earlier batch's output) work too
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            line = json.loads(line).get("query", "")
+        if line:
+            yield line
+
+
+def _run_batch(path: str, output: str, base_url: str, batch_size: int, concurrency: Optional[int]) -> None:
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    sink = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    summaries: List[Dict[str, Any]] = []
+    try:
+        for item in query_batch(_read_queries(source), base_url, batch_size, concurrency):
+            if "summary" in item:
+                summaries.append(item["summary"])
+                continue
+            sink.write(json.dumps(item, default=str) + "\n")
+            sink.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    totals = {k: sum(s.get(k, 0) for s in summaries) for k in ("count", "unique_queries", "errors", "tool_calls")}
+    print(f"batch done: {json.dumps(totals)}", file=sys.stderr)
+
+
+def _print_stream(query: str, base_url: str) -> None:
+    started = time.perf_counter()
+    first_event_ms = None
+    for event, data in stream_query(query, base_url):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if first_event_ms is None:
+            first_event_ms = elapsed_ms
+            print(f"[{elapsed_ms:7.1f} ms] time to first event")
+        if event == "token":
+            print(data.get("content", ""), end="", flush=True)
+        elif event == "done":
+            print(f"\n[{elapsed_ms:7.1f} ms] done intent={data.get('intent')} tool={data.get('tool_used')}")
+        else:
+            print(f"\n[{elapsed_ms:7.1f} ms] {event}: {json.dumps(data, default=str)}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Call the orchestrator HTTP API")
-    parser.add_argument("query", help="User question/prompt")
+    parser.add_argument("query", nargs="?", help="User question/prompt")
     parser.add_argument(
         "--base-url",
         default=DEFAULT_BASE_URL,
         help="Orchestrator base URL (default: %(default)s)",
     )
+    parser.add_argument("--stream", action="store_true", help="Use the SSE endpoint and print events as they arrive")
+    parser.add_argument(
+        "--batch", metavar="FILE", help="Send the queries in FILE (one per line, - for stdin) to /query/batch"
+    )
+    parser.add_argument("--output", default="-", help="NDJSON results file for --batch (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Queries per /query/batch request")
+    parser.add_argument("--concurrency", type=int, help="Queries the server runs at once per batch")
     args = parser.parse_args()
 
+    if args.batch:
+        _run_batch(args.batch, args.output, args.base_url, args.batch_size, args.concurrency)
+        return
+    if not args.query:
+        parser.error("a query or --batch FILE is required")
+
+    if args.stream:
+        _print_stream(args.query, args.base_url)
+        return
+
     data = query_api(args.query, args.base_url)
     print("Intent:", data.get("intent"))
     print("Tool used:", data.get("tool_used"))
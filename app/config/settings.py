@@ -2,11 +2,11 @@ import logging
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 import yaml
 from dotenv import load_dotenv
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, Field, ValidationError
 
 
 class LoggingConfig(BaseModel):
@@ -15,14 +15,129 @@ class LoggingConfig(BaseModel):
 
 
 class ModelConfig(BaseModel):
+    # "fake" swaps ChatOpenAI for a deterministic local model (benchmarks, offline runs); no API key needed
+    provider: Literal["openai", "fake"] = "openai"
     openai_chat: str = "gpt-4o-mini"
     openai_fallback: str = "gpt-4o-mini"
+    # simulated per-call latency of the fake model
+    fake_latency_ms: float = 0.0
 
 
 class DefaultsConfig(BaseModel):
     news_feed: str = "https://news.google.com/rss?hl=en-IN&gl=IN&ceid=IN:en"
     max_news: int = 10
+    # RSS feeds queried alongside DuckDuckGo and news_feed; entries are filtered by topic
+    news_extra_feeds: List[str] = Field(default_factory=list)
+    # after this many seconds news returns whatever unique items the sources have delivered
+    news_deadline_s: float = 2.0
+    # background polling of news_feed, per-topic Google News feeds and news_extra_feeds (0 disables)
+    news_poll_interval_s: float = 120.0
+    news_poll_topics: List[str] = Field(default_factory=lambda: ["business", "cricket", "technology", "politics"])
+    news_store_size: int = 2000
+    # stream-parse pages and feeds with lxml (stops at `limit` items); falls back to bs4/feedparser
+    news_fast_parse: bool = True
     default_stock_suffix: str = ".NS"
+    # NSE/BSE listings CSV (symbol,name,exchanges,aliases); None uses the bundled master
+    symbol_master_path: Optional[str] = None
+    # reject symbols the master cannot resolve instead of trying them on Yahoo as <SYM>.NS
+    symbol_master_strict: bool = False
+    http_timeout: float = 10.0
+    http_retries: int = 2
+    http_max_connections: int = 100
+    http_max_connections_per_host: int = 10
+    http2: bool = True
+    geocode_cache_path: Optional[str] = "cache/geocode.sqlite3"
+    geocode_cache_size: int = 1024
+    geocode_prewarm: bool = True
+
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    # memory: per process; sqlite / redis: shared by all worker processes (see app.server.launcher)
+    backend: Literal["memory", "sqlite", "redis"] = "memory"
+    # sqlite file; None puts it in a private per-user directory on /dev/shm when available, else under cache/
+    path: Optional[str] = None
+    redis_url: str = "redis://localhost:6379/0"
+    max_entries: int = 1024
+    # seconds past expiry during which a stale value is served while it refreshes
+    stale_ttl: float = 60.0
+    # seconds past expiry during which an entry still answers when the upstream call fails
+    stale_if_error: float = 900.0
+    ttl: Dict[str, float] = Field(default_factory=lambda: {"weather": 300.0, "news": 120.0, "stock": 15.0})
+
+
+class ResilienceConfig(BaseModel):
+    enabled: bool = True
+    # token bucket per upstream host: sustained requests per second; hosts not listed are not limited
+    rate_limits: Dict[str, float] = Field(
+        default_factory=lambda: {
+            "duckduckgo.com": 1.0,
+            "geocoding-api.open-meteo.com": 10.0,
+            "api.open-meteo.com": 10.0,
+            "finance.yahoo.com": 5.0,
+        }
+    )
+    rate_burst: float = 5.0
+    # a call that would wait longer than this for a token fails fast instead
+    rate_max_wait_s: float = 0.5
+    # consecutive failures (errors, 5xx, 429) that open a host's breaker; seconds before a probe call
+    breaker_failures: int = 5
+    breaker_reset_s: float = 30.0
+    # /query requests processed at once per worker; more wait in a queue of `max_queued_queries`
+    max_concurrent_queries: int = 32
+    max_queued_queries: int = 64
+    # queued requests still waiting after this many seconds are shed with 503
+    queue_timeout_s: float = 5.0
+
+
+class AgentConfig(BaseModel):
+    # fill tool arguments from the city/symbol gazetteers when unambiguous, skipping the LLM
+    fast_path: bool = True
+    # llm: model writes every answer; template: render typed results; hybrid: template single-intent only
+    synthesis: Literal["llm", "template", "hybrid"] = "llm"
+    # reuse LLM answers for identical intents + tool args + tool data; TTLs follow cache.ttl
+    answer_cache: bool = True
+    answer_cache_size: int = 512
+    # build the workflow and import all tools at server startup instead of on the first request
+    warmup: bool = False
+
+
+class IntentConfig(BaseModel):
+    # an intent is routed when its matched term weights sum to at least this
+    threshold: float = 1.0
+    # weight a known NSE symbol or company name contributes to the stock intent
+    symbol_weight: float = 0.6
+    # extra terms per intent, merged over the built-in vocabulary (new intents are allowed)
+    vocabulary: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+
+
+class TracingConfig(BaseModel):
+    enabled: bool = True
+    # where finished traces go: "sqlite" / "jsonl" files under `path`, or "none" (in-memory only)
+    exporter: Literal["none", "jsonl", "sqlite"] = "sqlite"
+    path: str = "cache/traces.sqlite3"
+    # finished traces kept in memory for `--profile` and lookups by trace id
+    keep_recent: int = 100
+
+
+class QuotesConfig(BaseModel):
+    # shared batched polling of subscribed symbols for /quotes/ws and /quotes/stream
+    enabled: bool = True
+    interval_s: float = 5.0
+    max_symbols: int = 200
+
+
+class BatchConfig(BaseModel):
+    # most queries accepted by one /query/batch request
+    max_queries: int = 1000
+    # queries of one batch in the workflow at once (a request may ask for fewer)
+    concurrency: int = 8
+
+
+class ReplayConfig(BaseModel):
+    # off: live upstreams; record: live and save fixtures; replay: serve fixtures only
+    mode: Literal["off", "record", "replay"] = "off"
+    path: str = "benchmarks/fixtures/upstream"
 
 
 class AppConfig(BaseModel):
@@ -30,10 +145,18 @@ class AppConfig(BaseModel):
     logging: LoggingConfig = LoggingConfig()
     models: ModelConfig = ModelConfig()
     defaults: DefaultsConfig = DefaultsConfig()
+    cache: CacheConfig = CacheConfig()
+    agent: AgentConfig = AgentConfig()
+    intents: IntentConfig = IntentConfig()
+    tracing: TracingConfig = TracingConfig()
+    replay: ReplayConfig = ReplayConfig()
+    quotes: QuotesConfig = QuotesConfig()
+    resilience: ResilienceConfig = ResilienceConfig()
+    batch: BatchConfig = BatchConfig()
 
 
 class Settings(BaseModel):
-    openai_api_key: str
+    openai_api_key: Optional[str] = None
     config: AppConfig
     config_path: Path
 
@@ -49,11 +172,13 @@ def _load_yaml_config(config_path: Path) -> AppConfig:
         raise RuntimeError(f"Invalid config file: {exc}") from exc
 
 
-def _load_openai_key() -> str:
+def _load_openai_key(required: bool = True) -> Optional[str]:
     load_dotenv()
     key = os.getenv("OPENAI_API_KEY")
     if not key:
-        raise EnvironmentError("OPENAI_API_KEY missing. Set it in .env or environment.")
+        if required:
+            raise EnvironmentError("OPENAI_API_KEY missing. Set it in .env or environment.")
+        return None
     return key.strip()
 
 
@@ -61,7 +186,12 @@ def _load_openai_key() -> str:
 def get_settings(config_path: Optional[str] = None) -> Settings:
     path = Path(config_path or "app/config/config.yaml")
     app_config = _load_yaml_config(path)
-    openai_key = _load_openai_key()
+    load_dotenv()
+    # LLM_PROVIDER=fake runs without OpenAI (benchmarks, offline demos) regardless of config.yaml
+    provider = os.getenv("LLM_PROVIDER")
+    if provider:
+        app_config.models = ModelConfig(**{**app_config.models.model_dump(), "provider": provider})
+    openai_key = _load_openai_key(required=app_config.models.provider == "openai")
     return Settings(openai_api_key=openai_key, config=app_config, config_path=path)
 
 
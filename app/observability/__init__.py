@@ -0,0 +1,3 @@
+"""
+Observability helpers: in-process metrics and tracing.
+"""
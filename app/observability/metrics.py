@@ -0,0 +1,188 @@
+"""
+Lightweight Prometheus-style metrics (counters and histograms) rendered in the
+text exposition format for `/metrics`.
+
+Kept dependency-free and cheap: recording is a dict lookup plus a bisect under
+a lock, a few microseconds per observation, so timers can wrap every stage.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _label_str(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        get = labels.get
+        return tuple([str(get(n, "")) for n in self.labelnames])
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_str(self.labelnames, k)} {v}" for k, v in items]
+
+
+class _HistogramTimer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, object]):
+        self._histogram = histogram
+        self._labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> "_HistogramTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, **self._labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def time(self, **labels: object) -> _HistogramTimer:
+        return _HistogramTimer(self, labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(counts), total[0]) for k, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _label_str(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _label_str(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "orchestrator_stage_seconds",
+    "Time spent per orchestration stage (classify, extract, tool, synthesize).",
+    ("stage", "intent"),
+)
+TOOL_SECONDS = REGISTRY.histogram(
+    "tool_call_seconds", "Tool function latency including caches.", ("tool", "intent", "outcome")
+)
+LLM_SECONDS = REGISTRY.histogram("llm_call_seconds", "Chat model call latency.", ("purpose", "intent"))
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Chat model tokens consumed.", ("purpose", "intent", "kind"))
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_request_seconds", "Outbound HTTP request latency per upstream host.", ("host",)
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "upstream_errors_total", "Outbound HTTP failures per upstream host.", ("host", "kind")
+)
+UPSTREAM_REJECTED = REGISTRY.counter(
+    "upstream_rejected_total", "Outbound calls failed fast by a circuit breaker or rate limit.", ("host", "reason")
+)
+QUERY_SHED = REGISTRY.counter("query_shed_total", "Queries rejected with 503 by admission control.", ("endpoint", "reason"))
+QUERY_SECONDS = REGISTRY.histogram("query_seconds", "End-to-end query handling latency.", ("endpoint", "status"))
+
+
+def record_llm_usage(message: object, purpose: str, intent: str) -> None:
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return
+    LLM_TOKENS.inc(usage.get("input_tokens", 0), purpose=purpose, intent=intent, kind="prompt")
+    LLM_TOKENS.inc(usage.get("output_tokens", 0), purpose=purpose, intent=intent, kind="completion")
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,276 @@
+"""
+In-process tracing with OpenTelemetry-compatible span identifiers.
+
+Spans nest through a context variable, so they follow asyncio tasks and the
+copied contexts used for parallel intent branches. Nothing is recorded unless
+a trace was started with `start_trace` (one per request or CLI run); `span`
+outside a trace is a no-op. Finished traces are kept in a small in-memory ring
+(used by `--profile`) and handed to the configured exporters on a background
+thread. `Span.to_dict` follows the OTLP/JSON field names so exported traces
+can be forwarded to an OpenTelemetry collector unchanged.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.config.settings import TracingConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+        }
+
+
+class _Trace:
+    def __init__(self, root: Span):
+        self.root = root
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_active: Dict[str, _Trace] = {}
+
+
+class SpanExporter:
+    """
+    Receives every span of a finished trace in one batch.
+    """
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+
+class JsonlExporter(SpanExporter):
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+
+class SQLiteExporter(SpanExporter):
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS spans (trace_id TEXT, span_id TEXT PRIMARY KEY, parent_id TEXT,"
+            " name TEXT, start_ns INTEGER, end_ns INTEGER, duration_ms REAL, status TEXT, attributes TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS spans_trace ON spans (trace_id)")
+        self._conn.commit()
+
+    def export(self, spans: List[Span]) -> None:
+        rows = [
+            (s.trace_id, s.span_id, s.parent_id, s.name, s.start_ns, s.end_ns, s.duration_ms, s.status,
+             json.dumps(s.attributes, default=str))
+            for s in spans
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+_exporters: List[SpanExporter] = []
+_export_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+_recent: "OrderedDict[str, List[Span]]" = OrderedDict()
+_recent_lock = threading.Lock()
+_config = TracingConfig()
+
+
+def configure(config: TracingConfig) -> None:
+    global _config
+    _config = config
+    _exporters.clear()
+    if not config.enabled or config.exporter == "none":
+        return
+    if config.exporter == "jsonl":
+        _exporters.append(JsonlExporter(config.path))
+    else:
+        _exporters.append(SQLiteExporter(config.path))
+
+
+def add_exporter(exporter: SpanExporter) -> None:
+    _exporters.append(exporter)
+
+
+def _export(spans: List[Span]) -> None:
+    for exporter in list(_exporters):
+        try:
+            exporter.export(spans)
+        except Exception:
+            logger.warning("Trace exporter %s failed", type(exporter).__name__, exc_info=True)
+
+
+def _finish_trace(trace: _Trace) -> None:
+    spans = trace.spans
+    with _recent_lock:
+        _recent[trace.root.trace_id] = spans
+        while len(_recent) > _config.keep_recent:
+            _recent.popitem(last=False)
+    if _exporters:
+        _export_pool.submit(_export, spans)
+
+
+@contextmanager
+def _run_span(s: Span, trace: _Trace, is_root: bool) -> Iterator[Span]:
+    token = _current.set(s)
+    s.start_ns = time.time_ns()
+    try:
+        yield s
+    except BaseException as exc:
+        s.status = "error"
+        s.attributes.setdefault("error", f"{type(exc).__name__}: {exc}")
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+        with trace.lock:
+            trace.spans.append(s)
+        if is_root:
+            _active.pop(s.trace_id, None)
+            _finish_trace(trace)
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Open a root span; yields None when tracing is disabled.
+    """
+    if not _config.enabled:
+        yield None
+        return
+    root = Span(name, trace_id=_new_id(16), span_id=_new_id(8), attributes=attributes)
+    trace = _Trace(root)
+    _active[root.trace_id] = trace
+    with _run_span(root, trace, is_root=True) as s:
+        yield s
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Open a child of the current span; yields None outside a trace.
+    """
+    parent = _current.get()
+    trace = _active.get(parent.trace_id) if parent is not None else None
+    if trace is None:
+        yield None
+        return
+    child = Span(name, trace_id=parent.trace_id, span_id=_new_id(8), parent_id=parent.span_id, attributes=attributes)
+    with _run_span(child, trace, is_root=False) as s:
+        yield s
+
+
+def traced(name: str) -> Callable:
+    """
+    Wrap a sync or async function in a child span named `name`.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+def get_trace(trace_id: str) -> List[Span]:
+    with _recent_lock:
+        return list(_recent.get(trace_id, []))
+
+
+def format_profile(spans: List[Span], width: int = 40) -> str:
+    """
+    Render a trace as an indented flame-style breakdown: one line per span with
+    its duration, share of the root span and a bar placed on the run timeline.
+    """
+    if not spans:
+        return "(no spans recorded)"
+    children: Dict[Optional[str], List[Span]] = {}
+    for s in spans:
+        children.setdefault(s.parent_id, []).append(s)
+    for group in children.values():
+        group.sort(key=lambda s: s.start_ns)
+    roots = children.get(None, [])
+    origin = min(s.start_ns for s in spans)
+    total = max(max(s.end_ns for s in spans) - origin, 1)
+    lines: List[str] = []
+
+    def _walk(s: Span, depth: int) -> None:
+        offset = int((s.start_ns - origin) / total * width)
+        length = max(1, int((s.end_ns - s.start_ns) / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = ("  " * depth + s.name)[:44]
+        flag = " !" if s.status == "error" else ""
+        share = (s.end_ns - s.start_ns) / total * 100
+        lines.append(f"{label:<44} {s.duration_ms:9.1f} ms {share:5.1f}% |{bar:<{width}}|{flag}")
+        for child in children.get(s.span_id, []):
+            _walk(child, depth + 1)
+
+    for root in roots:
+        _walk(root, 0)
+    return "\n".join(lines)
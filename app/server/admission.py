@@ -0,0 +1,104 @@
+"""
+Admission control for the query endpoints.
+
+Each worker runs at most `max_concurrent_queries` queries at once; up to
+`max_queued_queries` more wait for a slot for at most `queue_timeout_s`.
+Anything beyond that is shed right away with 503 and a Retry-After header, so
+a slow upstream makes new requests fail fast instead of piling up on the worker.
+"""
+import asyncio
+import math
+from collections import Counter
+from typing import Optional
+
+from app.config.settings import ResilienceConfig
+from app.observability.metrics import QUERY_SHED
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server overloaded ({reason}); retry later")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def headers(self) -> dict:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class Slot:
+    """
+    An admitted query; release() is idempotent so a streaming response can release from
+    both its generator and a background task, whichever runs.
+    """
+
+    def __init__(self, controller: Optional["AdmissionController"]):
+        self._controller = controller
+
+    def release(self) -> None:
+        controller, self._controller = self._controller, None
+        if controller is not None:
+            controller._release()
+
+    async def __aenter__(self) -> "Slot":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(self, config: ResilienceConfig):
+        self.enabled = config.enabled
+        self.max_concurrent = max(1, config.max_concurrent_queries)
+        self.max_queued = config.max_queued_queries
+        self.queue_timeout_s = config.queue_timeout_s
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed: Counter = Counter()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _shed(self, endpoint: str, reason: str) -> Overloaded:
+        self.shed[reason] += 1
+        QUERY_SHED.inc(endpoint=endpoint, reason=reason)
+        return Overloaded(reason, self.queue_timeout_s)
+
+    async def acquire(self, endpoint: str) -> Slot:
+        """
+        Wait for a query slot; raises Overloaded when the queue is full or the wait times out.
+        """
+        if not self.enabled:
+            return Slot(None)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        if not self._semaphore.locked():
+            # a free slot is taken without suspending, so the next caller already sees it as used
+            await self._semaphore.acquire()
+        elif self.waiting >= self.max_queued:
+            raise self._shed(endpoint, "queue_full")
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout_s)
+            except asyncio.TimeoutError:
+                raise self._shed(endpoint, "queue_timeout") from None
+            finally:
+                self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        return Slot(self)
+
+    def _release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
@@ -0,0 +1,102 @@
+"""
+Batch query runner behind `/query/batch`.
+
+A batch's queries go through the workflow at most `concurrency` at a time.
+Identical queries (ignoring case and whitespace) run once and share their
+response, and every coalesced tool call made by the batch is remembered for
+the rest of it (`singleflight.join_batch`), so a watchlist repeated across a
+thousand queries fetches each symbol once. Results come back in input order,
+as items or as NDJSON lines ending with a `{"summary": ...}` line.
+
+The `answer` callable passed in is responsible for admission control, so
+each query of a batch takes its own slot like a `/query` request would.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from app.tools import singleflight
+
+logger = logging.getLogger(__name__)
+
+
+class BatchItem(NamedTuple):
+    index: int
+    query: str
+    response: Any
+    error: Optional[str]
+
+
+def _dedupe_key(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+class BatchRunner:
+    def __init__(self, queries: List[str], answer: Callable[[str], Awaitable[Any]], concurrency: int):
+        self.queries = queries
+        self.memo = singleflight.BatchMemo()
+        self.errors = 0
+        self._answer = answer
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._started = time.perf_counter()
+
+    async def _run(self, query: str) -> Any:
+        async with self._semaphore:
+            # each task runs in its own copy of the context, so this only affects the batch's queries
+            singleflight.join_batch(self.memo)
+            return await self._answer(query)
+
+    def _schedule(self) -> List[asyncio.Task]:
+        order = []
+        for query in self.queries:
+            key = _dedupe_key(query)
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.create_task(self._run(query))
+            order.append(task)
+        return order
+
+    async def results(self) -> AsyncIterator[BatchItem]:
+        """
+        Yield each query's response (or error) in input order as soon as it and its predecessors are done.
+        """
+        order = self._schedule()
+        try:
+            for index, (query, task) in enumerate(zip(self.queries, order)):
+                try:
+                    yield BatchItem(index, query, await task, None)
+                except Exception as exc:
+                    self.errors += 1
+                    logger.warning("Batch query %d failed: %s", index, exc)
+                    yield BatchItem(index, query, None, str(exc))
+        finally:
+            # the client went away or the batch finished. Only this batch's own tasks are cancelled:
+            # tool calls they share with other requests run in single-flight tasks that outlive them
+            for task in self._tasks.values():
+                task.cancel()
+
+    async def ndjson(self) -> AsyncIterator[str]:
+        """
+        One JSON line per result (index, query, response, error) in input order, then the summary line.
+        """
+        async for item in self.results():
+            response = item.response
+            if hasattr(response, "model_dump"):
+                response = response.model_dump(mode="json")
+            line = {"index": item.index, "query": item.query, "response": response, "error": item.error}
+            yield json.dumps(line, default=str) + "\n"
+        yield json.dumps({"summary": self.summary()}) + "\n"
+
+    def summary(self) -> dict:
+        return {
+            "count": len(self.queries),
+            "unique_queries": len(self._tasks),
+            "errors": self.errors,
+            # distinct tool calls the batch made, and later calls answered from them
+            "tool_calls": len(self.memo.results),
+            "tool_calls_reused": self.memo.hits,
+            "elapsed_ms": round((time.perf_counter() - self._started) * 1000, 1),
+        }
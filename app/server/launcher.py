@@ -0,0 +1,167 @@
+"""
+Pre-fork launcher for running the API server on several cores.
+
+The parent imports `app.server.main` and warms it up once (settings,
+compiled LangGraph workflow, classifier and extractor indexes, symbol master,
+tool modules with yfinance/feedparser), freezes those
+objects out of the garbage collector and forks the workers, which share the
+warm heap copy-on-write and accept connections from one inherited listening
+socket. Tool caches move to a shared backend (`cache.backend`, sqlite on
+/dev/shm unless configured otherwise) so a result fetched by one worker is a
+hit for all of them. The news and quote pollers stay per worker (each keeps
+its own news store and subscriptions), polling every interval times the worker
+count so the upstreams see the configured rate in total. Crashed workers are
+restarted; SIGINT/SIGTERM stop all.
+
+    python -m app.server.launcher --workers 4 --port 8000
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# a worker that dies sooner than this after starting is restarted with a delay, not in a tight loop
+_MIN_UPTIME_S = 5.0
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve(sock: socket.socket, worker: int, args: argparse.Namespace) -> None:
+    import uvicorn
+
+    from app.server import main as server
+
+    server.init_worker(worker, args.workers)
+    config = uvicorn.Config(
+        server.app,
+        log_level=args.log_level,
+        access_log=args.access_log,
+        timeout_keep_alive=args.keep_alive,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, worker: int, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 1
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        _serve(sock, worker, args)
+        code = 0
+    except Exception:
+        logger.exception("Worker %d failed", worker)
+    finally:
+        os._exit(code)
+
+
+def _supervise(sock: socket.socket, args: argparse.Namespace) -> None:
+    workers: Dict[int, int] = {}
+    started: Dict[int, float] = {}
+    stopping = False
+
+    def _stop(signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    for worker in range(args.workers):
+        pid = _spawn(sock, worker, args)
+        workers[pid], started[pid] = worker, time.monotonic()
+    logger.info("Started %d workers on %s:%d: %s", args.workers, args.host, args.port, sorted(workers))
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        worker = workers.pop(pid, None)
+        if worker is None:
+            continue
+        uptime = time.monotonic() - started.pop(pid)
+        if stopping:
+            continue
+        logger.warning("Worker %d (pid %d) exited with status %d; restarting", worker, pid, status)
+        if uptime < _MIN_UPTIME_S:
+            time.sleep(_MIN_UPTIME_S - uptime)
+        if stopping:
+            continue
+        new_pid = _spawn(sock, worker, args)
+        workers[new_pid], started[new_pid] = worker, time.monotonic()
+    sock.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API server with pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5, help="Seconds to hold idle keep-alive connections")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true")
+    parser.add_argument(
+        "--cache-backend",
+        choices=["memory", "sqlite", "redis"],
+        help="Tool cache backend (default: cache.backend from config, sqlite instead of memory with several workers)",
+    )
+    args = parser.parse_args()
+
+    cache_config = get_settings().config.cache
+    if args.cache_backend:
+        cache_config.backend = args.cache_backend
+    elif args.workers > 1 and cache_config.backend == "memory":
+        # per-process caches would stay cold in every worker but the one that filled them
+        cache_config.backend = "sqlite"
+
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        import uvicorn
+
+        uvicorn.run("app.server.main:app", host=args.host, port=args.port, log_level=args.log_level)
+        return
+
+    sock = _bind(args.host, args.port, args.backlog)
+    started = time.perf_counter()
+    from app.server import main as server
+
+    # build the workflow and import every tool once, so workers start warm
+    server.warmup()
+
+    # keep the warm objects out of later collections so workers do not touch (and copy) their pages
+    gc.freeze()
+    logger.info(
+        "Imported app in %.2fs; forking %d workers (cache backend: %s)",
+        time.perf_counter() - started,
+        args.workers,
+        cache_config.backend,
+    )
+    _supervise(sock, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,116 @@
+import asyncio
+import json
 import logging
-from typing import List, Optional
+import os
+import threading
+import time
+from typing import AsyncIterator, List, Optional
 
 from dataclasses import asdict, is_dataclass
-from typing import Any, Mapping, List, Optional
+from typing import Any, Dict, Mapping, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
+from app.agents.answer_cache import answer_cache_stats
+from app.agents.extractor import get_extractor
 from app.agents.orchestrator import AgentState, build_workflow
 from app.config.settings import configure_logging, get_settings
+from app.observability import metrics, tracing
+from app.server.admission import AdmissionController, Overloaded, Slot
+from app.server.batch import BatchRunner
+from app.server.quotes import QuoteService
+from app.tools import configure as configure_tools
+from app.tools import preload as preload_tools
 
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 configure_logging(settings.config.logging)
-workflow = build_workflow(settings)
+quote_service = QuoteService(settings.config.quotes, settings.config.defaults.default_stock_suffix)
+admission = AdmissionController(settings.config.resilience)
+# set by the pre-fork launcher in each worker process; None under plain uvicorn
+worker_id: Optional[int] = None
+# compiled on the first request or by warmup(), so importing this module stays cheap
+_workflow: Any = None
+_workflow_lock = threading.Lock()
+# pid of the process whose tools and tracing were last configured; a forked worker configures its own
+_configured_pid: Optional[int] = None
+_configure_lock = threading.Lock()
+
+
+def configure_process() -> None:
+    """
+    Apply the tool and tracing config (HTTP pools, SQLite handles, cache backends, symbol master,
+    trace exporters) once per process: at startup, or before the launcher forks and again in each worker.
+    """
+    global _configured_pid
+    with _configure_lock:
+        if _configured_pid == os.getpid():
+            return
+        configure_tools(settings.config)
+        tracing.configure(settings.config.tracing)
+        _configured_pid = os.getpid()
+
+
+def get_workflow() -> Any:
+    global _workflow
+    if _workflow is None:
+        with _workflow_lock:
+            if _workflow is None:
+                started = time.perf_counter()
+                _workflow = build_workflow(settings, configure=False)
+                logger.info("Built workflow in %.0f ms", (time.perf_counter() - started) * 1000)
+    return _workflow
+
+
+async def aget_workflow() -> Any:
+    # building imports langgraph and the LLM client; do it off the event loop
+    return _workflow if _workflow is not None else await asyncio.to_thread(get_workflow)
+
+
+def warmup() -> None:
+    """
+    Configure the tools, build the workflow and import every tool module ahead of the first request.
+    """
+    configure_process()
+    get_workflow()
+    preload_tools()
+
+
+def init_worker(worker: int, workers: int = 1) -> None:
+    """
+    Called in a freshly forked worker: rebuild per-process resources inherited from the parent
+    (HTTP pools, SQLite handles, cache backends, trace exporters). The compiled workflow is kept.
+    Every worker runs its own news and quote pollers, so their intervals are multiplied by
+    `workers` to keep the combined upstream polling at the configured rate.
+    """
+    global worker_id
+    worker_id = worker
+    config = settings.config
+    config.defaults.news_poll_interval_s *= workers
+    config.quotes.interval_s *= workers
+    quote_service.interval_s = config.quotes.interval_s
+    configure_process()
 
 
 class QueryRequest(BaseModel):
     query: str
 
 
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest]
+    # stream one NDJSON line per result (in input order) plus a final summary line
+    stream: bool = False
+    # queries run at once; capped by batch.concurrency in config.yaml
+    concurrency: Optional[int] = None
+
+
 class ToolOutput(BaseModel):
     tool: str
     label: Optional[str] = None
@@ -42,6 +129,20 @@ class QueryResponse(BaseModel):
     tool_outputs: List[ToolOutput]
     answer: str
     messages: List[MessagePayload]
+    # look up spans in the local trace store (see `tracing` in config.yaml)
+    trace_id: Optional[str] = None
+
+
+class BatchQueryResult(BaseModel):
+    index: int
+    query: str
+    response: Optional[QueryResponse] = None
+    error: Optional[str] = None
+
+
+class BatchQueryResponse(BaseModel):
+    results: List[BatchQueryResult]
+    summary: Dict[str, Any]
 
 
 def _serialize_message(message: BaseMessage) -> MessagePayload:
@@ -80,36 +181,306 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def start_background_ingestion() -> None:
+    # opens SQLite files and loads the symbol master; a pre-forked worker has already done this
+    await asyncio.to_thread(configure_process)
+    from app.tools import news
+
+    news.start_poller()
+    quote_service.start()
+    if settings.config.agent.warmup:
+        await asyncio.to_thread(warmup)
+
+
+@app.on_event("shutdown")
+async def stop_background_ingestion() -> None:
+    from app.tools import news
+
+    news.stop_poller()
+    await quote_service.stop()
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
 
+@app.get("/stats")
+async def stats():
+    from app.tools import cache, geocache, http_pool, news, replay, resilience, singleflight, symbol_master
+
+    return {
+        "http_pool": http_pool.pool_stats(),
+        "geocode_cache": geocache.get_cache().stats(),
+        "tool_cache": cache.cache_stats(),
+        "single_flight": singleflight.flight_stats(),
+        "fast_path": get_extractor().stats(),
+        "answer_cache": answer_cache_stats(),
+        "replay": replay.replay_stats(),
+        "news_store": news.news_store_stats(),
+        "resilience": resilience.resilience_stats(),
+        "admission": admission.stats(),
+        "quotes": quote_service.stats(),
+        "symbols": symbol_master.get_index().stats(),
+        "worker": {"id": worker_id, "pid": os.getpid()},
+    }
+
+
+@app.get("/metrics")
+async def metrics_endpoint() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _build_response(result: AgentState, trace_id: Optional[str] = None) -> QueryResponse:
+    answer_msg = next((m for m in reversed(result.messages) if isinstance(m, AIMessage)), None)
+    answer = answer_msg.content if answer_msg else ""
+
+    return QueryResponse(
+        intent=result.intent,
+        tool_used=result.tool_used,
+        tool_result=result.tool_result,
+        tool_outputs=[ToolOutput(**t) for t in result.tool_outputs],
+        answer=str(answer),
+        messages=[_serialize_message(m) for m in result.messages],
+        trace_id=trace_id,
+    )
+
+
+async def _admit(endpoint: str) -> Slot:
+    try:
+        return await admission.acquire(endpoint)
+    except Overloaded as exc:
+        logger.warning("Shedding %s request: %s", endpoint, exc.reason)
+        raise HTTPException(status_code=503, detail=str(exc), headers=exc.headers()) from exc
+
+
+async def _answer(query_text: str, trace_name: str = "POST /query") -> QueryResponse:
+    state = AgentState(messages=[HumanMessage(content=query_text)])
+    workflow = await aget_workflow()
+    with tracing.start_trace(trace_name, query=query_text) as root:
+        raw_result = await workflow.ainvoke(state)
+    result = _as_agent_state(raw_result)
+    logger.info("Response intent=%s tool=%s", result.intent, result.tool_used)
+    return _build_response(result, trace_id=root.trace_id if root else None)
+
+
 @app.post("/query", response_model=QueryResponse)
 async def query(req: QueryRequest) -> QueryResponse:
+    async with await _admit("query"):
+        started = time.perf_counter()
+        status = "error"
+        try:
+            logger.info("Incoming query: %s", req.query)
+            payload = await _answer(req.query)
+            status = "ok"
+            return payload
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.exception("Query processing failed")
+            raise HTTPException(status_code=500, detail=str(exc))
+        finally:
+            metrics.QUERY_SECONDS.observe(time.perf_counter() - started, endpoint="query", status=status)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _answer_token(chunk: Any) -> Optional[dict]:
+    message, metadata = chunk
+    tags = metadata.get("tags") or []
+    if not isinstance(message, AIMessageChunk) or not message.content or "answer" not in tags:
+        return None
+    label = next((t.split(":", 1)[1] for t in tags if t.startswith("intent:")), None)
+    return {"label": label, "content": message.content}
+
+
+async def _stream_events(query_text: str, slot: Optional[Slot] = None) -> AsyncIterator[str]:
+    """
+    Relay classification, per-intent tool outputs, answer tokens and the final payload as SSE events.
+    """
+    state = AgentState(messages=[HumanMessage(content=query_text)])
+    final_state: Any = None
+    started = time.perf_counter()
+    status = "error"
     try:
-        logger.info("Incoming query: %s", req.query)
-        state = AgentState(messages=[HumanMessage(content=req.query)])
-        raw_result = workflow.invoke(state)
-        result = _as_agent_state(raw_result)
-
-        answer_msg = next((m for m in reversed(result.messages) if isinstance(m, AIMessage)), None)
-        answer = answer_msg.content if answer_msg else ""
-
-        payload = QueryResponse(
-            intent=result.intent,
-            tool_used=result.tool_used,
-            tool_result=result.tool_result,
-            tool_outputs=[ToolOutput(**t) for t in result.tool_outputs],
-            answer=str(answer),
-            messages=[_serialize_message(m) for m in result.messages],
-        )
-        logger.info("Response intent=%s tool=%s", result.intent, result.tool_used)
-        return payload
+        workflow = await aget_workflow()
+        with tracing.start_trace("POST /query/stream", query=query_text) as root:
+            async for mode, chunk in workflow.astream(state, stream_mode=["custom", "messages", "values"]):
+                if mode == "custom":
+                    yield _sse(chunk.get("event", "progress"), chunk)
+                elif mode == "messages":
+                    token = _answer_token(chunk)
+                    if token:
+                        yield _sse("token", token)
+                elif mode == "values":
+                    final_state = chunk
+        result = _as_agent_state(final_state)
+        logger.info("Streamed response intent=%s tool=%s", result.intent, result.tool_used)
+        status = "ok"
+        yield _sse("done", _build_response(result, trace_id=root.trace_id if root else None).model_dump())
     except Exception as exc:  # pragma: no cover - defensive
-        logger.exception("Query processing failed")
-        raise HTTPException(status_code=500, detail=str(exc))
+        logger.exception("Streaming query failed")
+        yield _sse("error", {"detail": str(exc)})
+    finally:
+        metrics.QUERY_SECONDS.observe(time.perf_counter() - started, endpoint="query_stream", status=status)
+        if slot is not None:
+            slot.release()
+
+
+@app.post("/query/stream")
+async def query_stream(req: QueryRequest) -> StreamingResponse:
+    slot = await _admit("query_stream")
+    logger.info("Incoming streaming query: %s", req.query)
+    return StreamingResponse(
+        _stream_events(req.query, slot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # releases the slot if the client disconnects before the stream starts
+        background=BackgroundTask(slot.release),
+    )
+
+
+def _batch_runner(req: BatchQueryRequest) -> BatchRunner:
+    config = settings.config.batch
+    if len(req.queries) > config.max_queries:
+        raise HTTPException(status_code=413, detail=f"A batch holds at most {config.max_queries} queries")
+    concurrency = min(req.concurrency or config.concurrency, config.concurrency)
+    return BatchRunner([q.query for q in req.queries], _answer_batch_query, concurrency)
+
+
+async def _answer_batch_query(query_text: str) -> QueryResponse:
+    # each query is admitted like a /query request; when shed, only that item reports the error
+    async with await admission.acquire("query_batch"):
+        return await _answer(query_text, "POST /query/batch")
+
+
+def _batch_result(item: Any) -> BatchQueryResult:
+    return BatchQueryResult(index=item.index, query=item.query, response=item.response, error=item.error)
+
+
+async def _batch_lines(runner: BatchRunner) -> AsyncIterator[str]:
+    started = time.perf_counter()
+    status = "error"
+    try:
+        async for line in runner.ndjson():
+            yield line
+        status = "ok"
+    finally:
+        metrics.QUERY_SECONDS.observe(time.perf_counter() - started, endpoint="query_batch", status=status)
+
+
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def query_batch(req: BatchQueryRequest) -> Any:
+    """
+    Answer many queries in one request. With `stream`, results are sent as NDJSON lines
+    (application/x-ndjson) in input order as they complete, followed by a `{"summary": ...}` line.
+    Every query takes its own admission slot; an overloaded server fails the items it sheds.
+    Queries share tool calls and duplicate answers.
+    """
+    runner = _batch_runner(req)
+    logger.info("Incoming batch of %d queries", len(req.queries))
+    if req.stream:
+        return StreamingResponse(_batch_lines(runner), media_type="application/x-ndjson")
+    started = time.perf_counter()
+    status = "error"
+    try:
+        results = [_batch_result(item) async for item in runner.results()]
+        status = "ok"
+        return BatchQueryResponse(results=results, summary=runner.summary())
+    finally:
+        metrics.QUERY_SECONDS.observe(time.perf_counter() - started, endpoint="query_batch", status=status)
+
+
+def _symbols_param(symbols: str) -> List[str]:
+    return [s for s in symbols.replace(",", " ").split() if s]
+
+
+@app.get("/quotes")
+async def quotes_snapshot(symbols: str = "") -> dict:
+    try:
+        wanted = quote_service.normalize(_symbols_param(symbols)) if symbols else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    table = quote_service.table.snapshot(wanted, quote_service.exchange_suffix)
+    return {"quotes": [q.as_dict() for q in table]}
+
+
+async def _quote_events(symbols: List[str]) -> AsyncIterator[str]:
+    """
+    Relay a snapshot of the subscribed symbols, then each price change, as SSE events.
+    """
+    try:
+        listener = quote_service.listen(symbols)
+    except ValueError as exc:
+        yield _sse("error", {"detail": str(exc)})
+        return
+    try:
+        yield _sse("snapshot", {"quotes": listener.snapshot()})
+        while True:
+            try:
+                update = await asyncio.wait_for(listener.queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse("quote", update)
+    finally:
+        listener.close()
+
+
+@app.get("/quotes/stream")
+async def quotes_stream(symbols: str) -> StreamingResponse:
+    return StreamingResponse(
+        _quote_events(_symbols_param(symbols)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _ws_symbols(message: Any, key: str) -> List[str]:
+    """
+    The symbol list under `key` of a client message; raises ValueError for anything else.
+    """
+    if not isinstance(message, dict):
+        raise ValueError('Messages must be JSON objects such as {"subscribe": ["TCS"]}')
+    symbols = message.get(key) or []
+    if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+        raise ValueError(f'"{key}" must be a list of symbols')
+    return symbols
+
+
+@app.websocket("/quotes/ws")
+async def quotes_ws(websocket: WebSocket) -> None:
+    """
+    Send {"subscribe": [...]} or {"unsubscribe": [...]}; receive a snapshot per subscribe and quote updates.
+    """
+    await websocket.accept()
+    listener = quote_service.listen()
+
+    async def _push() -> None:
+        while True:
+            await websocket.send_json(await listener.queue.get())
+
+    pusher = asyncio.create_task(_push())
+    try:
+        while True:
+            try:
+                # ValueError covers malformed JSON and undecodable binary frames
+                message = await websocket.receive_json()
+                subscribe, unsubscribe = _ws_symbols(message, "subscribe"), _ws_symbols(message, "unsubscribe")
+                added = listener.subscribe(subscribe)
+                listener.unsubscribe(unsubscribe)
+            except ValueError as exc:
+                await websocket.send_json({"event": "error", "detail": str(exc)})
+                continue
+            if added:
+                await websocket.send_json({"event": "snapshot", "quotes": listener.snapshot(added)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        pusher.cancel()
+        listener.close()
 
 
-# Entry point for `uvicorn app.server.main:app --reload`
+# Entry point for `uvicorn app.server.main:app --reload`; `python -m app.server.launcher` for several workers
 __all__ = ["app"]
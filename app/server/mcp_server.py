@@ -9,6 +9,7 @@ from fastmcp import FastMCP
 from fastmcp.tools.tool import FunctionTool
 
 from app.config.settings import configure_logging, get_settings
+from app.tools import configure as configure_tools
 from app.tools import news, stock, weather
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,7 @@ logger = logging.getLogger(__name__)
 def create_server() -> FastMCP:
     settings = get_settings()
     configure_logging(settings.config.logging)
+    configure_tools(settings.config)
 
     server = FastMCP(
         name="india-multi-agent-tools",
@@ -25,6 +27,7 @@ def create_server() -> FastMCP:
     )
 
     server.add_tool(FunctionTool.from_function(weather.fetch_weather))
+    server.add_tool(FunctionTool.from_function(weather.fetch_weather_batch))
     server.add_tool(
         FunctionTool.from_function(
             lambda topic="india", feed_url=settings.config.defaults.news_feed, limit=settings.config.defaults.max_news: news.fetch_news(
@@ -43,6 +46,15 @@ def create_server() -> FastMCP:
             description="Fetch India stock price",
         )
     )
+    server.add_tool(
+        FunctionTool.from_function(
+            lambda symbols, exchange_suffix=settings.config.defaults.default_stock_suffix: stock.fetch_stocks(
+                symbols=symbols, exchange_suffix=exchange_suffix
+            ),
+            name="fetch_stocks",
+            description="Fetch India stock prices for a list of symbols in one batched call",
+        )
+    )
 
     return server
 
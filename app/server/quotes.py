@@ -0,0 +1,153 @@
+"""
+Live quote service: one shared poller for every subscribed symbol.
+
+Clients (WebSocket or SSE) subscribe to symbols; the service reference-counts
+subscriptions, refreshes the whole set with one batched yfinance download per
+interval, writes the results to the shared quote table and pushes changed
+prices to the listeners that follow those symbols.
+"""
+import asyncio
+import logging
+from collections import Counter
+from typing import Iterable, List, Optional, Set
+
+from app.config.settings import QuotesConfig
+from app.tools import quotes, stock
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteListener:
+    def __init__(self, service: "QuoteService", max_pending: int = 256):
+        self.service = service
+        self.symbols: Set[str] = set()
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def push(self, update: dict) -> None:
+        if self.queue.full():
+            # a slow client only needs the latest prices; drop its oldest pending update
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(update)
+
+    def subscribe(self, symbols: Iterable[str]) -> List[str]:
+        added = [s for s in self.service.normalize(symbols) if s not in self.symbols]
+        self.service.acquire(added)
+        self.symbols.update(added)
+        return added
+
+    def unsubscribe(self, symbols: Iterable[str]) -> List[str]:
+        removed = [s for s in self.service.normalize(symbols) if s in self.symbols]
+        self.symbols.difference_update(removed)
+        self.service.release(removed)
+        return removed
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None) -> List[dict]:
+        wanted = self.symbols if symbols is None else symbols
+        return [q.as_dict() for q in self.service.table.snapshot(wanted, self.service.exchange_suffix)]
+
+    def close(self) -> None:
+        self.unsubscribe(list(self.symbols))
+        self.service.listeners.discard(self)
+
+
+class QuoteService:
+    def __init__(self, config: QuotesConfig, exchange_suffix: str):
+        self.config = config
+        self.interval_s = config.interval_s
+        self.exchange_suffix = exchange_suffix
+        self.table = quotes.get_table()
+        self.listeners: Set[QuoteListener] = set()
+        self._refs: Counter = Counter()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.poll_errors = 0
+
+    def normalize(self, symbols: Iterable[str]) -> List[str]:
+        """
+        Master tickers for `symbols`; raises ValueError for names the symbol master cannot resolve.
+        """
+        resolved = (stock._resolve_symbol(s, self.exchange_suffix).symbol for s in symbols if s and s.strip())
+        return list(dict.fromkeys(resolved))
+
+    def acquire(self, symbols: List[str]) -> None:
+        new = [s for s in symbols if not self._refs[s]]
+        if len(self._refs) + len(new) > self.config.max_symbols:
+            raise ValueError(f"Quote service is limited to {self.config.max_symbols} symbols")
+        self._refs.update(symbols)
+        if new and self._wake is not None:
+            # poll right away so new subscribers do not wait a full interval for their first quote
+            self._wake.set()
+
+    def release(self, symbols: List[str]) -> None:
+        unused = []
+        for symbol in symbols:
+            self._refs[symbol] -= 1
+            if self._refs[symbol] <= 0:
+                del self._refs[symbol]
+                unused.append(symbol)
+        self.table.discard(unused, self.exchange_suffix)
+
+    def listen(self, symbols: Iterable[str] = ()) -> QuoteListener:
+        listener = QuoteListener(self)
+        listener.subscribe(symbols)
+        self.listeners.add(listener)
+        return listener
+
+    async def poll_once(self) -> int:
+        symbols = list(self._refs)
+        if not symbols:
+            return 0
+        self.polls += 1
+        try:
+            changed = await asyncio.to_thread(stock.refresh_quotes, symbols, self.exchange_suffix)
+        except Exception as exc:
+            self.poll_errors += 1
+            logger.warning("Quote poll for %d symbols failed: %s", len(symbols), exc)
+            return 0
+        for quote in changed:
+            update = {"event": "quote", **quote.as_dict()}
+            for listener in self.listeners:
+                if quote.symbol in listener.symbols:
+                    listener.push(update)
+        return len(changed)
+
+    async def _run(self) -> None:
+        while True:
+            await self.poll_once()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._task is not None or not self.config.enabled:
+            return
+        self._wake = asyncio.Event()
+        # entries a couple of intervals old still count as live for fetch_stock
+        quotes.set_max_age(2 * self.interval_s)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        quotes.set_max_age(0)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.config.enabled,
+            "interval_s": self.interval_s,
+            "symbols": sorted(self._refs),
+            "listeners": len(self.listeners),
+            "polls": self.polls,
+            "poll_errors": self.poll_errors,
+            "table": self.table.stats(),
+        }
@@ -1,3 +1,35 @@
 """
 Tool package exposing MCP-compatible tools used by the orchestrator.
+
+Tool modules import their heavy dependencies (yfinance/pandas, feedparser,
+BeautifulSoup) on first use; `preload` loads them ahead of time.
 """
+import importlib
+
+from app.config.settings import AppConfig
+
+_HEAVY_MODULES = ("app.tools.weather", "app.tools.news", "app.tools.stock", "feedparser", "bs4", "yfinance")
+
+
+def configure(config: AppConfig) -> None:
+    """
+    Apply config to the process-wide tool infrastructure (HTTP pool, rate limits and breakers,
+    caches, symbol master, replay).
+    """
+    from app.tools import cache, geocache, http_pool, news, replay, resilience, symbol_master
+
+    http_pool.configure(config.defaults)
+    resilience.configure(config.resilience)
+    geocache.configure(config.defaults)
+    news.configure(config.defaults)
+    symbol_master.configure(config.defaults)
+    cache.configure(config.cache)
+    replay.configure(config.replay)
+
+
+def preload() -> None:
+    """
+    Import every tool module and the heavy libraries behind them, e.g. before forking workers.
+    """
+    for name in _HEAVY_MODULES:
+        importlib.import_module(name)
@@ -0,0 +1,499 @@
+"""
+TTL result cache for tool functions with stale-while-revalidate.
+
+Each tool gets a namespace with its own TTL. Within the TTL a hit is served
+directly; for `stale_ttl` seconds after expiry the stale value is still served
+while a single background refresh runs. Older entries (up to `stale_if_error`
+past expiry) are only used when the upstream call fails, so an outage or an
+open circuit breaker degrades to old data instead of an error. Storage is pluggable through
+`CacheBackend`: the default keeps a size-bounded LRU in process memory; the
+`sqlite` (a file in a private per-user directory on /dev/shm when available)
+and `redis` backends are shared by every worker process of a multi-process
+deployment. Shared entries are stored as JSON, never pickled: pydantic results
+are rebuilt only as models returned by a `cached` tool function.
+"""
+import asyncio
+import functools
+import importlib.util
+import inspect
+import json
+import logging
+import math
+import os
+import sqlite3
+import stat
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Type
+
+from pydantic import BaseModel
+
+from app.config.settings import CacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+
+
+# result models of `cached` tool functions, the only classes a shared entry may decode to
+_models: Dict[str, Type[BaseModel]] = {}
+
+# errors from decoding a corrupt, foreign or outdated shared entry (pydantic's ValidationError is a ValueError)
+_DECODE_ERRORS = (ValueError, KeyError, TypeError)
+
+
+def _register_model(fn: Callable) -> None:
+    model = inspect.signature(fn).return_annotation
+    if inspect.isclass(model) and issubclass(model, BaseModel):
+        _models[model.__name__] = model
+
+
+def encode_value(value: Any) -> str:
+    """
+    JSON for a shared backend: pydantic models are tagged with their class name, anything else must be plain JSON.
+    """
+    if isinstance(value, BaseModel):
+        return json.dumps({"model": type(value).__name__, "value": value.model_dump(mode="json")})
+    return json.dumps({"value": value})
+
+
+def decode_value(payload: Any) -> Any:
+    data = json.loads(payload)
+    name = data.get("model")
+    if name is None:
+        return data["value"]
+    model = _models.get(name)
+    if model is None:
+        raise KeyError(f"unknown cached model {name!r}")
+    return model.model_validate(data["value"])
+
+
+class CacheBackend:
+    """
+    Minimal storage interface used by ToolCache.
+    """
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "evictions": self.evictions}
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    JSON-encoded entries in a SQLite table shared across processes. Each process opens its own
+    connection on first use, so a backend created before fork() is safe in the workers.
+    Every `_PRUNE_EVERY` writes, entries past `max_age` and beyond `max_entries` (oldest first) are dropped.
+    """
+
+    _PRUNE_EVERY = 64
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 1024, max_age: float = 3600.0):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.errors = 0
+        self._writes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            # a cache can lose its last writes on power loss; skip the fsyncs
+            db.execute("PRAGMA synchronous=OFF")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache (namespace TEXT NOT NULL, key TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, value TEXT NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS tool_cache_age ON tool_cache (namespace, stored_at)")
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with self._lock:
+                row = self._conn().execute(
+                    "SELECT stored_at, value FROM tool_cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+                ).fetchone()
+            return CacheEntry(value=decode_value(row[1]), stored_at=row[0]) if row else None
+        except (sqlite3.Error,) + _DECODE_ERRORS:
+            self.errors += 1
+            logger.warning("Shared cache read failed for %s", key, exc_info=True)
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        try:
+            payload = encode_value(entry.value)
+            with self._lock:
+                db = self._conn()
+                db.execute(
+                    "INSERT OR REPLACE INTO tool_cache (namespace, key, stored_at, value) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, entry.stored_at, payload),
+                )
+                self._writes += 1
+                if self._writes % self._PRUNE_EVERY == 0:
+                    self._prune(db)
+        except (sqlite3.Error, TypeError, ValueError):
+            self.errors += 1
+            logger.warning("Shared cache write failed for %s", key, exc_info=True)
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        db.execute(
+            "DELETE FROM tool_cache WHERE namespace = ? AND stored_at < ?", (self.namespace, time.time() - self.max_age)
+        )
+        db.execute(
+            "DELETE FROM tool_cache WHERE namespace = ? AND key IN (SELECT key FROM tool_cache WHERE namespace = ?"
+            " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries),
+        )
+
+    def stats(self) -> dict:
+        try:
+            with self._lock:
+                (entries,) = self._conn().execute(
+                    "SELECT COUNT(*) FROM tool_cache WHERE namespace = ?", (self.namespace,)
+                ).fetchone()
+        except sqlite3.Error:
+            entries = None
+        return {"backend": "sqlite", "entries": entries, "errors": self.errors}
+
+
+class RedisBackend(CacheBackend):
+    """
+    JSON-encoded entries in Redis (or any server speaking its protocol), expiring after `max_age`.
+    redis-py rebuilds its connection pool in a forked child, so one backend serves every worker.
+    Connection errors count as misses so the tools keep working without the server.
+    """
+
+    def __init__(self, url: str, namespace: str, max_age: float = 3600.0):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._errors = (redis.RedisError,)
+        self.prefix = f"tool_cache:{namespace}:"
+        self.max_age = max(1, math.ceil(max_age))
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            raw = self._client.get(self.prefix + key)
+            if raw is None:
+                return None
+            stored_at, payload = raw.split(b" ", 1)
+            return CacheEntry(value=decode_value(payload), stored_at=float(stored_at))
+        except self._errors + _DECODE_ERRORS:
+            self.errors += 1
+            logger.warning("Shared cache read failed for %s", key, exc_info=True)
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        try:
+            payload = f"{entry.stored_at!r} {encode_value(entry.value)}"
+            self._client.set(self.prefix + key, payload, ex=self.max_age)
+        except self._errors + (TypeError, ValueError):
+            self.errors += 1
+            logger.warning("Shared cache write failed for %s", key, exc_info=True)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+
+class ToolCache:
+    def __init__(self, name: str, ttl: float, stale_ttl: float, backend: CacheBackend, stale_if_error: float = 0.0):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stale_if_error = stale_if_error
+        self.backend = backend
+        self.hits = 0
+        self.stale_hits = 0
+        self.error_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _lookup(self, key: str) -> tuple:
+        """
+        (entry, stale, fallback): `fallback` is an expired entry to serve only if the upstream call fails.
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False, None
+        age = time.time() - entry.stored_at
+        if age <= self.ttl:
+            self.hits += 1
+            return entry, False, None
+        if age <= self.ttl + self.stale_ttl:
+            self.stale_hits += 1
+            return entry, True, None
+        self.misses += 1
+        return None, False, entry if age <= self.ttl + self.stale_if_error else None
+
+    def _serve_fallback(self, key: str, fallback: CacheEntry, exc: Exception) -> Any:
+        self.error_hits += 1
+        logger.warning(
+            "Serving %s from cache %.0fs old after upstream error: %s", key, time.time() - fallback.stored_at, exc
+        )
+        return fallback.value
+
+    def _store(self, key: str, value: Any) -> None:
+        self.backend.set(key, CacheEntry(value=value, stored_at=time.time()))
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    def _refresh(self, key: str, fn: Callable[[], Any]) -> None:
+        try:
+            self._store(key, fn())
+            self.refreshes += 1
+        except Exception:
+            self.refresh_errors += 1
+            logger.warning("Background refresh failed for %s", key, exc_info=True)
+        finally:
+            self._release_refresh(key)
+
+    async def _arefresh(self, key: str, afn: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            self._store(key, await afn())
+            self.refreshes += 1
+        except Exception:
+            self.refresh_errors += 1
+            logger.warning("Background refresh failed for %s", key, exc_info=True)
+        finally:
+            self._release_refresh(key)
+
+    def call(self, key: str, fn: Callable[[], Any]) -> Any:
+        entry, stale, fallback = self._lookup(key)
+        if entry is not None:
+            if stale and self._claim_refresh(key):
+                _refresh_pool.submit(self._refresh, key, fn)
+            return entry.value
+        try:
+            value = fn()
+        except Exception as exc:
+            if fallback is None:
+                raise
+            return self._serve_fallback(key, fallback, exc)
+        self._store(key, value)
+        return value
+
+    async def acall(self, key: str, afn: Callable[[], Awaitable[Any]]) -> Any:
+        entry, stale, fallback = self._lookup(key)
+        if entry is not None:
+            if stale and self._claim_refresh(key):
+                task = asyncio.create_task(self._arefresh(key, afn))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry.value
+        try:
+            value = await afn()
+        except Exception as exc:
+            if fallback is None:
+                raise
+            return self._serve_fallback(key, fallback, exc)
+        self._store(key, value)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "error_hits": self.error_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            **self.backend.stats(),
+        }
+
+
+BackendFactory = Callable[[str, CacheConfig], CacheBackend]
+
+
+def _memory_backend(name: str, config: CacheConfig) -> CacheBackend:
+    return MemoryBackend(config.max_entries)
+
+
+def _private_dir(path: Path) -> bool:
+    """
+    Create `path` with mode 0700 if needed; True only if it is a real directory owned by this user
+    that nobody else can access, so the cache file in it cannot be read or planted by another user.
+    """
+    try:
+        path.mkdir(mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+def shared_cache_path(config: CacheConfig) -> str:
+    if config.path:
+        return config.path
+    # /dev/shm is RAM-backed on Linux: shared between processes without touching disk. It is
+    # world-writable, so the file goes in a directory only this user can open
+    shm = Path("/dev/shm")
+    if shm.is_dir():
+        private = shm / f"india-agent-{os.getuid()}"
+        if _private_dir(private):
+            return str(private / "tool_cache.sqlite3")
+        logger.warning("%s is not a private directory owned by this user; using cache/ instead", private)
+    return "cache/tool_cache.sqlite3"
+
+
+def _max_age(name: str, config: CacheConfig) -> float:
+    return config.ttl.get(name, 60.0) + max(config.stale_ttl, config.stale_if_error)
+
+
+def _sqlite_backend(name: str, config: CacheConfig) -> CacheBackend:
+    return SQLiteBackend(shared_cache_path(config), name, config.max_entries, _max_age(name, config))
+
+
+def _redis_backend(name: str, config: CacheConfig) -> CacheBackend:
+    return RedisBackend(config.redis_url, name, _max_age(name, config))
+
+
+def redis_available() -> bool:
+    return importlib.util.find_spec("redis") is not None
+
+
+def backend_factory_for(config: CacheConfig) -> BackendFactory:
+    """
+    The backend factory selected by `config.backend`; redis falls back to sqlite when redis-py is missing.
+    """
+    if config.backend == "redis":
+        if redis_available():
+            return _redis_backend
+        logger.warning("cache.backend is redis but the redis package is not installed; using sqlite")
+        return _sqlite_backend
+    if config.backend == "sqlite":
+        return _sqlite_backend
+    return _memory_backend
+
+
+_caches: Dict[str, ToolCache] = {}
+
+
+def configure(config: CacheConfig, backend_factory: Optional[BackendFactory] = None) -> None:
+    _caches.clear()
+    if not config.enabled:
+        return
+    backend_factory = backend_factory or backend_factory_for(config)
+    for name, ttl in config.ttl.items():
+        _caches[name] = ToolCache(name, ttl, config.stale_ttl, backend_factory(name, config), config.stale_if_error)
+
+
+def get_tool_cache(name: str) -> Optional[ToolCache]:
+    return _caches.get(name)
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def _normalize_arg(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple)):
+        return [_normalize_arg(v) for v in value]
+    return value
+
+
+def make_key(name: str, fn: Callable, args: tuple, kwargs: dict) -> str:
+    bound = inspect.signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+    normalized = {k: _normalize_arg(v) for k, v in bound.arguments.items()}
+    return f"{name}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+def cached(name: str) -> Callable:
+    """
+    Route calls through the `name` cache namespace when it is configured.
+    Sync and async tool variants with the same signature share entries.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        _register_model(fn)
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                cache = get_tool_cache(name)
+                if cache is None:
+                    return await fn(*args, **kwargs)
+                key = make_key(name, fn, args, kwargs)
+                return await cache.acall(key, lambda: fn(*args, **kwargs))
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache = get_tool_cache(name)
+            if cache is None:
+                return fn(*args, **kwargs)
+            key = make_key(name, fn, args, kwargs)
+            return cache.call(key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
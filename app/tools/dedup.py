@@ -0,0 +1,83 @@
+"""
+Near-duplicate detection for short texts (news headlines) with bottom-k MinHash.
+
+The same story usually reaches several sources with small edits ("Sensex
+jumps 500 pts as IT rallies" / "Sensex jumps 500 points as IT stocks rally"),
+so exact matching misses it. Each text is reduced to word-bigram shingles and
+summarized by the `k` smallest shingle hashes (one hash per shingle rather
+than one per permutation, so a signature costs a few microseconds). Sketches
+estimate Jaccard similarity, from which containment (overlap relative to the
+shorter text) is derived; containment also catches a headline that another
+source extended with a suffix.
+"""
+import re
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, FrozenSet, Optional, Set
+
+# \w alone splits Indic words at their vowel signs (combining marks), so the
+# combining diacritics and the Devanagari..Sinhala blocks (minus the danda
+# punctuation) count as word characters too
+_WORD = re.compile(r"[\w\u0300-\u036f\u0900-\u0963\u0966-\u0dff]+")
+
+
+def shingles(text: str, k: int = 2) -> Set[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + k]) for i in range(len(words) - k + 1)}
+
+
+@dataclass(frozen=True)
+class Sketch:
+    size: int
+    hashes: FrozenSet[int]
+
+
+def sketch(items: Set[str], k: int = 64) -> Sketch:
+    hashes = sorted(zlib.crc32(item.encode("utf-8")) for item in items)
+    return Sketch(size=len(items), hashes=frozenset(hashes[:k]))
+
+
+def jaccard(left: Sketch, right: Sketch, k: int = 64) -> float:
+    union_k = sorted(left.hashes | right.hashes)[:k]
+    if not union_k:
+        return 0.0
+    both = left.hashes & right.hashes
+    return sum(1 for h in union_k if h in both) / len(union_k)
+
+
+def containment(left: Sketch, right: Sketch, k: int = 64) -> float:
+    smaller = min(left.size, right.size)
+    if not smaller or left.hashes.isdisjoint(right.hashes):
+        return 0.0
+    j = jaccard(left, right, k)
+    # |A ∩ B| = J * |A ∪ B| and |A ∪ B| = (|A| + |B|) / (1 + J)
+    return j * (left.size + right.size) / (1 + j) / smaller
+
+
+class NearDuplicateFilter:
+    """
+    Keeps sketches of accepted texts; `add` rejects a text whose containment
+    with an accepted one reaches `threshold`. A text without any words has
+    nothing to compare and is let through unrecorded. With `window`, only the
+    most recent accepted texts are compared, bounding the cost for long streams.
+    """
+
+    def __init__(self, threshold: float = 0.6, k: int = 64, window: Optional[int] = None):
+        self.threshold = threshold
+        self.k = k
+        self._seen: Deque[Sketch] = deque(maxlen=window)
+
+    def add(self, text: str) -> bool:
+        sig = sketch(shingles(text), self.k)
+        if not sig.size:
+            return True
+        if any(containment(sig, other, self.k) >= self.threshold for other in self._seen):
+            return False
+        self._seen.append(sig)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._seen)
@@ -0,0 +1,138 @@
+"""
+Streaming parsers for news pages and feeds, used when lxml is installed.
+
+Both parsers feed the document to an lxml pull parser in chunks and stop as
+soon as `limit` items are complete, so the rest of a page is never tokenized.
+They return plain `(title, content, published)` tuples; callers build their
+own models. A document these parsers cannot handle raises `FastParseError`
+and the caller falls back to BeautifulSoup / feedparser.
+"""
+import html
+import importlib.util
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, List, Optional, Tuple
+
+_CHUNK = 16 * 1024
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+ParsedItem = Tuple[str, str, Optional[str]]
+
+
+class FastParseError(ValueError):
+    pass
+
+
+def available() -> bool:
+    return importlib.util.find_spec("lxml") is not None
+
+
+def _chunks(data: bytes) -> Iterator[bytes]:
+    for start in range(0, len(data), _CHUNK):
+        yield data[start : start + _CHUNK]
+
+
+def _classes(element) -> List[str]:
+    return (element.get("class") or "").split()
+
+
+def _text(element) -> str:
+    return _SPACES.sub(" ", "".join(element.itertext())).strip()
+
+
+def parse_duckduckgo(page: bytes, limit: int) -> List[ParsedItem]:
+    """
+    Titles and snippets of DuckDuckGo HTML results (`div.result` blocks), stopping after `limit`.
+    """
+    from lxml import etree
+
+    parser = etree.HTMLPullParser(events=("end",), tag=("a", "div"))
+    items: List[ParsedItem] = []
+    title = snippet = ""
+    for chunk in _chunks(page):
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            classes = _classes(element)
+            if "result__a" in classes:
+                title = _text(element)
+            elif "result__snippet" in classes:
+                snippet = _text(element)
+            elif element.tag == "div" and "result" in classes:
+                if title:
+                    items.append((title, snippet or title, None))
+                title = snippet = ""
+                element.clear()
+                if len(items) >= limit:
+                    return items
+    parser.close()
+    return items
+
+
+def _utc(moment: datetime) -> str:
+    # naive UTC, like feedparser's published_parsed; a date without an offset is taken as UTC
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def _iso(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return _utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return _utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+def _plain(value: Optional[str]) -> str:
+    # feed descriptions often carry escaped HTML (links, fonts); keep the readable text only
+    if not value:
+        return ""
+    return _SPACES.sub(" ", html.unescape(_TAGS.sub(" ", value))).strip()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def parse_feed(document: bytes, limit: Optional[int] = None) -> List[ParsedItem]:
+    """
+    Entries of an RSS 2.0 or Atom feed, stopping after `limit` (all entries when None).
+    """
+    from lxml import etree
+
+    parser = etree.XMLPullParser(events=("start", "end"), resolve_entities=False, no_network=True)
+    items: List[ParsedItem] = []
+    fields: dict = {}
+    try:
+        for chunk in _chunks(document):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                name = _local(element.tag)
+                if event == "start":
+                    if name in ("item", "entry"):
+                        # drop channel-level title/description seen before the first entry
+                        fields = {}
+                    continue
+                if name in ("item", "entry"):
+                    if fields.get("title"):
+                        summary = fields.get("description") or fields.get("summary") or fields.get("content")
+                        published = fields.get("pubDate") or fields.get("published") or fields.get("updated")
+                        items.append((_plain(fields["title"]), _plain(summary), _iso(published)))
+                    fields = {}
+                    element.clear()
+                    if limit is not None and len(items) >= limit:
+                        return items
+                elif name in ("title", "description", "summary", "content", "pubDate", "published", "updated"):
+                    fields.setdefault(name, element.text or "")
+        parser.close()
+    except etree.XMLSyntaxError as exc:
+        if not items:
+            raise FastParseError(str(exc)) from exc
+    return items
@@ -0,0 +1,121 @@
+"""
+Two-tier geocode cache for the weather tool: an in-memory LRU in front of a
+SQLite table that survives restarts. Coordinates never change, so entries
+have no TTL.
+"""
+import csv
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.config.settings import DefaultsConfig
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_CITIES = Path(__file__).parent / "data" / "indian_cities.csv"
+
+
+class GeocodeCache:
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            db_path = Path(path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+            self._db.commit()
+
+    @staticmethod
+    def key(city: str, country: str) -> str:
+        return f"{city.strip().lower()}|{country.strip().lower()}"
+
+    def _remember(self, key: str, geo: dict) -> None:
+        self._memory[key] = geo
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, city: str, country: str) -> Optional[dict]:
+        key = self.key(city, country)
+        with self._lock:
+            geo = self._memory.get(key)
+            if geo is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return geo
+            if self._db is not None:
+                row = self._db.execute("SELECT payload FROM geocode WHERE key = ?", (key,)).fetchone()
+                if row:
+                    geo = json.loads(row[0])
+                    self._remember(key, geo)
+                    self.disk_hits += 1
+                    return geo
+            self.misses += 1
+            return None
+
+    def put(self, city: str, country: str, geo: dict) -> None:
+        self.put_many([(city, country, geo)])
+
+    def put_many(self, entries: List[Tuple[str, str, dict]]) -> None:
+        rows = [(self.key(city, country), geo) for city, country, geo in entries]
+        with self._lock:
+            for key, geo in rows:
+                self._remember(key, geo)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO geocode (key, payload) VALUES (?, ?)",
+                    [(key, json.dumps(geo)) for key, geo in rows],
+                )
+                self._db.commit()
+
+    def prewarm(self, csv_path: Path = BUNDLED_CITIES, country: str = "India") -> int:
+        """
+        Seed the cache from a CSV with name/admin1/latitude/longitude columns.
+        """
+        entries = []
+        with csv_path.open("r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                geo = {
+                    "name": row["name"],
+                    "admin1": row.get("admin1"),
+                    "country": country,
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                }
+                entries.append((row["name"], country, geo))
+        self.put_many(entries)
+        logger.info("Prewarmed geocode cache with %d cities", len(entries))
+        return len(entries)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "persistent": self._db is not None,
+        }
+
+
+_cache = GeocodeCache()
+
+
+def configure(config: DefaultsConfig) -> None:
+    global _cache
+    _cache = GeocodeCache(config.geocode_cache_path, config.geocode_cache_size)
+    if config.geocode_prewarm:
+        _cache.prewarm()
+
+
+def get_cache() -> GeocodeCache:
+    return _cache
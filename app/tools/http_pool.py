@@ -0,0 +1,265 @@
+"""
+Process-wide pooled HTTP clients shared by all tools.
+
+Sync callers go through one `requests.Session` (urllib3 keep-alive pools with
+per-host limits and retries); async callers share one `httpx.AsyncClient` per
+event loop, negotiating HTTP/2 when the optional `h2` package is installed.
+Every live request passes the host's rate limit and circuit breaker
+(app/tools/resilience.py) first.
+"""
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Collection, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config.settings import DefaultsConfig
+from app.observability import tracing
+from app.observability.metrics import UPSTREAM_ERRORS, UPSTREAM_SECONDS
+from app.tools import replay, resilience
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_config = DefaultsConfig()
+_session: Optional[requests.Session] = None
+_async_pools: Dict[asyncio.AbstractEventLoop, "_AsyncPool"] = {}
+_requests_by_host: Counter = Counter()
+_errors_by_host: Counter = Counter()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class _AsyncPool:
+    def __init__(self, config: DefaultsConfig):
+        self.http2 = config.http2 and _http2_available()
+        limits = httpx.Limits(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_connections,
+        )
+        transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=limits, retries=config.http_retries)
+        self.client = httpx.AsyncClient(transport=transport, timeout=config.http_timeout, follow_redirects=True)
+        self.per_host = config.http_max_connections_per_host
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self.semaphores.get(host)
+        if sem is None:
+            sem = self.semaphores[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+
+def configure(config: DefaultsConfig) -> None:
+    """
+    Apply pool settings from config. Existing clients are dropped so the next call rebuilds them.
+    """
+    global _config, _session
+    with _lock:
+        _config = config
+        if _session is not None:
+            _session.close()
+        _session = None
+        _async_pools.clear()
+
+
+def _build_session(config: DefaultsConfig) -> requests.Session:
+    retry = Retry(
+        total=config.http_retries,
+        # a read timeout means the upstream is hung: retrying it multiplies the stall before the
+        # circuit breaker sees a single failure, so leave it to the breaker and stale-if-error
+        read=0,
+        backoff_factor=0.2,
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.http_max_connections,
+        pool_maxsize=config.http_max_connections_per_host,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session(_config)
+    return _session
+
+
+def _get_async_pool() -> _AsyncPool:
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        with _lock:
+            for stale in [lp for lp in _async_pools if lp.is_closed()]:
+                del _async_pools[stale]
+            pool = _async_pools[loop] = _AsyncPool(_config)
+    return pool
+
+
+def get_async_client() -> httpx.AsyncClient:
+    return _get_async_pool().client
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _record_error(host: str, kind: str) -> None:
+    _errors_by_host[host] += 1
+    UPSTREAM_ERRORS.inc(host=host, kind=kind)
+
+
+def _span_attributes(method: str, url: str, host: str) -> Dict[str, Any]:
+    return {"http.request.method": method, "server.address": host, "url.path": urlsplit(url).path}
+
+
+def _record_status(
+    span: Optional[tracing.Span], host: str, status_code: int, failure_statuses: Collection[int] = ()
+) -> None:
+    if span is not None:
+        span.set_attribute("http.response.status_code", status_code)
+    resilience.record_status(host, status_code, failure_statuses)
+    if status_code >= 500:
+        _record_error(host, "status_5xx")
+        if span is not None:
+            span.status = "error"
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    timeout: Optional[float] = None,
+    failure_statuses: Collection[int] = (),
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    `failure_statuses` are responses the caller treats as a failed call (e.g. a block page);
+    they count against the host's circuit breaker like 5xx and 429 do.
+    """
+    host = _host(url)
+    resilience.before_call(host)
+    _requests_by_host[host] += 1
+    with tracing.span(f"HTTP {method}", **_span_attributes(method, url, host)) as span:
+        started = time.perf_counter()
+        try:
+            resp = get_session().request(method, url, timeout=timeout or _config.http_timeout, **kwargs)
+        except requests.RequestException:
+            _record_error(host, "exception")
+            resilience.record_failure(host)
+            raise
+        except BaseException:
+            # the call failed on our side (bad arguments, interrupted); do not hold the half-open probe
+            resilience.release_probe(host)
+            raise
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, host=host)
+        _record_status(span, host, resp.status_code, failure_statuses)
+    return resp
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    params = kwargs.get("params")
+    replayed = replay.replay_response("GET", url, params)
+    if replayed is not None:
+        return replayed
+    resp = request("GET", url, **kwargs)
+    replay.record_response("GET", url, params, resp.status_code, resp.headers, resp.content)
+    return resp
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+async def arequest(
+    method: str,
+    url: str,
+    *,
+    timeout: Optional[float] = None,
+    failure_statuses: Collection[int] = (),
+    **kwargs: Any,
+) -> httpx.Response:
+    pool = _get_async_pool()
+    host = _host(url)
+    await resilience.abefore_call(host)
+    _requests_by_host[host] += 1
+    with tracing.span(f"HTTP {method}", **_span_attributes(method, url, host)) as span:
+        try:
+            async with pool.semaphore(host):
+                # time the upstream call only, not the wait for a per-host slot
+                with UPSTREAM_SECONDS.time(host=host):
+                    resp = await pool.client.request(method, url, timeout=timeout or _config.http_timeout, **kwargs)
+        except httpx.HTTPError:
+            _record_error(host, "exception")
+            resilience.record_failure(host)
+            raise
+        except BaseException:
+            # includes cancellation while waiting for a per-host slot
+            resilience.release_probe(host)
+            raise
+        _record_status(span, host, resp.status_code, failure_statuses)
+    return resp
+
+
+async def aget(url: str, **kwargs: Any) -> httpx.Response:
+    params = kwargs.get("params")
+    replayed = replay.areplay_response("GET", url, params)
+    if replayed is not None:
+        return replayed
+    resp = await arequest("GET", url, **kwargs)
+    replay.record_response("GET", url, params, resp.status_code, resp.headers, resp.content)
+    return resp
+
+
+def pool_stats() -> dict:
+    """
+    Snapshot of request counters and live urllib3 pools (connections opened vs requests served).
+    """
+    sync_pools = []
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                sync_pools.append(
+                    {
+                        "host": pool.host,
+                        "connections_opened": pool.num_connections,
+                        "requests": pool.num_requests,
+                        "idle": pool.pool.qsize() if pool.pool is not None else 0,
+                    }
+                )
+    return {
+        "requests_by_host": dict(_requests_by_host),
+        "errors_by_host": dict(_errors_by_host),
+        "sync_pools": sync_pools,
+        "async_clients": len(_async_pools),
+        "http2": _config.http2 and _http2_available(),
+        "timeout_s": _config.http_timeout,
+        "retries": _config.http_retries,
+        "max_connections_per_host": _config.http_max_connections_per_host,
+    }
@@ -1,14 +1,41 @@
+import asyncio
+import contextvars
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional
+from urllib.parse import urlsplit
 
-import feedparser
-import requests
-from bs4 import BeautifulSoup
 from pydantic import BaseModel, Field, ValidationError
 
+from app.config.settings import DefaultsConfig
+from app.tools import fast_parse, http_pool, resilience
+from app.tools.cache import cached
+from app.tools.dedup import NearDuplicateFilter
+from app.tools.news_store import FeedPoller, NewsStore
+from app.tools.singleflight import coalesced
+
 logger = logging.getLogger(__name__)
 
+_extra_feeds: List[str] = []
+_deadline_s = 2.0
+_source_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="news-source")
+_config = DefaultsConfig()
+_fast_parse = fast_parse.available()
+_poller: Optional[FeedPoller] = None
+# fewer indexed hits than this (or `limit`, if smaller) and the query goes to the live sources
+_MIN_STORE_HITS = 3
+
+
+def configure(config: DefaultsConfig) -> None:
+    global _extra_feeds, _deadline_s, _config, _fast_parse
+    _config = config
+    _extra_feeds = list(config.news_extra_feeds)
+    _deadline_s = config.news_deadline_s
+    _fast_parse = config.news_fast_parse and fast_parse.available()
+
 
 class NewsItem(BaseModel):
     title: str
@@ -69,13 +96,20 @@ HEADERS = {
 }
 
 
-def _scrape_duckduckgo(topic: str, limit: int) -> list[NewsItem]:
-    query = f"{topic} India news"
-    url = "https://duckduckgo.com/html/"
-    resp = requests.get(url, params={"q": query, "kl": "in-en"}, headers=HEADERS, timeout=10)
-    resp.raise_for_status()
+_DUCKDUCKGO_URL = "https://duckduckgo.com/html/"
+_DUCKDUCKGO_HOST = urlsplit(_DUCKDUCKGO_URL).netloc
+# a blocked client gets a 202 captcha page or a 403 instead of results; both count against the breaker
+_DUCKDUCKGO_BLOCKED = (202, 403)
+
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+def _duckduckgo_params(topic: str) -> dict:
+    return {"q": f"{topic} India news", "kl": "in-en"}
+
+
+def _parse_duckduckgo(html: str, limit: int) -> list[NewsItem]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
     results: list[NewsItem] = []
     for result in soup.select("div.result"):
         if len(results) >= limit:
@@ -102,29 +136,329 @@ def _scrape_duckduckgo(topic: str, limit: int) -> list[NewsItem]:
     return results
 
 
+def _fast_items(parsed: List[fast_parse.ParsedItem]) -> list[NewsItem]:
+    # fields come out of the parser as plain strings, so skip re-validating them
+    return [NewsItem.model_construct(title=t, content=_trim(c), published=p, source=None) for t, c, p in parsed]
+
+
+def _parse_results_page(resp, limit: int) -> list[NewsItem]:
+    if _fast_parse:
+        try:
+            return _fast_items(fast_parse.parse_duckduckgo(resp.content, limit))
+        except Exception:
+            logger.debug("Fast DuckDuckGo parse failed, using BeautifulSoup", exc_info=True)
+    return _parse_duckduckgo(resp.text, limit)
+
+
+def _check_duckduckgo(resp) -> None:
+    if resp.status_code in _DUCKDUCKGO_BLOCKED:
+        raise ValueError(f"DuckDuckGo blocked the request (HTTP {resp.status_code})")
+    resp.raise_for_status()
+
+
+def _scrape_duckduckgo(topic: str, limit: int) -> list[NewsItem]:
+    resp = http_pool.get(
+        _DUCKDUCKGO_URL, params=_duckduckgo_params(topic), headers=HEADERS, failure_statuses=_DUCKDUCKGO_BLOCKED
+    )
+    _check_duckduckgo(resp)
+    return _parse_results_page(resp, limit)
+
+
+async def _ascrape_duckduckgo(topic: str, limit: int) -> list[NewsItem]:
+    resp = await http_pool.aget(
+        _DUCKDUCKGO_URL, params=_duckduckgo_params(topic), headers=HEADERS, failure_statuses=_DUCKDUCKGO_BLOCKED
+    )
+    _check_duckduckgo(resp)
+    return _parse_results_page(resp, limit)
+
+
+def _feed_url(topic: str, feed_url: str) -> str:
+    if topic and topic.lower() != "india":
+        return f"https://news.google.com/rss/search?q={topic}+India&hl=en-IN&gl=IN&ceid=IN:en"
+    return feed_url
+
+
+def _feed_result(feed, url: str, limit: int) -> NewsResult:
+    if feed.bozo:
+        raise ValueError(f"Failed to parse feed: {feed.bozo_exception}")
+
+    items = _parse_entries(feed, limit)
+    return NewsResult(count=len(items), items=items, source=url)
+
+
+def _fast_feed_items(content: bytes, limit: Optional[int]) -> Optional[list[NewsItem]]:
+    """
+    Streaming parse of a feed body; None when feedparser has to handle it.
+    """
+    if not _fast_parse:
+        return None
+    try:
+        parsed = fast_parse.parse_feed(content, limit)
+    except fast_parse.FastParseError as exc:
+        logger.debug("Fast feed parse failed, using feedparser: %s", exc)
+        return None
+    return _fast_items(parsed) if parsed else None
+
+
+def _feed_items(content: bytes, url: str, limit: int) -> list[NewsItem]:
+    items = _fast_feed_items(content, limit)
+    if items is not None:
+        return items
+    import feedparser
+
+    return _feed_result(feedparser.parse(content), url, limit).items
+
+
+def _fetch_feed(url: str, limit: int) -> list[NewsItem]:
+    resp = http_pool.get(url, headers=HEADERS)
+    resp.raise_for_status()
+    return _feed_items(resp.content, url, limit)
+
+
+async def _afetch_feed(url: str, limit: int) -> list[NewsItem]:
+    resp = await http_pool.aget(url, headers=HEADERS)
+    resp.raise_for_status()
+    return await asyncio.to_thread(_feed_items, resp.content, url, limit)
+
+
+def _mentions(topic: str, items: list[NewsItem]) -> list[NewsItem]:
+    # extra feeds are not searchable, so keep only entries that mention the topic
+    if not topic or topic.lower() == "india":
+        return items
+    words = [w for w in topic.lower().split() if len(w) > 2] or [topic.lower()]
+    return [i for i in items if any(w in f"{i.title} {i.content}".lower() for w in words)]
+
+
+@dataclass
+class _Source:
+    name: str
+    host: str
+    fetch: Callable[[], list[NewsItem]]
+    afetch: Callable[[], Awaitable[list[NewsItem]]]
+
+
+def _sources(topic: str, feed_url: str, limit: int) -> List[_Source]:
+    query = topic or "india"
+    url = _feed_url(topic, feed_url)
+    host = urlsplit(url).netloc
+    sources = [
+        _Source(
+            "duckduckgo",
+            _DUCKDUCKGO_HOST,
+            lambda: _scrape_duckduckgo(query, limit),
+            lambda: _ascrape_duckduckgo(query, limit),
+        ),
+        _Source(host, host, lambda: _fetch_feed(url, limit), lambda: _afetch_feed(url, limit)),
+    ]
+    for extra in _extra_feeds:
+        if extra == url:
+            continue
+
+        def _fetch(extra: str = extra) -> list[NewsItem]:
+            return _mentions(topic, _fetch_feed(extra, limit))
+
+        async def _afetch(extra: str = extra) -> list[NewsItem]:
+            return _mentions(topic, await _afetch_feed(extra, limit))
+
+        extra_host = urlsplit(extra).netloc
+        sources.append(_Source(extra_host, extra_host, _fetch, _afetch))
+    return sources
+
+
+def _live_sources(topic: str, feed_url: str, limit: int, merger: "_Merger") -> List[_Source]:
+    """
+    Sources whose host is not behind an open circuit breaker (e.g. DuckDuckGo blocking us leaves the RSS feeds).
+    Skipped ones are recorded on `merger` so an all-skipped query still fails instead of caching an empty result.
+    """
+    live = []
+    for source in _sources(topic, feed_url, limit):
+        if resilience.available(source.host):
+            live.append(source)
+        else:
+            merger.skip(source.name, source.host)
+    return live
+
+
+class _Merger:
+    """
+    Collects items in arrival order, dropping near-duplicate headlines across sources.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.items: list[NewsItem] = []
+        self.sources: List[str] = []
+        self.errors: List[Exception] = []
+        self._dedup = NearDuplicateFilter()
+
+    @property
+    def full(self) -> bool:
+        return len(self.items) >= self.limit
+
+    def add(self, name: str, items: list[NewsItem]) -> None:
+        added = False
+        for item in items:
+            if self.full:
+                break
+            if self._dedup.add(item.title):
+                self.items.append(item)
+                added = True
+        if added:
+            self.sources.append(name)
+
+    def fail(self, name: str, exc: Exception) -> None:
+        logger.warning("News source %s failed: %s", name, exc)
+        self.errors.append(exc)
+
+    def skip(self, name: str, host: str) -> None:
+        logger.debug("Skipping news source %s: circuit open", name)
+        self.errors.append(resilience.UpstreamUnavailable(host, "circuit open", resilience.retry_after(host)))
+
+    def result(self) -> NewsResult:
+        if not self.items and self.errors:
+            raise self.errors[0]
+        return NewsResult(count=len(self.items), items=self.items, source="+".join(self.sources) or "none")
+
+
+def _wait_timeout(deadline: float, merger: _Merger) -> Optional[float]:
+    # before the deadline wait for it; after it, return with what we have or keep waiting for anything
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        return remaining
+    return 0 if merger.items else None
+
+
+def _parse_feed(content: bytes) -> list[NewsItem]:
+    items = _fast_feed_items(content, None)
+    if items is not None:
+        return items
+    import feedparser
+
+    feed = feedparser.parse(content)
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"Failed to parse feed: {feed.bozo_exception}")
+    return _parse_entries(feed, len(feed.entries))
+
+
+def start_poller() -> Optional[FeedPoller]:
+    """
+    Start background ingestion of news_feed, the news_poll_topics feeds and news_extra_feeds
+    into the local store that fetch_news answers from while it is fresh.
+    """
+    global _poller
+    if _poller is not None or _config.news_poll_interval_s <= 0:
+        return _poller
+    feeds = [_config.news_feed, *(_feed_url(t, _config.news_feed) for t in _config.news_poll_topics), *_extra_feeds]
+    _poller = FeedPoller(NewsStore(_config.news_store_size), feeds, _config.news_poll_interval_s, _parse_feed, HEADERS)
+    _poller.start()
+    return _poller
+
+
+def stop_poller() -> None:
+    global _poller
+    if _poller is not None:
+        _poller.stop()
+        _poller = None
+
+
+def news_store_stats() -> dict:
+    if _poller is None:
+        return {}
+    return {**_poller.store.stats(), **_poller.stats()}
+
+
+def _from_store(topic: str, limit: int, fallback: bool = False) -> Optional[NewsResult]:
+    # as a fallback (every live source failed) a stale store and a single match are good enough
+    if _poller is None or not (fallback or _poller.fresh()):
+        return None
+    items = _poller.store.search(topic, limit)
+    if len(items) < (1 if fallback else min(limit, _MIN_STORE_HITS)):
+        return None
+    return NewsResult(count=len(items), items=items, source="news_store")
+
+
+def _merged_result(merger: "_Merger", topic: str, limit: int) -> NewsResult:
+    if not merger.items and merger.errors:
+        stored = _from_store(topic, limit, fallback=True)
+        if stored is not None:
+            logger.info("All news sources failed for %r; answering from the news store", topic)
+            return stored
+    return merger.result()
+
+
+@cached("news")
+@coalesced("news")
 def fetch_news(
     topic: str = "india",
     feed_url: str = "https://news.google.com/rss?hl=en-IN&gl=IN&ceid=IN:en",
     limit: int = 10,
 ) -> NewsResult:
     """
-    Fetch latest Indian news. Tries DuckDuckGo (HTML scrape, no links) first, then RSS fallback.
+    Fetch latest Indian news. Served from the background-polled store when it is fresh and has
+    enough matches; otherwise DuckDuckGo (HTML scrape, no links), the Google News RSS feed and any
+    configured extra feeds are queried concurrently, skipping hosts whose circuit breaker is open.
+    Near-duplicate headlines are merged; the call returns once `limit` unique items are in, or at
+    the deadline if any source has answered. If every source fails, the store answers even when stale.
     """
     limit = max(1, min(limit, 25))
+    stored = _from_store(topic, limit)
+    if stored is not None:
+        return stored
+    merger = _Merger(limit)
+    futures = {
+        _source_pool.submit(contextvars.copy_context().run, source.fetch): source.name
+        for source in _live_sources(topic, feed_url, limit, merger)
+    }
+    deadline = time.monotonic() + _deadline_s
+    pending = set(futures)
+    while pending and not merger.full:
+        done, pending = wait(pending, timeout=_wait_timeout(deadline, merger), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            try:
+                merger.add(futures[future], future.result())
+            except Exception as exc:
+                merger.fail(futures[future], exc)
+    # stragglers finish in the background, bounded by the HTTP timeout
+    for future in pending:
+        future.cancel()
+    return _merged_result(merger, topic, limit)
 
-    # First try DuckDuckGo HTML search (browser-like without headless dependencies)
-    scraped_items = _scrape_duckduckgo(topic or "india", limit)
-    if scraped_items:
-        return NewsResult(count=len(scraped_items), items=scraped_items, source="duckduckgo")
-
-    # Fallback to RSS
-    url = feed_url
-    if topic and topic.lower() != "india":
-        url = f"https://news.google.com/rss/search?q={topic}+India&hl=en-IN&gl=IN&ceid=IN:en"
-
-    feed = feedparser.parse(url)
-    if feed.bozo:
-        raise ValueError(f"Failed to parse feed: {feed.bozo_exception}")
 
-    items = _parse_entries(feed, limit)
-    return NewsResult(count=len(items), items=items, source=url)
+@cached("news")
+@coalesced("news")
+async def afetch_news(
+    topic: str = "india",
+    feed_url: str = "https://news.google.com/rss?hl=en-IN&gl=IN&ceid=IN:en",
+    limit: int = 10,
+) -> NewsResult:
+    """
+    Async variant of fetch_news; sources run as tasks and stragglers are cancelled.
+    """
+    limit = max(1, min(limit, 25))
+    stored = _from_store(topic, limit)
+    if stored is not None:
+        return stored
+    merger = _Merger(limit)
+    tasks = {
+        asyncio.ensure_future(source.afetch()): source.name for source in _live_sources(topic, feed_url, limit, merger)
+    }
+    deadline = time.monotonic() + _deadline_s
+    pending = set(tasks)
+    try:
+        while pending and not merger.full:
+            done, pending = await asyncio.wait(
+                pending, timeout=_wait_timeout(deadline, merger), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                try:
+                    merger.add(tasks[task], task.result())
+                except Exception as exc:
+                    merger.fail(tasks[task], exc)
+    finally:
+        for task in pending:
+            task.cancel()
+    return _merged_result(merger, topic, limit)
@@ -0,0 +1,225 @@
+"""
+Background news ingestion: a feed poller and an in-memory indexed store.
+
+`FeedPoller` re-fetches a set of RSS feeds on a fixed interval with
+conditional GETs (ETag / Last-Modified), so unchanged feeds cost a 304 and no
+parsing. Parsed items land in `NewsStore`, a bounded, publish-time ordered
+collection with an inverted index over title and content tokens; topic
+lookups are posting-list intersections instead of an upstream round trip.
+"""
+import bisect
+import itertools
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.tools import http_pool
+from app.tools.dedup import NearDuplicateFilter
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# words every query or headline carries; indexing them would make every lookup a full scan
+_STOPWORDS = {"a", "an", "and", "at", "for", "in", "india", "indian", "is", "news", "of", "on", "the", "to", "with"}
+
+
+def tokens(text: str) -> Set[str]:
+    return {t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS}
+
+
+def _timestamp(item: Any) -> float:
+    published = getattr(item, "published", None)
+    if published:
+        try:
+            return time.mktime(time.strptime(published[:19], "%Y-%m-%dT%H:%M:%S"))
+        except ValueError:
+            pass
+    return time.time()
+
+
+class NewsStore:
+    def __init__(self, max_items: int = 2000):
+        self.max_items = max_items
+        self._items: Dict[int, Any] = {}
+        self._keys: Dict[str, int] = {}
+        self._order: List[Tuple[float, int]] = []
+        self._published: Dict[int, float] = {}
+        self._index: Dict[str, Set[int]] = {}
+        self._ids = itertools.count()
+        # the same story reaches several feeds within minutes; compare against recent arrivals only
+        self._dedup = NearDuplicateFilter(window=300)
+        self.duplicates = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _evict_oldest(self) -> None:
+        _, item_id = self._order.pop(0)
+        item = self._items.pop(item_id)
+        del self._published[item_id]
+        self._keys.pop(item.title.strip().lower(), None)
+        for token in tokens(f"{item.title} {item.content}"):
+            postings = self._index.get(token)
+            if postings is not None:
+                postings.discard(item_id)
+                if not postings:
+                    del self._index[token]
+        self.evictions += 1
+
+    def add(self, items: List[Any]) -> int:
+        """
+        Insert items whose title is neither stored nor a near-duplicate of a recent one;
+        returns how many were new.
+        """
+        added = 0
+        with self._lock:
+            for item in items:
+                key = item.title.strip().lower()
+                if not key or key in self._keys:
+                    continue
+                if not self._dedup.add(item.title):
+                    self.duplicates += 1
+                    continue
+                item_id = next(self._ids)
+                self._items[item_id] = item
+                self._keys[key] = item_id
+                published = _timestamp(item)
+                self._published[item_id] = published
+                bisect.insort(self._order, (published, item_id))
+                for token in tokens(f"{item.title} {item.content}"):
+                    self._index.setdefault(token, set()).add(item_id)
+                added += 1
+            while len(self._items) > self.max_items:
+                self._evict_oldest()
+        return added
+
+    def search(self, query: str, limit: int) -> List[Any]:
+        """
+        Newest items containing every query token (the newest items overall for an empty query).
+        """
+        wanted = tokens(query or "")
+        with self._lock:
+            if wanted:
+                postings = sorted((self._index.get(t, set()) for t in wanted), key=len)
+                ids = set(postings[0]).intersection(*postings[1:]) if postings[0] else set()
+                ranked = sorted(ids, key=self._published.__getitem__, reverse=True)
+            else:
+                ranked = (i for _, i in reversed(self._order))
+            return [self._items[i] for i in itertools.islice(ranked, limit)]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self._items),
+            "tokens": len(self._index),
+            "duplicates": self.duplicates,
+            "evictions": self.evictions,
+        }
+
+
+@dataclass
+class _FeedState:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    polls: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    added: int = 0
+    last_success: Optional[float] = None
+
+
+class FeedPoller:
+    """
+    Polls `feeds` every `interval_s` on a daemon thread; `parse(content)` turns a feed body into items.
+    """
+
+    def __init__(
+        self,
+        store: NewsStore,
+        feeds: List[str],
+        interval_s: float,
+        parse: Callable[[bytes], List[Any]],
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.store = store
+        self.feeds = list(dict.fromkeys(feeds))
+        self.interval_s = interval_s
+        self._parse = parse
+        self._headers = headers or {}
+        self._state: Dict[str, _FeedState] = {url: _FeedState() for url in self.feeds}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self, url: str) -> int:
+        state = self._state[url]
+        headers = dict(self._headers)
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        state.polls += 1
+        try:
+            resp = http_pool.get(url, headers=headers)
+            if resp.status_code == 304:
+                state.not_modified += 1
+                state.last_success = time.time()
+                return 0
+            resp.raise_for_status()
+            added = self.store.add(self._parse(resp.content))
+        except Exception as exc:
+            state.errors += 1
+            logger.warning("Polling %s failed: %s", url, exc)
+            return 0
+        state.etag = resp.headers.get("ETag")
+        state.last_modified = resp.headers.get("Last-Modified")
+        state.added += added
+        state.last_success = time.time()
+        return added
+
+    def poll_all(self) -> int:
+        return sum(self.poll(url) for url in self.feeds)
+
+    def fresh(self) -> bool:
+        # a missed cycle or two is fine; after that the store is considered stale
+        latest = max((s.last_success for s in self._state.values() if s.last_success), default=None)
+        return latest is not None and time.time() - latest <= 3 * self.interval_s
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            added = self.poll_all()
+            logger.debug("News poll added %d items (%d stored)", added, len(self.store))
+            self._stop.wait(max(0.0, self.interval_s - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="news-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "interval_s": self.interval_s,
+            "fresh": self.fresh(),
+            "feeds": {
+                url: {
+                    "polls": s.polls,
+                    "not_modified": s.not_modified,
+                    "errors": s.errors,
+                    "added": s.added,
+                    "last_success": s.last_success,
+                }
+                for url, s in self._state.items()
+            },
+        }
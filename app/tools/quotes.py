@@ -0,0 +1,88 @@
+"""
+Latest-quote table shared by the quote service and the stock tools.
+
+The quote service (app/server/quotes.py) refreshes subscribed symbols in
+batched polls and writes them here; `fetch_stock` answers from the table when
+the symbol has a fresh entry instead of calling yfinance. Entries are small
+fixed tuples keyed by `SYMBOL+suffix`.
+"""
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+class Quote(NamedTuple):
+    symbol: str
+    price: float
+    currency: Optional[str]
+    exchange: Optional[str]
+    updated_at: float
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+class QuoteTable:
+    def __init__(self):
+        self._quotes: Dict[str, Quote] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.fresh_reads = 0
+
+    def update(self, results: Iterable[Any], exchange_suffix: str) -> List[Quote]:
+        """
+        Store StockResult-like rows; returns the quotes whose price changed (or are new).
+        """
+        now = time.time()
+        changed = []
+        with self._lock:
+            for r in results:
+                key = f"{r.symbol}{exchange_suffix}"
+                previous = self._quotes.get(key)
+                quote = Quote(r.symbol, r.price, r.currency, r.exchange, now)
+                self._quotes[key] = quote
+                if previous is None or previous.price != quote.price:
+                    changed.append(quote)
+        return changed
+
+    def get(self, symbol: str, exchange_suffix: str, max_age: float) -> Optional[Quote]:
+        quote = self._quotes.get(f"{symbol}{exchange_suffix}")
+        self.reads += 1
+        if quote is None or time.time() - quote.updated_at > max_age:
+            return None
+        self.fresh_reads += 1
+        return quote
+
+    def discard(self, symbols: Iterable[str], exchange_suffix: str) -> None:
+        with self._lock:
+            for symbol in symbols:
+                self._quotes.pop(f"{symbol}{exchange_suffix}", None)
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None, exchange_suffix: str = "") -> List[Quote]:
+        if symbols is None:
+            return list(self._quotes.values())
+        found = (self._quotes.get(f"{s}{exchange_suffix}") for s in symbols)
+        return [q for q in found if q is not None]
+
+    def stats(self) -> dict:
+        return {"symbols": len(self._quotes), "reads": self.reads, "fresh_reads": self.fresh_reads}
+
+
+_table = QuoteTable()
+# entries older than this are ignored by the stock tools; the quote service sets it from its poll interval
+_max_age = 0.0
+
+
+def get_table() -> QuoteTable:
+    return _table
+
+
+def set_max_age(seconds: float) -> None:
+    global _max_age
+    _max_age = seconds
+
+
+def lookup(symbol: str, exchange_suffix: str) -> Optional[Quote]:
+    if _max_age <= 0:
+        return None
+    return _table.get(symbol, exchange_suffix, _max_age)
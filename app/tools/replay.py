@@ -0,0 +1,190 @@
+"""
+Record/replay of upstream calls for reproducible benchmarks.
+
+In `record` mode every pooled GET (Open-Meteo, DuckDuckGo, RSS feeds) and every
+`recorded` tool call (yfinance) is saved as one JSON fixture per request under
+`path`; in `replay` mode those fixtures are served instead and a missing one
+raises `ReplayMissError`, so nothing reaches the network. Fixtures are keyed
+on method, URL and query params (or function name and arguments) and held in
+memory after the first read.
+"""
+import base64
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Type
+
+import httpx
+import requests
+from pydantic import BaseModel
+
+from app.config.settings import ReplayConfig
+
+logger = logging.getLogger(__name__)
+
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+class ReplayMissError(LookupError):
+    pass
+
+
+class FixtureStore:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._loaded: Dict[str, Optional[dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def load(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if key not in self._loaded:
+                file = self._file(key)
+                self._loaded[key] = json.loads(file.read_text(encoding="utf-8")) if file.exists() else None
+            payload = self._loaded[key]
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return payload
+
+    def save(self, key: str, payload: dict) -> None:
+        payload = {"key": key, **payload}
+        with self._lock:
+            self._file(key).write_text(json.dumps(payload, indent=1, default=str), encoding="utf-8")
+            self._loaded[key] = payload
+            self.recorded += 1
+
+    def stats(self) -> dict:
+        return {"path": str(self.path), "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+_mode = "off"
+_store: Optional[FixtureStore] = None
+
+
+def configure(config: ReplayConfig) -> None:
+    global _mode, _store
+    _mode = config.mode
+    _store = FixtureStore(config.path) if config.mode != "off" else None
+
+
+def mode() -> str:
+    return _mode
+
+
+def replay_stats() -> dict:
+    return {"mode": _mode, **(_store.stats() if _store is not None else {})}
+
+
+def http_key(method: str, url: str, params: Optional[Mapping[str, Any]]) -> str:
+    query = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return json.dumps(["http", method.upper(), url, query])
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(payload: dict) -> bytes:
+    if "base64" in payload:
+        return base64.b64decode(payload["base64"])
+    return payload.get("text", "").encode("utf-8")
+
+
+def _lookup(key: str) -> Optional[dict]:
+    if _mode != "replay" or _store is None:
+        return None
+    payload = _store.load(key)
+    if payload is None:
+        raise ReplayMissError(f"No recorded fixture for {key}")
+    return payload
+
+
+def replay_response(method: str, url: str, params: Optional[Mapping[str, Any]]) -> Optional[requests.Response]:
+    """
+    Recorded response for a pooled sync request, or None when not replaying.
+    """
+    payload = _lookup(http_key(method, url, params))
+    if payload is None:
+        return None
+    resp = requests.Response()
+    resp.status_code = payload["status"]
+    resp.headers.update(payload.get("headers", {}))
+    resp._content = _decode_body(payload)
+    resp.encoding = "utf-8"
+    resp.url = url
+    return resp
+
+
+def areplay_response(method: str, url: str, params: Optional[Mapping[str, Any]]) -> Optional[httpx.Response]:
+    payload = _lookup(http_key(method, url, params))
+    if payload is None:
+        return None
+    return httpx.Response(
+        payload["status"],
+        headers=payload.get("headers", {}),
+        content=_decode_body(payload),
+        request=httpx.Request(method, url, params=params),
+    )
+
+
+def record_response(
+    method: str, url: str, params: Optional[Mapping[str, Any]], status: int, headers: Mapping[str, str], content: bytes
+) -> None:
+    if _mode != "record" or _store is None:
+        return
+    kept = {k: v for k, v in headers.items() if k.lower() in _KEPT_HEADERS}
+    _store.save(http_key(method, url, params), {"status": status, "headers": kept, **_encode_body(content)})
+
+
+def recorded(name: str, model: Optional[Type[BaseModel]] = None) -> Callable:
+    """
+    Record or replay a tool function that talks to its upstream without the
+    shared HTTP pool (yfinance). Return values are stored as JSON (pydantic
+    models via `model`); raised errors are replayed with the same message.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        def _key(args: tuple, kwargs: dict) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return json.dumps(["call", name, bound.arguments], sort_keys=True, default=str)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _mode == "off" or _store is None:
+                return fn(*args, **kwargs)
+            key = _key(args, kwargs)
+            payload = _lookup(key)
+            if payload is not None:
+                if "error" in payload:
+                    raise ValueError(payload["error"])
+                value = payload["value"]
+                return model.model_validate(value) if model is not None else value
+            try:
+                result = fn(*args, **kwargs)
+            except ValueError as exc:
+                _store.save(key, {"error": str(exc)})
+                raise
+            _store.save(key, {"value": result.model_dump() if isinstance(result, BaseModel) else result})
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,276 @@
+"""
+Per-upstream rate limits and circuit breakers shared by the tool modules.
+
+Every outbound call to a host first takes a token from that host's bucket
+(waiting up to `rate_max_wait_s`) and checks its breaker. After
+`breaker_failures` consecutive failures (transport errors, 5xx, 429, and statuses
+the caller flags, such as a block page) the breaker opens and calls fail
+immediately with `UpstreamUnavailable` instead of waiting for the HTTP timeout;
+after `breaker_reset_s` one probe is let through and its outcome closes or
+re-opens the breaker. Callers fall back to cached data
+(`cache.stale_if_error`) or other sources (news RSS, the polled news store).
+"""
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from typing import Callable, Collection, Dict, Iterator, Optional
+
+from app.config.settings import ResilienceConfig
+from app.observability.metrics import UPSTREAM_REJECTED
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class UpstreamUnavailable(RuntimeError):
+    """
+    Raised without contacting the host: its breaker is open or its rate limit would wait too long.
+    """
+
+    def __init__(self, host: str, reason: str, retry_after: float):
+        super().__init__(f"{host} unavailable ({reason}); retry in {retry_after:.1f}s")
+        self.host = host
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.waits = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Take a token; returns how long the caller must sleep before using it,
+        or None (nothing taken) when that would be longer than `max_wait`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = max(0.0, (1.0 - self.tokens) / self.rate)
+            if delay > max_wait:
+                return None
+            # tokens may go negative: later callers queue behind the ones already waiting
+            self.tokens -= 1.0
+            if delay:
+                self.waits += 1
+            return delay
+
+    def stats(self) -> dict:
+        return {"rate_per_s": self.rate, "burst": self.burst, "tokens": round(self.tokens, 2), "waits": self.waits}
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_s: float):
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.reset_s - time.monotonic())
+
+    def available(self) -> bool:
+        """
+        Whether a call would be let through right now (does not claim the half-open probe).
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self.retry_after() <= 0
+        return not self._probe_pending()
+
+    def _probe_pending(self) -> bool:
+        # a probe that never reported back (e.g. its task was cancelled) is given up after reset_s
+        return self._probing and time.monotonic() - self._probe_started < self.reset_s
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and self.retry_after() <= 0:
+                self.state, self._probing = HALF_OPEN, False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_pending():
+                self._probing, self._probe_started = True, time.monotonic()
+                return True
+            self.rejected += 1
+            return False
+
+    def release_probe(self) -> None:
+        # the probe call never reached the host; let the next caller take it
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state, self._probing = CLOSED, False
+
+    def record_failure(self) -> bool:
+        """
+        Count a failure; returns True when it opened the breaker.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state, self._probing = OPEN, False
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                return True
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_after_s": round(self.retry_after(), 1) if self.state == OPEN else 0.0,
+        }
+
+
+_config = ResilienceConfig()
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+_buckets: Dict[str, Optional[TokenBucket]] = {}
+
+
+def configure(config: ResilienceConfig) -> None:
+    """
+    Apply limits from config; breaker and bucket state starts over.
+    """
+    global _config
+    with _lock:
+        _config = config
+        _breakers.clear()
+        _buckets.clear()
+
+
+def _breaker(host: str) -> CircuitBreaker:
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.setdefault(host, CircuitBreaker(_config.breaker_failures, _config.breaker_reset_s))
+    return breaker
+
+
+def _bucket(host: str) -> Optional[TokenBucket]:
+    if host not in _buckets:
+        rate = _config.rate_limits.get(host)
+        with _lock:
+            _buckets.setdefault(host, TokenBucket(rate, _config.rate_burst) if rate else None)
+    return _buckets[host]
+
+
+def available(host: str) -> bool:
+    """
+    False while the host's breaker is open, so callers can skip it up front.
+    """
+    return not _config.enabled or _breaker(host).available()
+
+
+def retry_after(host: str) -> float:
+    return _breaker(host).retry_after()
+
+
+def _admit(host: str) -> float:
+    """
+    Check the breaker and take a rate-limit token; returns the delay to sleep before the call.
+    """
+    breaker = _breaker(host)
+    if not breaker.allow():
+        UPSTREAM_REJECTED.inc(host=host, reason="breaker_open")
+        raise UpstreamUnavailable(host, "circuit open", breaker.retry_after())
+    bucket = _bucket(host)
+    delay = bucket.reserve(_config.rate_max_wait_s) if bucket is not None else 0.0
+    if delay is None:
+        UPSTREAM_REJECTED.inc(host=host, reason="rate_limited")
+        breaker.release_probe()
+        raise UpstreamUnavailable(host, "rate limited", 1.0 / bucket.rate)
+    return delay
+
+
+def before_call(host: str) -> None:
+    if not _config.enabled:
+        return
+    delay = _admit(host)
+    if delay:
+        time.sleep(delay)
+
+
+async def abefore_call(host: str) -> None:
+    if not _config.enabled:
+        return
+    delay = _admit(host)
+    if delay:
+        await asyncio.sleep(delay)
+
+
+def record_success(host: str) -> None:
+    if _config.enabled:
+        _breaker(host).record_success()
+
+
+def record_failure(host: str) -> None:
+    if _config.enabled and _breaker(host).record_failure():
+        logger.warning("Circuit for %s opened; failing fast for %.0fs", host, _config.breaker_reset_s)
+
+
+def release_probe(host: str) -> None:
+    """
+    The call ended without telling anything about the host; free a claimed half-open probe.
+    """
+    if _config.enabled:
+        _breaker(host).release_probe()
+
+
+def record_status(host: str, status_code: int, failure_statuses: Collection[int] = ()) -> None:
+    """
+    5xx and 429 always count as failures; callers add the statuses that mean failure for their
+    upstream (DuckDuckGo answers a blocked client with 202 or 403).
+    """
+    if status_code >= 500 or status_code == 429 or status_code in failure_statuses:
+        record_failure(host)
+    else:
+        record_success(host)
+
+
+@contextlib.contextmanager
+def guard(host: str, is_failure: Optional[Callable[[Exception], bool]] = None) -> Iterator[None]:
+    """
+    Wrap a blocking call that does not go through http_pool (e.g. yfinance). Exceptions count as
+    failures unless `is_failure` says otherwise (an unknown ticker is not the host's fault);
+    those leave the breaker as it was.
+    """
+    before_call(host)
+    try:
+        yield
+    except Exception as exc:
+        if is_failure is None or is_failure(exc):
+            record_failure(host)
+        else:
+            release_probe(host)
+        raise
+    record_success(host)
+
+
+def resilience_stats() -> dict:
+    return {
+        "enabled": _config.enabled,
+        "breakers": {host: b.stats() for host, b in list(_breakers.items())},
+        "rate_limits": {host: b.stats() for host, b in list(_buckets.items()) if b is not None},
+    }
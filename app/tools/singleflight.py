@@ -0,0 +1,171 @@
+"""
+Single-flight request coalescing for tool calls.
+
+Concurrent calls with the same key share one execution: the first caller runs
+the upstream fetch and every caller waiting on that key receives its result or
+re-raises its exception. Threads coalesce with threads and coroutines with
+coroutines on the same event loop; an async fetch runs in a task owned by the
+flight, so cancelling any caller (a client disconnect) leaves the others waiting
+on it unaffected. Inside a batch (`join_batch`), successful
+results are also remembered for the rest of the batch, so a query batch makes
+each distinct tool call once even when its queries run minutes apart.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.tools.cache import make_key
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[Tuple[int, str], asyncio.Task] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def ado(self, key: str, afn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        task = self._tasks.get(slot)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.executions += 1
+            # the fetch belongs to the flight, not to the first caller: cancelling that caller
+            # only stops its own wait, and the fetch finishes for everyone else
+            task = self._tasks[slot] = loop.create_task(afn())
+            task.add_done_callback(functools.partial(self._finished, slot))
+        return await asyncio.shield(task)
+
+    def _finished(self, slot: Tuple[int, str], task: asyncio.Task) -> None:
+        if self._tasks.get(slot) is task:
+            del self._tasks[slot]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller had gone away
+
+    def stats(self) -> dict:
+        return {
+            "executions": self.executions,
+            "shared": self.shared,
+            "in_flight": len(self._calls) + len(self._tasks),
+        }
+
+
+class BatchMemo:
+    """
+    Results of the coalesced calls made by the queries of one batch, keyed like the tool cache.
+    """
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.hits = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        if key in self.results:
+            self.hits += 1
+            return True, self.results[key]
+        return False, None
+
+
+_batch_memo: contextvars.ContextVar[Optional[BatchMemo]] = contextvars.ContextVar("tool_batch_memo", default=None)
+
+
+def join_batch(memo: BatchMemo) -> None:
+    """
+    Share `memo` with every coalesced call made from the current context (one task of a batch);
+    tool threads started from it inherit the context.
+    """
+    _batch_memo.set(memo)
+
+
+_flights: Dict[str, SingleFlight] = {}
+
+
+def get_flight(name: str) -> SingleFlight:
+    flight = _flights.get(name)
+    if flight is None:
+        flight = _flights.setdefault(name, SingleFlight())
+    return flight
+
+
+def flight_stats() -> dict:
+    return {name: flight.stats() for name, flight in _flights.items()}
+
+
+def coalesced(name: str) -> Callable:
+    """
+    Share one in-flight execution among concurrent calls with identical normalized arguments,
+    and one result among the calls of a batch.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        flight = get_flight(name)
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                key = make_key(name, fn, args, kwargs)
+                memo = _batch_memo.get()
+                if memo is None:
+                    return await flight.ado(key, lambda: fn(*args, **kwargs))
+                found, result = memo.get(key)
+                if not found:
+                    result = memo.results[key] = await flight.ado(key, lambda: fn(*args, **kwargs))
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = make_key(name, fn, args, kwargs)
+            memo = _batch_memo.get()
+            if memo is None:
+                return flight.do(key, lambda: fn(*args, **kwargs))
+            found, result = memo.get(key)
+            if not found:
+                result = memo.results[key] = flight.do(key, lambda: fn(*args, **kwargs))
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,11 +1,29 @@
+import asyncio
 import logging
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 
-import yfinance as yf
 from pydantic import BaseModel, Field, ValidationError
 
+from app.tools import quotes, resilience, symbol_master
+from app.tools.cache import cached
+from app.tools.replay import recorded
+from app.tools.singleflight import coalesced
+
 logger = logging.getLogger(__name__)
 
+# yfinance has its own HTTP session; its calls share one rate limit and breaker under this name
+_YAHOO_HOST = "finance.yahoo.com"
+
+
+def _yahoo_failure(exc: Exception) -> bool:
+    """
+    Whether a yfinance exception means Yahoo is failing: transport errors (requests and curl_cffi
+    both raise OSError subclasses) and its rate limiting. Missing tickers and data do not count.
+    """
+    from yfinance.exceptions import YFRateLimitError
+
+    return isinstance(exc, (OSError, YFRateLimitError))
+
 
 class StockResult(BaseModel):
     symbol: str
@@ -15,21 +33,22 @@ class StockResult(BaseModel):
     source: str = "yfinance"
 
 
-_SYMBOL_NORMALIZATION = {
-    "HCL": "HCLTECH",
-    "HCLTECH": "HCLTECH",
-    "INFY": "INFY",
-    "TCS": "TCS",
-    "RELIANCE": "RELIANCE",
-}
+class StockBatchResult(BaseModel):
+    count: int
+    results: List[StockResult] = Field(default_factory=list)
+    errors: Dict[str, str] = Field(default_factory=dict, description="Per-symbol failure reasons")
 
 
-def _resolve_symbol(user_symbol: str) -> str:
-    sym = user_symbol.strip().upper()
-    return _SYMBOL_NORMALIZATION.get(sym, sym)
+def _resolve_symbol(user_symbol: str, exchange_suffix: str = ".NS") -> symbol_master.Resolution:
+    """
+    Ticker and exchange suffix for a ticker or company name ("Infosys" -> INFY, .NS) from the
+    symbol master. Ticker-shaped input outside the master passes through unverified (listed=False);
+    unknown names raise ValueError before any network call.
+    """
+    return symbol_master.resolve(user_symbol, exchange_suffix)
 
 
-def _latest_price(ticker: yf.Ticker) -> Optional[float]:
+def _latest_price(ticker: Any) -> Optional[float]:
     info = ticker.fast_info
     price = info.get("last_price")
     if price is not None:
@@ -44,28 +63,47 @@ def _latest_price(ticker: yf.Ticker) -> Optional[float]:
     return None
 
 
+def _from_quote_table(symbol: str, exchange_suffix: str) -> Optional[StockResult]:
+    quote = quotes.lookup(symbol, exchange_suffix)
+    if quote is None:
+        return None
+    return StockResult(symbol=quote.symbol, price=quote.price, currency=quote.currency, exchange=quote.exchange)
+
+
 def fetch_stock(symbol: str, exchange_suffix: str = ".NS") -> StockResult:
     """
     Fetch latest stock price for an Indian ticker using yfinance (e.g., HCLTECH -> HCLTECH.NS).
-    Includes simple symbol normalization and price fallbacks.
+    Subscribed symbols are answered from the live quote table while their entry is fresh.
     """
-    if not symbol:
-        raise ValueError("Symbol is required")
+    resolved = _resolve_symbol(symbol, exchange_suffix)
+    return _from_quote_table(resolved.symbol, exchange_suffix) or _fetch_stock(resolved.symbol, exchange_suffix)
 
-    resolved = _resolve_symbol(symbol)
-    ticker = yf.Ticker(f"{resolved}{exchange_suffix}")
-    price = _latest_price(ticker)
+
+@cached("stock")
+@coalesced("stock")
+@recorded("yfinance.quote", StockResult)
+def _fetch_stock(symbol: str, exchange_suffix: str = ".NS") -> StockResult:
+    """
+    yfinance lookup behind fetch_stock. The symbol master supplies the ticker and exchange;
+    only symbols outside a non-strict master are retried without the suffix.
+    """
+    import yfinance as yf  # pulls in pandas; loaded on the first lookup
+
+    resolved = _resolve_symbol(symbol, exchange_suffix)
+    with resilience.guard(_YAHOO_HOST, _yahoo_failure):
+        ticker = yf.Ticker(f"{resolved.symbol}{resolved.suffix}")
+        price = _latest_price(ticker)
+        if price is None and not resolved.listed:
+            ticker = yf.Ticker(resolved.symbol)
+            price = _latest_price(ticker)
     if price is None:
-        # attempt without suffix as fallback
-        alt_ticker = yf.Ticker(resolved)
-        price = _latest_price(alt_ticker)
-        if price is None:
-            raise ValueError(f"Price unavailable for symbol {resolved}{exchange_suffix}")
+        hint = symbol_master.did_you_mean(resolved.candidates)
+        raise ValueError(f"Price unavailable for symbol {resolved.symbol}{resolved.suffix}{hint}")
 
     try:
-        info = ticker.fast_info if price is not None else alt_ticker.fast_info
+        info = ticker.fast_info
         return StockResult(
-            symbol=resolved,
+            symbol=resolved.symbol,
             price=price,
             currency=info.get("currency"),
             exchange=info.get("exchange"),
@@ -73,3 +111,122 @@ def fetch_stock(symbol: str, exchange_suffix: str = ".NS") -> StockResult:
     except (TypeError, ValidationError) as exc:
         logger.exception("StockResult validation failed")
         raise ValueError(f"Malformed stock data: {exc}") from exc
+
+
+async def afetch_stock(symbol: str, exchange_suffix: str = ".NS") -> StockResult:
+    """
+    Async variant of fetch_stock. yfinance is blocking, so the lookup runs in a worker thread.
+    """
+    resolved = _resolve_symbol(symbol, exchange_suffix)
+    return _from_quote_table(resolved.symbol, exchange_suffix) or await _afetch_stock(resolved.symbol, exchange_suffix)
+
+
+@cached("stock")
+@coalesced("stock")
+async def _afetch_stock(symbol: str, exchange_suffix: str = ".NS") -> StockResult:
+    return await asyncio.to_thread(_fetch_stock.__wrapped__, symbol, exchange_suffix)
+
+
+# yfinance fast_info reports these for the Indian exchange suffixes; batch downloads carry prices only
+_SUFFIX_MARKETS = {
+    ".NS": ("NSI", "INR"),
+    ".BO": ("BSE", "INR"),
+}
+
+
+def _last_close(frame, ticker: str) -> Optional[float]:
+    try:
+        closes = frame[ticker]["Close"] if frame.columns.nlevels > 1 else frame["Close"]
+    except KeyError:
+        return None
+    closes = closes.dropna()
+    if closes.empty:
+        return None
+    return float(closes.iloc[-1])
+
+
+def _download_closes(tickers: List[str]) -> Dict[str, float]:
+    if not tickers:
+        return {}
+    import yfinance as yf
+
+    with resilience.guard(_YAHOO_HOST, _yahoo_failure):
+        frame = yf.download(
+            tickers=tickers,
+            period="5d",
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            threads=False,
+        )
+    if frame is None or frame.empty:
+        return {}
+    closes = {}
+    for ticker in tickers:
+        price = _last_close(frame, ticker)
+        if price is not None:
+            closes[ticker] = price
+    return closes
+
+
+@cached("stock")
+@coalesced("stock")
+@recorded("yfinance.batch", StockBatchResult)
+def fetch_stocks(symbols: Union[str, List[str]], exchange_suffix: str = ".NS") -> StockBatchResult:
+    """
+    Fetch latest prices for a watchlist of Indian tickers in one batched yfinance download.
+    Accepts a list or a comma/space separated string. Names the symbol master cannot resolve
+    are reported in `errors` without being downloaded.
+    """
+    if isinstance(symbols, str):
+        symbols = symbols.replace(",", " ").split()
+    resolved: Dict[str, symbol_master.Resolution] = {}
+    errors: Dict[str, str] = {}
+    for sym in symbols or []:
+        if not sym or not sym.strip():
+            continue
+        try:
+            resolution = _resolve_symbol(sym, exchange_suffix)
+        except ValueError as exc:
+            errors[sym.strip().upper()] = str(exc)
+            continue
+        resolved.setdefault(resolution.symbol, resolution)
+    if not resolved and not errors:
+        raise ValueError("At least one symbol is required")
+
+    tickers = {sym: f"{sym}{r.suffix}" for sym, r in resolved.items()}
+    closes = _download_closes(list(tickers.values()))
+    # only symbols a non-strict master passed through unverified get the bare-ticker retry
+    missing = [sym for sym, r in resolved.items() if tickers[sym] not in closes and not r.listed]
+    bare_closes = _download_closes(missing)
+
+    results: List[StockResult] = []
+    for sym, r in resolved.items():
+        price = closes.get(tickers[sym])
+        exchange, currency = _SUFFIX_MARKETS.get(r.suffix, (None, None))
+        if price is not None:
+            results.append(StockResult(symbol=sym, price=price, currency=currency, exchange=exchange))
+        elif sym in bare_closes:
+            results.append(StockResult(symbol=sym, price=bare_closes[sym]))
+        else:
+            errors[sym] = f"Price unavailable for symbol {tickers[sym]}{symbol_master.did_you_mean(r.candidates)}"
+    return StockBatchResult(count=len(results), results=results, errors=errors)
+
+
+@cached("stock")
+@coalesced("stock")
+async def afetch_stocks(symbols: Union[str, List[str]], exchange_suffix: str = ".NS") -> StockBatchResult:
+    """
+    Async variant of fetch_stocks; the batched download runs in a worker thread.
+    """
+    return await asyncio.to_thread(fetch_stocks.__wrapped__, symbols, exchange_suffix)
+
+
+def refresh_quotes(symbols: List[str], exchange_suffix: str = ".NS") -> List[quotes.Quote]:
+    """
+    Batch-download `symbols` past the tool cache into the quote table; returns the quotes that changed.
+    """
+    batch = fetch_stocks.__wrapped__(symbols, exchange_suffix)
+    for sym, err in batch.errors.items():
+        logger.debug("Quote refresh failed for %s: %s", sym, err)
+    return quotes.get_table().update(batch.results, exchange_suffix)
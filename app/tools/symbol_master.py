@@ -0,0 +1,244 @@
+"""
+Symbol master: NSE/BSE listings compiled into an in-memory lookup index.
+
+The bundled CSV (symbol, name, exchanges, aliases) is loaded once. A query is
+resolved by exact ticker, exact company name or alias, or a prefix naming one
+company, and the exchange suffix comes from the listing. Trigram similarity
+only feeds "did you mean" suggestions: "Reliance Power" is close to Reliance
+Industries but is another company, so it must never resolve to RELIANCE.
+"""
+import csv
+import logging
+import re
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.config.settings import DefaultsConfig
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_SYMBOLS = Path(__file__).parent / "data" / "symbol_master.csv"
+
+# Yahoo Finance ticker suffix per exchange
+EXCHANGE_SUFFIXES = {"NSE": ".NS", "BSE": ".BO"}
+
+# words users add around a name ("infosys share price"); safe to drop before any match
+_FILLER = {"ltd", "limited", "the", "share", "shares", "stock", "stocks", "price"}
+# also dropped for whole-name matches, but part of real names ("Bank of India"), so kept for prefixes
+_NOISE = _FILLER | {"of", "india"}
+_NON_WORD = re.compile(r"[^a-z0-9&]+")
+# what a non-strict master passes through to Yahoo unverified: something shaped like a ticker
+_TICKER = re.compile(r"[A-Za-z0-9&-]{1,20}")
+_SUGGEST_SCORE = 0.35
+
+
+class UnknownSymbolError(ValueError):
+    pass
+
+
+class Listing(NamedTuple):
+    symbol: str
+    name: str
+    exchanges: Tuple[str, ...]
+
+    def suffix(self, preferred: str) -> str:
+        """
+        `preferred` when the company trades on that exchange, else the suffix of its first listing.
+        """
+        exchange = next((e for e, s in EXCHANGE_SUFFIXES.items() if s == preferred), None)
+        if exchange is None or exchange in self.exchanges:
+            return preferred
+        return EXCHANGE_SUFFIXES.get(self.exchanges[0], preferred)
+
+
+class SymbolMatch(NamedTuple):
+    listing: Listing
+    # 1.0 for exact and prefix matches, trigram similarity otherwise
+    score: float
+    how: str
+
+
+class Resolution(NamedTuple):
+    symbol: str
+    suffix: str
+    # False when a non-strict master passed an unknown symbol through unchanged
+    listed: bool = True
+    # close listings for an unlisted symbol, for "did you mean" hints
+    candidates: Tuple[str, ...] = ()
+
+
+def normalize(text: str, noise: frozenset = frozenset(_NOISE)) -> str:
+    words = _NON_WORD.sub(" ", text.lower()).split()
+    kept = [w for w in words if w not in noise]
+    return " ".join(kept or words)
+
+
+def _prefix_key(text: str) -> str:
+    return normalize(text, frozenset(_FILLER))
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    def __init__(self, listings: List[Listing], aliases: Dict[str, str]):
+        self.listings: Dict[str, Listing] = {listing.symbol: listing for listing in listings}
+        self._aliases = dict(aliases)
+        # normalized ticker / name / alias -> symbol
+        self._exact: Dict[str, str] = {}
+        for listing in listings:
+            self._exact.setdefault(normalize(listing.name), listing.symbol)
+        for alias, symbol in aliases.items():
+            self._exact.setdefault(normalize(alias), symbol)
+        for listing in listings:
+            self._exact[listing.symbol.lower()] = listing.symbol
+        self._keys: List[str] = sorted(self._exact)
+        self._grams: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+        for i, key in enumerate(self._keys):
+            grams = _trigrams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(i)
+        self.lookups = 0
+        self.misses = 0
+
+    @classmethod
+    def from_csv(cls, path: Path = BUNDLED_SYMBOLS) -> "SymbolIndex":
+        listings: List[Listing] = []
+        aliases: Dict[str, str] = {}
+        with Path(path).open("r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                symbol = row["symbol"].strip().upper()
+                exchanges = tuple(e.strip().upper() for e in (row.get("exchanges") or "NSE").split("|") if e.strip())
+                listings.append(Listing(symbol, row.get("name") or symbol, exchanges or ("NSE",)))
+                for alias in filter(None, (row.get("aliases") or "").split("|")):
+                    aliases[alias.strip().lower()] = symbol
+        logger.info("Loaded %d listings from %s", len(listings), path)
+        return cls(listings, aliases)
+
+    def terms(self) -> Dict[str, str]:
+        """
+        Lower-case free-text terms (tickers longer than two letters and aliases) -> symbol.
+        """
+        terms = {symbol.lower(): symbol for symbol in self.listings if len(symbol) > 2}
+        terms.update(self._aliases)
+        return terms
+
+    def short_tickers(self) -> List[str]:
+        return [symbol for symbol in self.listings if len(symbol) <= 2]
+
+    def _prefixed(self, key: str) -> List[str]:
+        found = []
+        for candidate in self._keys[bisect_left(self._keys, key) :]:
+            if not candidate.startswith(key):
+                break
+            found.append(self._exact[candidate])
+        return list(dict.fromkeys(found))
+
+    def _similar(self, key: str, limit: int) -> List[Tuple[str, float]]:
+        grams = _trigrams(key)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        best: Dict[str, float] = {}
+        for i, overlap in shared.items():
+            # Dice coefficient over trigram sets
+            score = 2 * overlap / (len(grams) + self._gram_counts[i])
+            symbol = self._exact[self._keys[i]]
+            if score > best.get(symbol, 0.0):
+                best[symbol] = score
+        return sorted(best.items(), key=lambda kv: -kv[1])[:limit]
+
+    def search(self, query: str, limit: int = 5) -> List[SymbolMatch]:
+        """
+        Candidate listings for `query`, best first: exact, then prefix, then trigram matches.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        matches: List[SymbolMatch] = []
+        exact = self._exact.get(key) or self._exact.get(query.strip().lower())
+        if exact:
+            matches.append(SymbolMatch(self.listings[exact], 1.0, "exact"))
+        if len(key) >= 2:
+            matches.extend(SymbolMatch(self.listings[s], 1.0, "prefix") for s in self._prefixed(key))
+        matches.extend(SymbolMatch(self.listings[s], score, "trigram") for s, score in self._similar(key, limit))
+        seen = set()
+        unique = []
+        for match in matches:
+            if match.listing.symbol not in seen:
+                seen.add(match.listing.symbol)
+                unique.append(match)
+        return unique[:limit]
+
+    def lookup(self, query: str) -> Optional[Listing]:
+        """
+        The listing `query` names exactly, or by a prefix that singles out one company
+        ("hdfc ban" resolves, "tata" does not); None otherwise. Near misses are left to `suggest`.
+        """
+        self.lookups += 1
+        key = normalize(query)
+        exact = self._exact.get(key) or self._exact.get(query.strip().lower())
+        if exact:
+            return self.listings[exact]
+        prefix = _prefix_key(query)
+        if len(prefix) >= 3:
+            prefixed = self._prefixed(prefix)
+            if len(prefixed) == 1:
+                return self.listings[prefixed[0]]
+        self.misses += 1
+        return None
+
+    def suggest(self, query: str, limit: int = 3) -> List[str]:
+        """
+        Symbols of listings close to `query`, best first.
+        """
+        return [m.listing.symbol for m in self.search(query, limit) if m.score >= _SUGGEST_SCORE]
+
+    def stats(self) -> dict:
+        return {"listings": len(self.listings), "keys": len(self._keys), "lookups": self.lookups, "misses": self.misses}
+
+
+_index: Optional[SymbolIndex] = None
+_strict = False
+
+
+def configure(config: DefaultsConfig) -> None:
+    global _index, _strict
+    _index = SymbolIndex.from_csv(Path(config.symbol_master_path) if config.symbol_master_path else BUNDLED_SYMBOLS)
+    _strict = config.symbol_master_strict
+
+
+def get_index() -> SymbolIndex:
+    global _index
+    if _index is None:
+        _index = SymbolIndex.from_csv()
+    return _index
+
+
+def resolve(query: str, exchange_suffix: str = ".NS") -> Resolution:
+    """
+    Map a ticker or company name to its ticker and Yahoo exchange suffix.
+    Input the master does not know passes through upper-cased (listed=False, with close
+    candidates) when it looks like a ticker and the master is non-strict, so listings missing
+    from the CSV still reach Yahoo. Anything else raises UnknownSymbolError with the candidates.
+    """
+    if not query or not query.strip():
+        raise ValueError("Symbol is required")
+    index = get_index()
+    listing = index.lookup(query)
+    if listing is not None:
+        return Resolution(listing.symbol, listing.suffix(exchange_suffix))
+    candidates = tuple(index.suggest(query))
+    if not _strict and _TICKER.fullmatch(query.strip()):
+        return Resolution(query.strip().upper(), exchange_suffix, listed=False, candidates=candidates)
+    raise UnknownSymbolError(f"Unknown symbol {query.strip()!r}{did_you_mean(candidates)}")
+
+
+def did_you_mean(candidates: Tuple[str, ...]) -> str:
+    return f" (did you mean {', '.join(candidates)}?)" if candidates else ""
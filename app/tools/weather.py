@@ -1,9 +1,15 @@
+import asyncio
+import contextvars
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
-import requests
 from pydantic import BaseModel, Field, ValidationError
 
+from app.tools import geocache, http_pool
+from app.tools.cache import cached
+from app.tools.singleflight import coalesced
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,17 +27,53 @@ class WeatherResult(BaseModel):
     source: str = "open-meteo.com"
 
 
-def _geocode_city(city: str):
-    url = "https://geocoding-api.open-meteo.com/v1/search"
-    params = {"name": city, "count": 1, "language": "en", "format": "json"}
-    resp = requests.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
+class CityForecast(BaseModel):
+    city: str
+    country: str
+    latitude: float
+    longitude: float
+    timezone: Optional[str] = None
+    current: Dict[str, Any] = Field(default_factory=dict, description="Open-Meteo variable -> current value")
+    # columnar series: "time" plus one list per Open-Meteo variable, aligned by index
+    hourly: Dict[str, List[Any]] = Field(default_factory=dict)
+    daily: Dict[str, List[Any]] = Field(default_factory=dict)
+
+
+class WeatherBatchResult(BaseModel):
+    count: int
+    horizon: str
+    units: Dict[str, str] = Field(default_factory=dict, description="Unit per Open-Meteo variable")
+    results: List[CityForecast] = Field(default_factory=list)
+    errors: Dict[str, str] = Field(default_factory=dict, description="Per-city failure reasons")
+    source: str = "open-meteo.com"
+
+
+_GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+def _geocode_params(city: str) -> dict:
+    return {"name": city, "count": 1, "language": "en", "format": "json"}
+
+
+def _first_geocode_result(data: dict, city: str) -> dict:
     if not data.get("results"):
         raise ValueError(f"Could not resolve city '{city}'")
     return data["results"][0]
 
 
+def _geocode_city(city: str):
+    resp = http_pool.get(_GEOCODE_URL, params=_geocode_params(city))
+    resp.raise_for_status()
+    return _first_geocode_result(resp.json(), city)
+
+
+async def _ageocode_city(city: str):
+    resp = await http_pool.aget(_GEOCODE_URL, params=_geocode_params(city))
+    resp.raise_for_status()
+    return _first_geocode_result(resp.json(), city)
+
+
 _CITY_NORMALIZATION = {
     "BLR": "Bengaluru",
     "BANGALORE": "Bengaluru",
@@ -41,36 +83,41 @@ _CITY_NORMALIZATION = {
 }
 
 
-def _fetch_weather(lat: float, lon: float):
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
+def _forecast_params(lat: float, lon: float) -> dict:
+    return {
         "latitude": lat,
         "longitude": lon,
         "current": "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation",
         "timezone": "auto",
     }
-    resp = requests.get(url, params=params, timeout=10)
+
+
+def _fetch_weather(lat: float, lon: float):
+    resp = http_pool.get(_FORECAST_URL, params=_forecast_params(lat, lon))
     resp.raise_for_status()
     return resp.json().get("current", {})
 
 
-def fetch_weather(city: str, country: str = "India") -> WeatherResult:
-    """
-    Fetch current weather for an Indian city using Open-Meteo (no API key required).
-    """
+async def _afetch_weather(lat: float, lon: float):
+    resp = await http_pool.aget(_FORECAST_URL, params=_forecast_params(lat, lon))
+    resp.raise_for_status()
+    return resp.json().get("current", {})
+
+
+def _normalize_city(city: str) -> str:
     if not city:
         raise ValueError("City is required")
+    return _CITY_NORMALIZATION.get(city.strip().upper(), city)
 
-    normalized_city = _CITY_NORMALIZATION.get(city.strip().upper(), city)
 
-    geo = _geocode_city(normalized_city)
+def _check_country(geo: dict, country: str) -> str:
     resolved_country = geo.get("country", "")
     if country.lower() not in resolved_country.lower():
         raise ValueError(f"Requested country '{country}' does not match result '{resolved_country}'")
+    return resolved_country
 
-    lat, lon = geo["latitude"], geo["longitude"]
-    current = _fetch_weather(lat, lon)
 
+def _build_result(geo: dict, current: dict, city: str, resolved_country: str) -> WeatherResult:
     try:
         return WeatherResult(
             city=geo.get("name", city),
@@ -83,3 +130,198 @@ def fetch_weather(city: str, country: str = "India") -> WeatherResult:
     except ValidationError as exc:
         logger.exception("WeatherResult validation failed")
         raise ValueError(f"Malformed weather data: {exc}") from exc
+
+
+def _geocode_and_cache(normalized_city: str, country: str) -> dict:
+    geo = _geocode_city(normalized_city)
+    geocache.get_cache().put(normalized_city, country, geo)
+    return geo
+
+
+def _resolve_geo(normalized_city: str, country: str) -> dict:
+    geo = geocache.get_cache().get(normalized_city, country)
+    return geo if geo is not None else _geocode_and_cache(normalized_city, country)
+
+
+async def _aresolve_geo(normalized_city: str, country: str) -> dict:
+    cache = geocache.get_cache()
+    geo = cache.get(normalized_city, country)
+    if geo is None:
+        geo = await _ageocode_city(normalized_city)
+        cache.put(normalized_city, country, geo)
+    return geo
+
+
+@cached("weather")
+@coalesced("weather")
+def fetch_weather(city: str, country: str = "India") -> WeatherResult:
+    """
+    Fetch current weather for an Indian city using Open-Meteo (no API key required).
+    """
+    normalized_city = _normalize_city(city)
+
+    geo = _resolve_geo(normalized_city, country)
+    resolved_country = _check_country(geo, country)
+
+    lat, lon = geo["latitude"], geo["longitude"]
+    current = _fetch_weather(lat, lon)
+    return _build_result(geo, current, city, resolved_country)
+
+
+@cached("weather")
+@coalesced("weather")
+async def afetch_weather(city: str, country: str = "India") -> WeatherResult:
+    """
+    Async variant of fetch_weather; does not block the event loop on HTTP I/O.
+    """
+    normalized_city = _normalize_city(city)
+
+    geo = await _aresolve_geo(normalized_city, country)
+    resolved_country = _check_country(geo, country)
+
+    lat, lon = geo["latitude"], geo["longitude"]
+    current = await _afetch_weather(lat, lon)
+    return _build_result(geo, current, city, resolved_country)
+
+
+Horizon = Literal["current", "hourly", "daily"]
+
+_CURRENT_VARS = "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation"
+_HORIZON_VARS = {
+    "hourly": "temperature_2m,relative_humidity_2m,precipitation_probability,precipitation",
+    "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max",
+}
+_MAX_FORECAST_DAYS = 16
+
+_geocode_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="weather-geocode")
+
+
+def _split_cities(cities: Union[str, List[str]]) -> List[str]:
+    if isinstance(cities, str):
+        cities = cities.replace(" and ", ",").split(",")
+    names = [c.strip() for c in cities or [] if c and c.strip()]
+    if not names:
+        raise ValueError("At least one city is required")
+    return list(dict.fromkeys(names))
+
+
+def _batch_params(geos: List[dict], horizon: str, days: int) -> dict:
+    params = {
+        "latitude": ",".join(str(g["latitude"]) for g in geos),
+        "longitude": ",".join(str(g["longitude"]) for g in geos),
+        "current": _CURRENT_VARS,
+        "timezone": "auto",
+    }
+    if horizon in _HORIZON_VARS:
+        params[horizon] = _HORIZON_VARS[horizon]
+        params["forecast_days"] = max(1, min(int(days), _MAX_FORECAST_DAYS))
+    return params
+
+
+def _locations(payload: Union[dict, list]) -> List[dict]:
+    # Open-Meteo returns a bare object for one coordinate and a list for several
+    return payload if isinstance(payload, list) else [payload]
+
+
+def _sort_geos(
+    cities: List[str], outcomes: List[Union[dict, BaseException]], country: str
+) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    geos: Dict[str, dict] = {}
+    errors: Dict[str, str] = {}
+    for city, outcome in zip(cities, outcomes):
+        try:
+            if isinstance(outcome, BaseException):
+                raise outcome
+            _check_country(outcome, country)
+        except Exception as exc:
+            errors[city] = str(exc)
+        else:
+            geos[city] = outcome
+    return geos, errors
+
+
+def _build_batch(
+    cities: List[str], geos: Dict[str, dict], errors: Dict[str, str], payload: Union[dict, list], horizon: str
+) -> WeatherBatchResult:
+    located = list(geos.items())
+    locations = _locations(payload) if located else []
+    if len(locations) != len(located):
+        raise ValueError(f"Open-Meteo returned {len(locations)} locations for {len(located)} cities")
+    units: Dict[str, str] = {}
+    results: List[CityForecast] = []
+    for (city, geo), loc in zip(located, locations):
+        units.update(loc.get("current_units") or {})
+        units.update(loc.get(f"{horizon}_units") or {})
+        current = {k: v for k, v in (loc.get("current") or {}).items() if k != "interval"}
+        results.append(
+            CityForecast(
+                city=geo.get("name", city),
+                country=geo.get("country", ""),
+                latitude=geo["latitude"],
+                longitude=geo["longitude"],
+                timezone=loc.get("timezone"),
+                current=current,
+                hourly=(loc.get("hourly") or {}) if horizon == "hourly" else {},
+                daily=(loc.get("daily") or {}) if horizon == "daily" else {},
+            )
+        )
+    units.pop("interval", None)
+    ordered = {c: errors[c] for c in cities if c in errors}
+    return WeatherBatchResult(count=len(results), horizon=horizon, units=units, results=results, errors=ordered)
+
+
+def _resolve_geos(cities: List[str], country: str) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    cache = geocache.get_cache()
+    outcomes: Dict[str, Any] = {}
+    for city in cities:
+        geo = cache.get(_normalize_city(city), country)
+        # only cache misses need a geocoding round trip; those run concurrently
+        outcomes[city] = geo or _geocode_pool.submit(
+            contextvars.copy_context().run, _geocode_and_cache, _normalize_city(city), country
+        )
+    found = [o if isinstance(o, dict) else (o.exception() or o.result()) for o in outcomes.values()]
+    return _sort_geos(cities, found, country)
+
+
+async def _aresolve_geos(cities: List[str], country: str) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    found = await asyncio.gather(
+        *(_aresolve_geo(_normalize_city(city), country) for city in cities), return_exceptions=True
+    )
+    return _sort_geos(cities, found, country)
+
+
+@cached("weather")
+@coalesced("weather")
+def fetch_weather_batch(
+    cities: Union[str, List[str]], country: str = "India", horizon: Horizon = "current", days: int = 1
+) -> WeatherBatchResult:
+    """
+    Weather for several Indian cities in one Open-Meteo request. Cities are geocoded concurrently;
+    `horizon` adds an hourly or daily forecast for `days` days as columnar arrays per city.
+    """
+    names = _split_cities(cities)
+    geos, errors = _resolve_geos(names, country)
+    payload: Union[dict, list] = []
+    if geos:
+        resp = http_pool.get(_FORECAST_URL, params=_batch_params(list(geos.values()), horizon, days))
+        resp.raise_for_status()
+        payload = resp.json()
+    return _build_batch(names, geos, errors, payload, horizon)
+
+
+@cached("weather")
+@coalesced("weather")
+async def afetch_weather_batch(
+    cities: Union[str, List[str]], country: str = "India", horizon: Horizon = "current", days: int = 1
+) -> WeatherBatchResult:
+    """
+    Async variant of fetch_weather_batch.
+    """
+    names = _split_cities(cities)
+    geos, errors = await _aresolve_geos(names, country)
+    payload: Union[dict, list] = []
+    if geos:
+        resp = await http_pool.aget(_FORECAST_URL, params=_batch_params(list(geos.values()), horizon, days))
+        resp.raise_for_status()
+        payload = resp.json()
+    return _build_batch(names, geos, errors, payload, horizon)
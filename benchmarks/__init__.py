@@ -0,0 +1,3 @@
+"""
+Standalone benchmark scripts for the orchestrator (run with `python -m benchmarks.<name>`).
+"""
@@ -0,0 +1,104 @@
+"""
+Import-time budget for the entry points, measured with `python -X importtime`.
+
+Each target module is imported in a fresh interpreter (with LLM_PROVIDER=fake,
+so no OpenAI key is needed). The report shows the median cumulative import
+time, the packages with the most import time of their own, and which heavy libraries were loaded
+at import although they should wait for first use. Exits with status 1 when a
+target is over its budget or loads a deferred library:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 5 --target server --budget-ms server=800
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+TARGETS = {
+    "server": "app.server.main",
+    "cli": "app.client.cli_workflow",
+    "mcp": "app.server.mcp_server",
+    "orchestrator": "app.agents.orchestrator",
+}
+# milliseconds of cumulative import time per target
+BUDGETS_MS = {"server": 1500.0, "cli": 1000.0, "mcp": 2000.0, "orchestrator": 1000.0}
+# loaded on first use (tools, LLM client, graph build), never by importing an entry point
+DEFERRED = ("yfinance", "pandas", "feedparser", "bs4", "langchain_openai", "openai", "langgraph")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _import_once(module: str, env: Dict[str, str]) -> Tuple[float, Counter, Set[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise SystemExit(f"import {module} failed:\n{tail}")
+    total_us = 0
+    by_package: Counter = Counter()
+    loaded: Set[str] = set()
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        package = name.split(".")[0]
+        loaded.add(package)
+        by_package[package] += self_us
+        # top-level entries (one leading space) already include their nested imports
+        if len(indent) == 1:
+            total_us += cumulative
+    return total_us / 1000, by_package, loaded
+
+
+def _budgets(overrides: List[str]) -> Dict[str, float]:
+    budgets = dict(BUDGETS_MS)
+    for item in overrides:
+        target, _, value = item.partition("=")
+        budgets[target] = float(value)
+    return budgets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check entry-point import times against a budget")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="Target to measure (repeatable)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per target; the median is reported")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest packages (by own import time) to list")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="TARGET=MS", help="Override a budget")
+    args = parser.parse_args()
+
+    env = {**os.environ, "LLM_PROVIDER": os.environ.get("LLM_PROVIDER", "fake")}
+    budgets = _budgets(args.budget_ms)
+    failed = False
+    for target in args.target or list(TARGETS):
+        module = TARGETS[target]
+        runs = [_import_once(module, env) for _ in range(args.runs)]
+        median_ms = statistics.median(r[0] for r in runs)
+        _, by_package, loaded = runs[-1]
+        eager = sorted(name for name in DEFERRED if name in loaded)
+        budget = budgets.get(target, float("inf"))
+        ok = median_ms <= budget and not eager
+        failed |= not ok
+        print(f"{target:<13} {module:<26} {median_ms:8.0f} ms  budget {budget:6.0f} ms  {'ok' if ok else 'OVER'}")
+        for name, us in by_package.most_common(args.top):
+            print(f"    {name:<28} {us / 1000:8.1f} ms")
+        if eager:
+            print(f"    loaded at import (should be deferred): {', '.join(eager)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
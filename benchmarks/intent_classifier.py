@@ -0,0 +1,90 @@
+"""
+Accuracy and throughput of the compiled intent classifier versus the original
+keyword-substring routing, over a labeled query corpus.
+    python -m benchmarks.intent_classifier --iterations 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from app.agents.intents import build_classifier
+
+CORPUS = Path(__file__).parent / "data" / "intent_corpus.jsonl"
+
+
+# The routing functions as they were before the compiled classifier, kept as the baseline.
+def _legacy_intent_from_text(text: str) -> str:
+    lowered = text.lower()
+    if any(keyword in lowered for keyword in ["weather", "temperature", "rain", "forecast", "climate"]):
+        return "weather"
+    if any(keyword in lowered for keyword in ["news", "headline", "update", "breaking"]):
+        return "news"
+    if any(keyword in lowered for keyword in ["stock", "price", "nifty", "sensex", "shares", "market"]):
+        return "stock"
+    return "unknown"
+
+
+def _legacy_intents_from_text(text: str) -> List[str]:
+    intents = []
+    lowered = text.lower()
+    if any(k in lowered for k in ["weather", "temperature", "rain", "forecast", "climate"]):
+        intents.append("weather")
+    if any(k in lowered for k in ["news", "headline", "update", "breaking"]):
+        intents.append("news")
+    if any(k in lowered for k in ["stock", "price", "nifty", "sensex", "shares", "market"]):
+        intents.append("stock")
+    return intents or ["unknown"]
+
+
+def _legacy(text: str) -> List[str]:
+    # classify() ran both functions on every request
+    _legacy_intent_from_text(text)
+    return _legacy_intents_from_text(text)
+
+
+def _load_corpus(path: Path) -> List[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _evaluate(name: str, fn: Callable[[str], List[str]], corpus: List[dict], iterations: int, show_errors: bool) -> None:
+    correct = 0
+    for row in corpus:
+        predicted = fn(row["query"])
+        if predicted == row["intents"]:
+            correct += 1
+        elif show_errors:
+            print(f"  [{name}] {row['query']!r}: expected {row['intents']} got {predicted}")
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for row in corpus:
+            fn(row["query"])
+    elapsed = time.perf_counter() - started
+    calls = iterations * len(corpus)
+    print(
+        f"{name:<10} accuracy={correct / len(corpus):6.1%} "
+        f"throughput={calls / elapsed:>12,.0f} q/s  ({elapsed / calls * 1e6:.2f} us/query)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark intent classification")
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    corpus = _load_corpus(args.corpus)
+    classifier = build_classifier()
+    print(f"corpus: {len(corpus)} labeled queries")
+    _evaluate("legacy", _legacy, corpus, args.iterations, args.show_errors)
+    _evaluate("compiled", lambda q: classifier.classify(q)[1], corpus, args.iterations, args.show_errors)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Load benchmark for the `/query` endpoint: requests per second at increasing concurrency.
+Start a single worker first, e.g.:
+    uvicorn app.server.main:app --workers 1 --port 8000
+Then:
+    python -m benchmarks.load_query --concurrency 1 4 16 --requests 64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+DEFAULT_BASE_URL = os.getenv("ORCHESTRATOR_URL", "http://localhost:8000")
+DEFAULT_QUERIES = [
+    "I need Bengaluru weather today",
+    "I want today's news",
+    "I need HCL stock price today",
+]
+
+
+async def _run_level(base_url: str, queries: List[str], concurrency: int, total: int, timeout: float) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+
+        async def _one(i: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    resp = await client.post("/query", json={"query": queries[i % len(queries)]})
+                    resp.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure /query throughput versus concurrency")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="Orchestrator base URL (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=32, help="Requests per concurrency level")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--query", action="append", help="Query to send (repeatable); defaults to a mixed set")
+    args = parser.parse_args()
+
+    queries = args.query or DEFAULT_QUERIES
+    print(f"{'conc':>5} {'ok':>5} {'err':>5} {'req/s':>8} {'p50 ms':>9}")
+    for level in args.concurrency:
+        row = asyncio.run(_run_level(args.base_url, queries, level, args.requests, args.timeout))
+        print(f"{row['concurrency']:>5} {row['ok']:>5} {row['errors']:>5} {row['rps']:>8.2f} {row['p50_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+News parsing benchmark: BeautifulSoup / feedparser versus the streaming lxml path.
+
+Runs on pages recorded by the replay layer (DuckDuckGo result pages and RSS
+feeds under --fixtures), on files passed with --page/--feed, or on synthetic
+documents shaped like those upstreams when nothing is recorded:
+    python -m benchmarks.news_parsing --limit 10 --runs 200
+    python -m benchmarks.news_parsing --fixtures benchmarks/fixtures/upstream
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from html import escape
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import feedparser
+
+from app.tools import fast_parse, news
+from app.tools.replay import FixtureStore
+
+
+def _synthetic_results_page(n: int) -> bytes:
+    results = "".join(
+        f'<div class="result results_links results_links_deep web-result"><div class="links_main result__body">'
+        f'<h2 class="result__title"><a rel="nofollow" class="result__a" href="https://example.in/{i}">'
+        f"Headline number {i} about markets, monsoon and cricket</a></h2>"
+        f'<a class="result__snippet" href="https://example.in/{i}">Snippet {i}: '
+        + "lorem ipsum dolor sit amet " * 8
+        + "</a></div></div>"
+        for i in range(n)
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>news at DuckDuckGo</title><style>' + "x{}" * 2000 + "</style></head>"
+        f'<body><div id="links" class="results">{results}</div></body></html>'
+    ).encode("utf-8")
+
+
+def _synthetic_feed(n: int) -> bytes:
+    descriptions = [
+        escape(f'<a href="https://news.example/{i}">Story {i}</a>&nbsp;<font>Example Times</font>') for i in range(n)
+    ]
+    items = "".join(
+        f"<item><title>Story {i} - Example Times</title><link>https://news.example/{i}</link>"
+        f'<guid isPermaLink="false">{i}</guid><pubDate>Mon, 12 Oct 2026 0{i % 10}:15:00 GMT</pubDate>'
+        f'<description>{descriptions[i]}</description><source url="https://example.times">Example Times</source></item>'
+        for i in range(n)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Top stories</title>'
+        f"<link>https://news.example</link><description>News</description>{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+def _recorded(path: str) -> Tuple[List[bytes], List[bytes]]:
+    pages, feeds = [], []
+    store = FixtureStore(path)
+    for file in sorted(store.path.glob("*.json")):
+        payload = json.loads(file.read_text(encoding="utf-8"))
+        if "text" not in payload or not payload.get("key", "").startswith('["http"'):
+            continue
+        body = payload["text"].encode("utf-8")
+        if "duckduckgo.com" in payload["key"]:
+            pages.append(body)
+        elif "xml" in payload.get("headers", {}).get("Content-Type", "") or b"<rss" in body[:500]:
+            feeds.append(body)
+    return pages, feeds
+
+
+def _time(fn: Callable[[], object], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+class _Page:
+    # the two attributes of an HTTP response the news parsers read
+    def __init__(self, body: bytes):
+        self.content = body
+        self.text = body.decode("utf-8", "replace")
+
+
+def _compare(label: str, baseline: Callable[[], list], fast: Callable[[], list], runs: int) -> None:
+    base_items, fast_items = baseline(), fast()
+    same = [i.title for i in base_items] == [i.title for i in fast_items]
+    base_us, fast_us = _time(baseline, runs), _time(fast, runs)
+    print(
+        f"{label:<28} {len(base_items):>5} {base_us:>11.0f} {fast_us:>11.0f} {base_us / fast_us:>7.1f}x"
+        f"  {'same titles' if same else 'TITLES DIFFER'}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare news parsing paths")
+    parser.add_argument("--fixtures", default="benchmarks/fixtures/upstream", help="Replay fixture directory")
+    parser.add_argument("--page", action="append", default=[], help="Saved DuckDuckGo HTML page (repeatable)")
+    parser.add_argument("--feed", action="append", default=[], help="Saved RSS/Atom feed (repeatable)")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=100)
+    args = parser.parse_args()
+
+    if not fast_parse.available():
+        raise SystemExit("lxml is not installed; only the fallback parsers are available")
+
+    pages, feeds = _recorded(args.fixtures) if Path(args.fixtures).exists() else ([], [])
+    pages += [Path(p).read_bytes() for p in args.page]
+    feeds += [Path(f).read_bytes() for f in args.feed]
+    if not pages and not feeds:
+        print("No recorded pages found; using synthetic documents (30 results, 100 feed items).")
+        pages, feeds = [_synthetic_results_page(30)], [_synthetic_feed(100)]
+
+    limit = args.limit
+    print(f"{'document':<28} {'items':>5} {'baseline us':>11} {'fast us':>11} {'speedup':>8}")
+    for i, body in enumerate(pages):
+        page = _Page(body)
+        _compare(
+            f"duckduckgo[{i}] {len(body) // 1024}KB",
+            lambda: news._parse_duckduckgo(page.text, limit),
+            lambda: news._fast_items(fast_parse.parse_duckduckgo(page.content, limit)),
+            args.runs,
+        )
+    for i, body in enumerate(feeds):
+        _compare(
+            f"feed[{i}] {len(body) // 1024}KB",
+            lambda: news._parse_entries(feedparser.parse(body), limit),
+            lambda: news._fast_items(fast_parse.parse_feed(body, limit)),
+            args.runs,
+        )
+
+
+if __name__ == "__main__":
+    main()
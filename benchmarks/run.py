@@ -0,0 +1,203 @@
+"""
+Offline benchmark runner: drives the workflow (or the FastAPI app in-process)
+against recorded upstream fixtures and the fake chat model, and reports
+throughput plus p50/p95/p99 latency per intent mix.
+
+Record fixtures once with network access, then replay them anywhere:
+    python -m benchmarks.run --replay record --concurrency 1 --requests 46
+    python -m benchmarks.run --target workflow --concurrency 1 8 32 --requests 200
+    python -m benchmarks.run --target asgi --mix weather=2,stock=1,multi=1 --fake-latency-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+CORPUS = Path(__file__).parent / "data" / "intent_corpus.jsonl"
+
+
+def _load_corpus() -> Dict[str, List[str]]:
+    """
+    Group the labeled corpus by mix category: the single intent, or `multi`.
+    """
+    groups: Dict[str, List[str]] = {}
+    with CORPUS.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                intents = row["intents"]
+                category = "multi" if len(intents) > 1 else intents[0]
+                groups.setdefault(category, []).append(row["query"])
+    return groups
+
+
+def _parse_mix(spec: str, groups: Dict[str, List[str]]) -> Dict[str, float]:
+    if not spec:
+        return {category: 1.0 for category in groups}
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in groups:
+            raise SystemExit(f"Unknown mix category {name!r}; choose from {sorted(groups)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def _schedule(groups: Dict[str, List[str]], mix: Dict[str, float], total: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    categories = list(mix)
+    weights = [mix[c] for c in categories]
+    picks = rng.choices(categories, weights=weights, k=total)
+    return [(c, rng.choice(groups[c])) for c in picks]
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # nearest-rank percentile; exact for the small samples a run produces
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "n": len(ordered),
+        "p50_ms": _percentile(ordered, 50) * 1000,
+        "p95_ms": _percentile(ordered, 95) * 1000,
+        "p99_ms": _percentile(ordered, 99) * 1000,
+    }
+
+
+def _prepare_settings(args: argparse.Namespace) -> Any:
+    if args.fake_llm:
+        os.environ["LLM_PROVIDER"] = "fake"
+    from app.config.settings import ReplayConfig, get_settings
+
+    settings = get_settings()
+    settings.config.models.fake_latency_ms = args.fake_latency_ms
+    settings.config.replay = ReplayConfig(mode=args.replay, path=args.fixtures)
+    settings.config.cache.enabled = not args.no_cache
+    settings.config.agent.answer_cache = not args.no_cache
+    settings.config.tracing.enabled = args.trace
+    return settings
+
+
+def _workflow_runner(settings: Any) -> Tuple[Callable[[str], Awaitable[None]], Callable[[], Awaitable[None]]]:
+    from langchain_core.messages import HumanMessage
+
+    from app.agents.orchestrator import AgentState, build_workflow
+
+    workflow = build_workflow(settings)
+
+    async def _one(query: str) -> None:
+        await workflow.ainvoke(AgentState(messages=[HumanMessage(content=query)]))
+
+    async def _close() -> None:
+        return None
+
+    return _one, _close
+
+
+def _asgi_runner(settings: Any) -> Tuple[Callable[[str], Awaitable[None]], Callable[[], Awaitable[None]]]:
+    import httpx
+
+    from app.server.main import app
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=120)
+
+    async def _one(query: str) -> None:
+        resp = await client.post("/query", json={"query": query})
+        resp.raise_for_status()
+
+    return _one, client.aclose
+
+
+async def _run_level(
+    run_one: Callable[[str], Awaitable[None]], schedule: List[Tuple[str, str]], concurrency: int
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async def _one(category: str, query: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await run_one(query)
+            except Exception:
+                errors[category] = errors.get(category, 0) + 1
+                return
+            latencies.setdefault(category, []).append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(c, q) for c, q in schedule))
+    elapsed = time.perf_counter() - started
+
+    everything = [x for values in latencies.values() for x in values]
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "rps": len(everything) / elapsed if elapsed else 0.0,
+        "errors": sum(errors.values()),
+        "all": _summary(everything),
+        "by_mix": {c: {**_summary(v), "errors": errors.get(c, 0)} for c, v in sorted(latencies.items())},
+    }
+
+
+def _print_level(row: dict) -> None:
+    print(f"\nconcurrency={row['concurrency']} req/s={row['rps']:.2f} errors={row['errors']} ({row['elapsed_s']:.2f}s)")
+    print(f"  {'mix':<10} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in [("all", row["all"]), *row["by_mix"].items()]:
+        print(f"  {name:<10} {stats['n']:>5} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+
+async def _main(args: argparse.Namespace) -> List[dict]:
+    groups = _load_corpus()
+    mix = _parse_mix(args.mix, groups)
+    settings = _prepare_settings(args)
+    run_one, close = _workflow_runner(settings) if args.target == "workflow" else _asgi_runner(settings)
+    rows = []
+    try:
+        for level in args.concurrency:
+            if args.warmup:
+                await _run_level(run_one, _schedule(groups, mix, args.warmup, args.seed + 1), level)
+            row = await _run_level(run_one, _schedule(groups, mix, args.requests, args.seed), level)
+            _print_level(row)
+            rows.append(row)
+    finally:
+        await close()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reproducible workflow / API benchmark over recorded upstreams")
+    parser.add_argument("--target", choices=["workflow", "asgi"], default="workflow")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=0, help="Untimed requests before each level")
+    parser.add_argument("--mix", default="", help="Weighted categories, e.g. weather=3,news=2,stock=2,multi=1")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--replay", choices=["off", "record", "replay"], default="replay")
+    parser.add_argument("--fixtures", default="benchmarks/fixtures/upstream", help="Fixture directory")
+    parser.add_argument("--openai", dest="fake_llm", action="store_false", help="Use the configured OpenAI model")
+    parser.add_argument("--fake-latency-ms", type=float, default=0.0, help="Simulated latency per fake LLM call")
+    parser.add_argument("--no-cache", action="store_true", help="Disable tool and answer caches")
+    parser.add_argument("--trace", action="store_true", help="Keep request tracing on while measuring")
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args()
+
+    rows = asyncio.run(_main(args))
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Show that N concurrent identical calls trigger exactly one upstream fetch,
+on both the thread path and the async path.
+Usage:
+    python -m benchmarks.singleflight_check --callers 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.tools.singleflight import SingleFlight
+
+
+def _check_threads(callers: int, delay: float) -> int:
+    flight = SingleFlight()
+    upstream_calls = 0
+    lock = threading.Lock()
+    barrier = threading.Barrier(callers)
+
+    def upstream() -> str:
+        nonlocal upstream_calls
+        with lock:
+            upstream_calls += 1
+        time.sleep(delay)
+        return "TCS"
+
+    def caller(_: int) -> str:
+        barrier.wait()
+        return flight.do("stock:tcs", upstream)
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        results = list(pool.map(caller, range(callers)))
+    assert results == ["TCS"] * callers, results
+    return upstream_calls
+
+
+async def _check_async(callers: int, delay: float) -> int:
+    flight = SingleFlight()
+    upstream_calls = 0
+
+    async def upstream() -> str:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(delay)
+        return "Mumbai"
+
+    results = await asyncio.gather(*(flight.ado("weather:mumbai", upstream) for _ in range(callers)))
+    assert results == ["Mumbai"] * callers, results
+    return upstream_calls
+
+
+async def _check_async_error(callers: int, delay: float) -> int:
+    flight = SingleFlight()
+    upstream_calls = 0
+
+    async def upstream() -> str:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(delay)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(
+        *(flight.ado("news:india", upstream) for _ in range(callers)), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results), results
+    return upstream_calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify single-flight coalescing")
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.2, help="Simulated upstream latency in seconds")
+    args = parser.parse_args()
+
+    checks = {
+        "threads": _check_threads(args.callers, args.delay),
+        "async": asyncio.run(_check_async(args.callers, args.delay)),
+        "async (error)": asyncio.run(_check_async_error(args.callers, args.delay)),
+    }
+    for name, upstream_calls in checks.items():
+        status = "ok" if upstream_calls == 1 else "FAIL"
+        print(f"{name:<14} callers={args.callers} upstream_calls={upstream_calls} {status}")
+    if any(calls != 1 for calls in checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare answer-synthesis modes: p50/p95 latency and LLM tokens per request.
+Runs the workflow in-process (no HTTP) against the configured model:
+    python -m benchmarks.synthesis_modes --runs 10
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import List
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agents.orchestrator import AgentState, build_workflow
+from app.agents.synthesis import SYNTHESIS_MODES
+from app.config.settings import get_settings
+from app.tools import cache
+
+DEFAULT_QUERIES = [
+    "I need Bengaluru weather today",
+    "TCS stock price",
+    "cricket news",
+    "Mumbai weather and INFY price",
+]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _tokens(messages) -> int:
+    total = 0
+    for msg in messages:
+        usage = getattr(msg, "usage_metadata", None) if isinstance(msg, AIMessage) else None
+        if usage:
+            total += usage.get("total_tokens", 0)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark llm/template/hybrid answer synthesis")
+    parser.add_argument("--runs", type=int, default=5, help="Passes over the query set per mode")
+    parser.add_argument("--mode", choices=SYNTHESIS_MODES, action="append", help="Modes to run (default: all)")
+    parser.add_argument("--query", action="append", help="Query to send (repeatable)")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    queries = args.query or DEFAULT_QUERIES
+    print(f"{'mode':<9} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'tokens/req':>11}")
+    for mode in args.mode or SYNTHESIS_MODES:
+        mode_settings = settings.model_copy(deep=True)
+        mode_settings.config.agent.synthesis = mode
+        workflow = build_workflow(mode_settings)
+        # tool results are cached after the first pass so latency reflects synthesis, not upstreams
+        cache.configure(mode_settings.config.cache)
+
+        latencies: List[float] = []
+        tokens: List[int] = []
+        for _ in range(args.runs):
+            for query in queries:
+                started = time.perf_counter()
+                result = workflow.invoke(AgentState(messages=[HumanMessage(content=query)]))
+                latencies.append((time.perf_counter() - started) * 1000)
+                messages = result["messages"] if isinstance(result, dict) else result.messages
+                tokens.append(_tokens(messages))
+        print(
+            f"{mode:<9} {len(latencies):>4} {statistics.median(latencies):>9.1f} "
+            f"{_percentile(latencies, 95):>9.1f} {statistics.mean(tokens):>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
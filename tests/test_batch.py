@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from pydantic import BaseModel
+
+from app.server.batch import BatchRunner
+
+
+class _Answer(BaseModel):
+    answer: str
+
+
+class _Server:
+    """
+    Answers queries with a delay per query, so later queries can finish first.
+    """
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, query: str) -> _Answer:
+        self.calls.append(query)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(query, 0.01))
+            if query == "fail":
+                raise RuntimeError("tool failed")
+            return _Answer(answer=query.upper())
+        finally:
+            self.running -= 1
+
+
+def _items(runner: BatchRunner) -> list:
+    async def collect():
+        return [item async for item in runner.results()]
+
+    return asyncio.run(collect())
+
+
+def _lines(runner: BatchRunner) -> list:
+    async def collect():
+        return [line async for line in runner.ndjson()]
+
+    return asyncio.run(collect())
+
+
+def test_results_come_back_in_input_order():
+    server = _Server(delays={"slow": 0.1})
+    queries = ["slow", "fast", "fail", "Slow "]
+    runner = BatchRunner(queries, server, concurrency=4)
+    items = _items(runner)
+
+    assert [(item.index, item.query) for item in items] == list(enumerate(queries))
+    assert items[0].response == _Answer(answer="SLOW")
+    assert (items[2].response, items[2].error) == (None, "tool failed")
+    # same query up to case and whitespace: answered once, reported for both inputs
+    assert items[3].response == _Answer(answer="SLOW")
+
+    summary = runner.summary()
+    assert (summary["count"], summary["unique_queries"], summary["errors"]) == (4, 3, 1)
+    assert sorted(server.calls) == ["fail", "fast", "slow"]
+
+
+def test_concurrency_bounds_queries_in_flight():
+    server = _Server()
+    _items(BatchRunner([f"q{i}" for i in range(10)], server, concurrency=3))
+    assert len(server.calls) == 10
+    assert server.peak == 3
+
+
+def test_ndjson_has_one_line_per_query_in_order_then_summary():
+    server = _Server(delays={"slow": 0.1})
+    queries = ["slow", "fast", "fail", "Slow "]
+    lines = _lines(BatchRunner(queries, server, concurrency=4))
+
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+    items = [json.loads(line) for line in lines]
+    assert [item["index"] for item in items[:-1]] == [0, 1, 2, 3]
+    assert [item["query"] for item in items[:-1]] == queries
+    assert items[0] == {"index": 0, "query": "slow", "response": {"answer": "SLOW"}, "error": None}
+    assert items[2] == {"index": 2, "query": "fail", "response": None, "error": "tool failed"}
+    # same query up to case and whitespace: answered once, reported for both inputs
+    assert items[3]["response"] == {"answer": "SLOW"}
+
+    summary = items[-1]["summary"]
+    assert (summary["count"], summary["unique_queries"], summary["errors"]) == (4, 3, 1)
+    assert sorted(server.calls) == ["fail", "fast", "slow"]
+
+
+def test_empty_batch_is_just_a_summary():
+    lines = _lines(BatchRunner([], _Server(), concurrency=2))
+    assert [json.loads(line)["summary"]["count"] for line in lines] == [0]
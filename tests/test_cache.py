@@ -0,0 +1,130 @@
+import asyncio
+import os
+import pickle
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from app.config.settings import CacheConfig
+from app.tools import cache
+from app.tools.cache import CacheEntry, MemoryBackend, SQLiteBackend, ToolCache
+
+
+class _Upstream:
+    def __init__(self, value="fresh"):
+        self.value = value
+        self.calls = 0
+        self.error = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    async def acall(self):
+        return self()
+
+
+def _tool_cache(age: float, **kwargs) -> ToolCache:
+    """
+    A cache with ttl 10 and stale_ttl 20 holding "old" stored `age` seconds ago.
+    """
+    tool_cache = ToolCache("test", ttl=10, stale_ttl=20, backend=MemoryBackend(), **kwargs)
+    tool_cache.backend.set("k", CacheEntry(value="old", stored_at=time.time() - age))
+    return tool_cache
+
+
+def test_fresh_entry_is_served_without_calling_upstream():
+    upstream = _Upstream()
+    tool_cache = _tool_cache(age=5)
+    assert tool_cache.call("k", upstream) == "old"
+    assert upstream.calls == 0
+    assert tool_cache.hits == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    upstream = _Upstream()
+    tool_cache = _tool_cache(age=15)
+    assert tool_cache.call("k", upstream) == "old"
+    deadline = time.monotonic() + 5
+    while tool_cache.refreshes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert tool_cache.stale_hits == 1
+    assert tool_cache.call("k", upstream) == "fresh"
+    assert upstream.calls == 1
+
+
+def test_async_stale_entry_refreshes_in_a_task():
+    upstream = _Upstream()
+    tool_cache = _tool_cache(age=15)
+
+    async def run():
+        assert await tool_cache.acall("k", upstream.acall) == "old"
+        await asyncio.gather(*tool_cache._tasks)
+        return await tool_cache.acall("k", upstream.acall)
+
+    assert asyncio.run(run()) == "fresh"
+    assert upstream.calls == 1
+
+
+def test_expired_entry_calls_upstream():
+    upstream = _Upstream()
+    tool_cache = _tool_cache(age=60)
+    assert tool_cache.call("k", upstream) == "fresh"
+    assert upstream.calls == 1
+    assert tool_cache.misses == 1
+
+
+def test_expired_entry_answers_when_upstream_fails():
+    upstream = _Upstream()
+    upstream.error = RuntimeError("upstream down")
+    tool_cache = _tool_cache(age=60, stale_if_error=100)
+    assert tool_cache.call("k", upstream) == "old"
+    assert tool_cache.error_hits == 1
+
+
+def test_too_old_entry_does_not_hide_upstream_errors():
+    upstream = _Upstream()
+    upstream.error = RuntimeError("upstream down")
+    tool_cache = _tool_cache(age=200, stale_if_error=100)
+    with pytest.raises(RuntimeError):
+        tool_cache.call("k", upstream)
+    assert tool_cache.error_hits == 0
+
+
+class _Quote(BaseModel):
+    symbol: str
+    price: float
+
+
+@cache.cached("quote_test")
+def _quote(symbol: str) -> _Quote:
+    return _Quote(symbol=symbol, price=1.0)
+
+
+def test_sqlite_backend_round_trips_models_as_json(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), "quote_test")
+    backend.set("model", CacheEntry(value=_quote("TCS"), stored_at=123.0))
+    backend.set("plain", CacheEntry(value={"items": ["a", 1]}, stored_at=123.0))
+    assert backend.get("model") == CacheEntry(value=_Quote(symbol="TCS", price=1.0), stored_at=123.0)
+    assert backend.get("plain").value == {"items": ["a", 1]}
+    assert backend.get("missing") is None
+
+
+def test_sqlite_backend_never_unpickles(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), "quote_test")
+    backend.set("k", CacheEntry(value="ok", stored_at=123.0))
+    backend._conn().execute("UPDATE tool_cache SET value = ?", (pickle.dumps(_Quote(symbol="X", price=2.0)),))
+    assert backend.get("k") is None
+    assert backend.errors == 1
+
+
+def test_shared_cache_directory_is_private(tmp_path):
+    private = tmp_path / "shared"
+    assert cache._private_dir(private)
+    assert os.stat(private).st_mode & 0o777 == 0o700
+    private.chmod(0o755)
+    assert not cache._private_dir(private)
+    assert cache.shared_cache_path(CacheConfig(path="custom.sqlite3")) == "custom.sqlite3"
@@ -0,0 +1,43 @@
+from app.tools.dedup import NearDuplicateFilter
+
+
+def test_rejects_reworded_and_extended_headlines():
+    seen = NearDuplicateFilter()
+    assert seen.add("Sensex jumps 500 points as IT stocks rally")
+    assert not seen.add("Sensex jumps 500 points as IT stocks rally")
+    assert not seen.add("sensex jumps 500 points, as IT stocks rally!")
+    assert not seen.add("Sensex jumps 500 points as IT stocks rally - Economic Times")
+    assert len(seen) == 1
+
+
+def test_keeps_different_stories():
+    seen = NearDuplicateFilter()
+    assert seen.add("Sensex jumps 500 points as IT stocks rally")
+    assert seen.add("Monsoon reaches Kerala two days ahead of schedule")
+    assert seen.add("RBI keeps repo rate unchanged at 6.5 percent")
+    assert len(seen) == 3
+
+
+def test_text_without_words_is_let_through():
+    seen = NearDuplicateFilter()
+    assert seen.add("")
+    assert seen.add("!!!")
+    assert len(seen) == 0
+
+
+def test_non_ascii_headlines():
+    seen = NearDuplicateFilter()
+    assert seen.add("भारत ने क्रिकेट विश्व कप जीता")
+    assert seen.add("मानसून दो दिन पहले केरल पहुंचा")
+    assert seen.add("சென்னையில் கனமழை எச்சரிக்கை")
+    assert not seen.add("भारत ने क्रिकेट विश्व कप जीता।")
+    assert len(seen) == 3
+
+
+def test_window_only_compares_recent_texts():
+    seen = NearDuplicateFilter(window=1)
+    assert seen.add("Sensex jumps 500 points as IT stocks rally")
+    assert seen.add("Monsoon reaches Kerala two days ahead of schedule")
+    # the first headline has left the window
+    assert seen.add("Sensex jumps 500 points as IT stocks rally")
+    assert len(seen) == 1
@@ -0,0 +1,42 @@
+import pytest
+
+from app.agents.answer_cache import AnswerCache
+from app.agents.extractor import FastPathExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return FastPathExtractor()
+
+
+@pytest.mark.parametrize(
+    "text, cities",
+    [
+        ("Bangalore weather today", "Bengaluru"),
+        ("What's the temperature in Chennai?", "Chennai"),
+        ("weather in Pune, India", "Pune"),
+        ("Bengaluru weather and cricket news", "Bengaluru"),
+        ("TCS stock price and Mumbai weather", "Mumbai"),
+        ("weather in New Delhi and Pune", "New Delhi,Pune"),
+    ],
+)
+def test_weather_fast_path(extractor, text, cities):
+    call = extractor.extract("weather", text)
+    assert call is not None
+    assert call.args.get("cities", call.args.get("__arg1")) == cities
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["weather in Pune and Ooty", "Ooty and Pune weather", "weather in Lonavala", "Will it rain in Kochi & Munnar"],
+)
+def test_unknown_places_fall_back_to_the_llm(extractor, text):
+    assert extractor.extract("weather", text) is None
+
+
+def test_fast_calls_share_answer_cache_keys_with_llm_calls(extractor):
+    fast = extractor.extract("weather", "Bangalore weather").as_tool_call()
+    collected = {"fetch_weather": {"city": "Bengaluru", "temperature_c": 24.0}}
+    for llm_args in ({"__arg1": "Bengaluru"}, {"tool_input": "bengaluru "}):
+        llm = {"name": "fetch_weather", "args": llm_args, "id": "call_1", "type": "tool_call"}
+        assert AnswerCache.key(["weather"], [fast], collected) == AnswerCache.key(["weather"], [llm], collected)
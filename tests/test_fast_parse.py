@@ -0,0 +1,34 @@
+import pytest
+
+from app.tools import fast_parse
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("Fri, 17 Oct 2026 15:30:00 +0530", "2026-10-17T10:00:00"),
+        ("Fri, 17 Oct 2026 10:00:00 GMT", "2026-10-17T10:00:00"),
+        ("Fri, 17 Oct 2026 10:00:00 -0000", "2026-10-17T10:00:00"),
+        ("2026-10-17T15:30:00+05:30", "2026-10-17T10:00:00"),
+        ("2026-10-17T10:00:00Z", "2026-10-17T10:00:00"),
+        ("2026-10-17T10:00:00", "2026-10-17T10:00:00"),
+        ("yesterday", None),
+        (None, None),
+    ],
+)
+def test_dates_are_converted_to_naive_utc(value, expected):
+    assert fast_parse._iso(value) == expected
+
+
+def test_feed_dates_with_an_offset_sort_in_utc():
+    pytest.importorskip("lxml")
+    feed = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>Mumbai first</title><pubDate>Fri, 17 Oct 2026 15:30:00 +0530</pubDate></item>
+<item><title>London later</title><pubDate>Fri, 17 Oct 2026 10:30:00 +0000</pubDate></item>
+</channel></rss>"""
+    items = fast_parse.parse_feed(feed)
+    assert [(title, published) for title, _, published in items] == [
+        ("Mumbai first", "2026-10-17T10:00:00"),
+        ("London later", "2026-10-17T10:30:00"),
+    ]
@@ -0,0 +1,195 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from app.config.settings import ResilienceConfig
+from app.tools import http_pool, resilience
+from app.tools.resilience import CircuitBreaker, TokenBucket, UpstreamUnavailable
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
+
+
+def test_bucket_spends_burst_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.reserve(0) == 0.0
+    assert bucket.reserve(0) == 0.0
+    # the next token is a second away: too long for this caller, fine for a patient one
+    assert bucket.reserve(0.5) is None
+    assert bucket.reserve(1.0) == pytest.approx(1.0)
+    assert bucket.waits == 1
+    clock.now += 2.0
+    assert bucket.reserve(0) == 0.0
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_s=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED and breaker.failures == 0
+
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_s=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == resilience.HALF_OPEN
+    assert not breaker.available()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_s=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert breaker.opened == 2
+    assert not breaker.allow()
+
+
+def test_lost_probe_is_given_up_after_reset(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_s=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    # the probe never reports back (e.g. its task was cancelled)
+    clock.now += 30
+    assert breaker.allow()
+
+
+@pytest.fixture
+def configured(clock):
+    resilience.configure(ResilienceConfig(breaker_failures=2, rate_limits={}))
+    yield
+    resilience.configure(ResilienceConfig())
+
+
+def test_caller_flagged_statuses_open_the_breaker(configured):
+    host = "duckduckgo.com"
+    resilience.record_status(host, 202, failure_statuses=(202, 403))
+    resilience.record_status(host, 403, failure_statuses=(202, 403))
+    assert not resilience.available(host)
+    with pytest.raises(UpstreamUnavailable) as excinfo:
+        resilience.before_call(host)
+    assert excinfo.value.reason == "circuit open"
+
+
+def test_client_errors_are_not_upstream_failures(configured):
+    host = "api.open-meteo.com"
+    for status in (404, 400, 503, 404, 429):
+        resilience.record_status(host, status)
+    assert resilience.available(host)
+    resilience.record_status(host, 500)
+    resilience.record_status(host, 502)
+    assert not resilience.available(host)
+
+
+def test_guard_only_counts_classified_failures(configured):
+    host = "finance.yahoo.com"
+
+    def call(exc):
+        with pytest.raises(type(exc)):
+            with resilience.guard(host, lambda e: isinstance(e, OSError)):
+                raise exc
+
+    for _ in range(3):
+        call(ValueError("unknown ticker"))
+    assert resilience.available(host)
+    call(ConnectionError("reset"))
+    call(TimeoutError("timed out"))
+    assert not resilience.available(host)
+
+
+def test_guard_frees_the_probe_after_an_unclassified_error(configured, clock):
+    host = "finance.yahoo.com"
+    resilience.record_failure(host)
+    resilience.record_failure(host)
+    clock.now += ResilienceConfig().breaker_reset_s
+    with pytest.raises(KeyError):
+        with resilience.guard(host, lambda e: isinstance(e, OSError)):
+            raise KeyError("last_price")
+    # the next caller gets the probe instead of waiting for it to time out
+    with resilience.guard(host):
+        pass
+    assert resilience.available(host)
+
+
+class _BrokenSession:
+    """
+    Fails every request before it reaches the host.
+    """
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+    def request(self, *args, **kwargs):
+        raise self.exc
+
+
+class _BrokenPool(_BrokenSession):
+    def __init__(self, exc: BaseException):
+        super().__init__(exc)
+        self.client = self
+
+    async def request(self, *args, **kwargs):
+        raise self.exc
+
+    def semaphore(self, host: str):
+        return contextlib.AsyncExitStack()
+
+
+def _half_open(host: str, clock) -> None:
+    resilience.record_failure(host)
+    resilience.record_failure(host)
+    clock.now += ResilienceConfig().breaker_reset_s
+
+
+def test_http_request_frees_the_probe_on_a_local_error(configured, clock, monkeypatch):
+    host = "api.open-meteo.com"
+    _half_open(host, clock)
+    monkeypatch.setattr(http_pool, "get_session", lambda: _BrokenSession(ValueError("bad params")))
+    with pytest.raises(ValueError):
+        http_pool.request("GET", f"https://{host}/v1/forecast")
+    assert resilience.available(host)
+
+
+def test_async_http_request_frees_the_probe_when_cancelled(configured, clock, monkeypatch):
+    host = "api.open-meteo.com"
+    _half_open(host, clock)
+    monkeypatch.setattr(http_pool, "_get_async_pool", lambda: _BrokenPool(asyncio.CancelledError()))
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(http_pool.arequest("GET", f"https://{host}/v1/forecast"))
+    assert resilience.available(host)
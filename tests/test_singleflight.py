@@ -0,0 +1,115 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.tools import cache, singleflight, stock
+
+
+class _Upstream:
+    """
+    Stands in for yfinance: counts Ticker lookups and holds each one until released.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def Ticker(self, ticker: str):
+        with self._lock:
+            self.calls += 1
+        self.release.wait(5)
+        info = {"last_price": 3500.0, "currency": "INR", "exchange": "NSI"}
+        return types.SimpleNamespace(ticker=ticker, fast_info=info)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = _Upstream()
+    monkeypatch.setitem(sys.modules, "yfinance", fake)
+    # coalescing alone must collapse the calls, so keep the result cache out of the way
+    monkeypatch.setattr(cache, "_caches", {})
+    return fake
+
+
+def test_concurrent_threads_make_one_upstream_call(upstream):
+    callers = 20
+    # spelled differently on purpose: make_key normalizes case and whitespace
+    symbols = ["TCS", "tcs", " Tcs ", "tcs"] * (callers // 4)
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(stock._fetch_stock, s) for s in symbols]
+        # every caller is now either leading the flight or waiting on it
+        time.sleep(0.2)
+        upstream.release.set()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert upstream.calls == 1
+    assert {r.symbol for r in results} == {"TCS"}
+    assert {r.price for r in results} == {3500.0}
+
+
+def test_concurrent_coroutines_make_one_upstream_call(upstream):
+    async def run():
+        tasks = [asyncio.create_task(stock._afetch_stock(s)) for s in ["INFY", "infy", "Infy "] * 5]
+        await asyncio.sleep(0.1)
+        upstream.release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+    assert upstream.calls == 1
+    assert len(results) == 15 and {r.symbol for r in results} == {"INFY"}
+
+
+def test_cancelled_leader_does_not_fail_followers(upstream):
+    async def run():
+        leader = asyncio.create_task(stock._afetch_stock("WIPRO"))
+        await asyncio.sleep(0.05)
+        followers = [asyncio.create_task(stock._afetch_stock("wipro")) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        await asyncio.sleep(0.05)
+        upstream.release.set()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    results = asyncio.run(run())
+    assert upstream.calls == 1
+    assert [r.symbol for r in results] == ["WIPRO"] * 5
+
+
+def test_errors_are_shared_by_all_callers(upstream, monkeypatch):
+    monkeypatch.setattr(stock, "_latest_price", lambda ticker: None)
+    upstream.release.set()
+
+    async def run():
+        return await asyncio.gather(*(stock._afetch_stock("NOPRICE") for _ in range(8)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert upstream.calls <= 2  # one suffixed and one bare lookup, shared by every caller
+
+
+def test_batch_memo_reuses_results_across_sequential_calls(upstream):
+    upstream.release.set()
+    memo = singleflight.BatchMemo()
+
+    async def query():
+        singleflight.join_batch(memo)
+        return await stock._afetch_stock("HCLTECH")
+
+    async def run():
+        first = await asyncio.create_task(query())
+        second = await asyncio.create_task(query())
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert upstream.calls == 1
+    assert first == second
+    assert memo.hits == 1
@@ -0,0 +1,61 @@
+import pytest
+
+from app.tools import symbol_master
+from app.tools.symbol_master import Listing, SymbolIndex, UnknownSymbolError
+
+
+@pytest.fixture
+def index(monkeypatch):
+    listings = [
+        Listing("RELIANCE", "Reliance Industries", ("NSE", "BSE")),
+        Listing("HDFCBANK", "HDFC Bank", ("NSE", "BSE")),
+        Listing("BANKBARODA", "Bank of Baroda", ("NSE", "BSE")),
+        Listing("COALINDIA", "Coal India", ("NSE",)),
+        Listing("BSEONLY", "Only On Bse", ("BSE",)),
+    ]
+    index = SymbolIndex(listings, {"ril": "RELIANCE"})
+    monkeypatch.setattr(symbol_master, "_index", index)
+    monkeypatch.setattr(symbol_master, "_strict", False)
+    return index
+
+
+@pytest.mark.parametrize(
+    "query, symbol",
+    [
+        ("reliance", "RELIANCE"),
+        ("RIL", "RELIANCE"),
+        ("Reliance Industries Ltd", "RELIANCE"),
+        ("hdfc bank share price", "HDFCBANK"),
+        ("hdfc ban", "HDFCBANK"),
+        ("coal india", "COALINDIA"),
+    ],
+)
+def test_resolves_tickers_names_aliases_and_prefixes(index, query, symbol):
+    resolution = symbol_master.resolve(query)
+    assert (resolution.symbol, resolution.suffix, resolution.listed) == (symbol, ".NS", True)
+
+
+def test_suffix_follows_the_listing_exchange(index):
+    assert symbol_master.resolve("bseonly").suffix == ".BO"
+    assert symbol_master.resolve("reliance", ".BO").suffix == ".BO"
+
+
+@pytest.mark.parametrize("query", ["Reliance Power", "Bank of India"])
+def test_similar_names_are_suggestions_never_matches(index, query):
+    assert index.lookup(query) is None
+    with pytest.raises(UnknownSymbolError, match="did you mean"):
+        symbol_master.resolve(query)
+
+
+def test_unknown_ticker_passes_through_unless_strict(index, monkeypatch):
+    resolution = symbol_master.resolve("ireda")
+    assert (resolution.symbol, resolution.suffix, resolution.listed) == ("IREDA", ".NS", False)
+
+    monkeypatch.setattr(symbol_master, "_strict", True)
+    with pytest.raises(UnknownSymbolError):
+        symbol_master.resolve("ireda")
+
+
+def test_blank_symbol_is_rejected(index):
+    with pytest.raises(ValueError):
+        symbol_master.resolve("  ")
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.tools import geocache, http_pool, weather
+
+_OOTY = {"name": "Ooty", "country": "India", "latitude": 11.41, "longitude": 76.7}
+
+
+class _Response:
+    def __init__(self, payload: dict):
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self._payload
+
+
+class _Geocoder:
+    """
+    Stands in for the Open-Meteo geocoding API and counts lookups.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url: str, params: dict, **kwargs) -> _Response:
+        self.calls.append(params["name"])
+        return _Response({"results": [_OOTY]})
+
+    async def aget(self, url: str, params: dict, **kwargs) -> _Response:
+        return self.get(url, params, **kwargs)
+
+
+@pytest.fixture
+def geocoder(monkeypatch):
+    fake = _Geocoder()
+    monkeypatch.setattr(http_pool, "get", fake.get)
+    monkeypatch.setattr(http_pool, "aget", fake.aget)
+    # in memory only, so every test starts cold
+    monkeypatch.setattr(geocache, "_cache", geocache.GeocodeCache())
+    return fake
+
+
+def test_cache_miss_geocodes_once(geocoder):
+    assert weather._resolve_geo("Ooty", "India") == _OOTY
+    assert weather._resolve_geo("ooty ", "India") == _OOTY
+    assert geocoder.calls == ["Ooty"]
+
+
+def test_async_cache_miss_geocodes_once(geocoder):
+    async def run():
+        return [await weather._aresolve_geo("Ooty", "India"), await weather._aresolve_geo("OOTY", "India")]
+
+    assert asyncio.run(run()) == [_OOTY, _OOTY]
+    assert geocoder.calls == ["Ooty"]
+    assert geocache.get_cache().misses == 1